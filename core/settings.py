@@ -49,6 +49,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "traffic_monitor.middleware.CompressionMiddleware",
+    "traffic_monitor.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -91,6 +94,69 @@ DATABASES = {
     }
 }
 
+# Connection reuse. By default every worker keeps its connection open for
+# DATABASE_CONN_MAX_AGE seconds ("none" for unlimited, 0 to close it after each
+# request) and checks it is still usable before reusing it across requests.
+# With DATABASE_POOL=true each process shares a psycopg 3 pool of
+# DATABASE_POOL_MIN_SIZE to DATABASE_POOL_MAX_SIZE connections instead, and
+# requests wait at most DATABASE_POOL_TIMEOUT seconds for a free connection.
+# Pool statistics are served by /api/db/pool/.
+if os.getenv("DATABASE_POOL", "false").lower() in ("1", "true", "yes"):
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DATABASE_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ.get("DATABASE_POOL_MAX_SIZE", 10)),
+            "timeout": float(os.environ.get("DATABASE_POOL_TIMEOUT", 10)),
+        }
+    }
+else:
+    conn_max_age = os.getenv("DATABASE_CONN_MAX_AGE", "60")
+    DATABASES["default"]["CONN_MAX_AGE"] = (
+        None if conn_max_age.lower() == "none" else int(conn_max_age)
+    )
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = os.getenv(
+        "DATABASE_CONN_HEALTH_CHECKS", "true"
+    ).lower() in ("1", "true", "yes")
+
+# Streaming replicas (hot standbys) of the default database, as comma
+# separated HOST[:PORT] (e.g. "replica-1,replica-2:5433"). Reads of
+# safe-method API requests and of the analytics commands go to a replica
+# lagging less than REPLICA_MAX_LAG seconds (checked every
+# REPLICA_LAG_CHECK_INTERVAL seconds), and clients read from the primary for
+# REPLICA_PIN_SECONDS after a write.
+for index, replica in enumerate(
+    filter(None, os.getenv("DATABASE_REPLICA_HOSTS", "").split(",")), start=1
+):
+    replica_host, _, replica_port = replica.strip().partition(":")
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": replica_host,
+        "PORT": replica_port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["traffic_monitor.db_router.ReplicaRouter"]
+REPLICA_MAX_LAG = float(os.environ.get("REPLICA_MAX_LAG", 5))
+REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get("REPLICA_LAG_CHECK_INTERVAL", 1))
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory (per process) by default. Set CACHE_BACKEND and CACHE_LOCATION to a
+# shared backend (e.g. django.core.cache.backends.redis.RedisCache and
+# redis://redis:6379/0) so workers share cached responses.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -119,6 +185,99 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 25,
 }
 
+# Number of license plates kept in the in-process car id cache used
+# by the traffic record ingestion.
+CAR_CACHE_SIZE = int(os.environ.get("CAR_CACHE_SIZE", 10000))
+
+# Traffic records posted in a single request are validated and saved
+# in chunks of this size, each one in its own transaction.
+TRAFFIC_RECORD_CHUNK_SIZE = int(os.environ.get("TRAFFIC_RECORD_CHUNK_SIZE", 1000))
+
+# Requests posting more traffic records than this are answered with the
+# ids of the created records instead of the serialized records, so large
+# batches don't build the whole response in memory.
+TRAFFIC_RECORD_SERIALIZE_LIMIT = int(
+    os.environ.get("TRAFFIC_RECORD_SERIALIZE_LIMIT", 1000)
+)
+
+# Maximum number of queued traffic records the process_ingest_queue
+# command merges and ingests together.
+INGEST_QUEUE_MAX_RECORDS = int(os.environ.get("INGEST_QUEUE_MAX_RECORDS", 10000))
+
+# Seconds after which a batch still marked as processing is considered
+# abandoned by a crashed worker and claimed again.
+INGEST_QUEUE_CLAIM_TIMEOUT = int(os.environ.get("INGEST_QUEUE_CLAIM_TIMEOUT", 60 * 10))
+
+# Seconds a traffic record response is kept in the database to answer
+# requests replayed with the same Idempotency-Key header.
+IDEMPOTENCY_KEY_TTL = int(os.environ.get("IDEMPOTENCY_KEY_TTL", 60 * 60 * 24))
+
+# Seconds after which a key still held by a request is considered abandoned
+# by a crashed worker and can be claimed by a retry.
+IDEMPOTENCY_KEY_CLAIM_TIMEOUT = int(
+    os.environ.get("IDEMPOTENCY_KEY_CLAIM_TIMEOUT", 60 * 10)
+)
+
+# Default maximum minutes between two consecutive sightings of a car for
+# them to count as a trip in the origin-destination matrix, seconds a
+# computed matrix is kept in the database, and seconds the default end of
+# the window is rounded down to, so requests without `to` share matrices.
+OD_MATRIX_MAX_GAP = int(os.environ.get("OD_MATRIX_MAX_GAP", 60))
+OD_MATRIX_CACHE_TTL = int(os.environ.get("OD_MATRIX_CACHE_TTL", 60 * 15))
+OD_MATRIX_WINDOW_BUCKET = int(os.environ.get("OD_MATRIX_WINDOW_BUCKET", 60 * 5))
+
+# Sensor statistics are accumulated in memory during ingestion and written
+# every SENSOR_STATS_FLUSH_INTERVAL seconds by a timer, or on every ingestion
+# when it is 0. The per-minute throughput is kept for
+# SENSOR_THROUGHPUT_RETENTION minutes, and the health endpoint averages it
+# over the last SENSOR_HEALTH_WINDOW minutes.
+SENSOR_STATS_FLUSH_INTERVAL = int(os.environ.get("SENSOR_STATS_FLUSH_INTERVAL", 10))
+SENSOR_THROUGHPUT_RETENTION = int(os.environ.get("SENSOR_THROUGHPUT_RETENTION", 60))
+SENSOR_HEALTH_WINDOW = int(os.environ.get("SENSOR_HEALTH_WINDOW", 5))
+
+# Speed (km/h) assumed for road segments without speed readings when
+# estimating travel times, and seconds the latest speeds are cached: new
+# speed readings are only taken into account by routes after this delay.
+ROUTE_DEFAULT_SPEED = float(os.environ.get("ROUTE_DEFAULT_SPEED", 50))
+ROUTE_SPEED_TTL = int(os.environ.get("ROUTE_SPEED_TTL", 60))
+
+# Congestion anomaly detection: the latest speed reading of a road segment is
+# compared with the EWMA (ANOMALY_ALPHA) of its previous ANOMALY_WINDOW readings
+# from the last ANOMALY_LOOKBACK_HOURS, and flagged when its z-score is below
+# -ANOMALY_Z_THRESHOLD. Segments with fewer than ANOMALY_MIN_READINGS readings
+# are skipped, and ANOMALY_MIN_STD (km/h) keeps flat baselines from flagging noise.
+ANOMALY_LOOKBACK_HOURS = int(os.environ.get("ANOMALY_LOOKBACK_HOURS", 24))
+ANOMALY_WINDOW = int(os.environ.get("ANOMALY_WINDOW", 48))
+ANOMALY_ALPHA = float(os.environ.get("ANOMALY_ALPHA", 0.2))
+ANOMALY_Z_THRESHOLD = float(os.environ.get("ANOMALY_Z_THRESHOLD", 3.0))
+ANOMALY_MIN_READINGS = int(os.environ.get("ANOMALY_MIN_READINGS", 5))
+ANOMALY_MIN_STD = float(os.environ.get("ANOMALY_MIN_STD", 2.0))
+
+# Short-term speed forecasting: the daily profile of a road segment is the EWMA
+# (FORECAST_ALPHA) of each 15-minute slot over the last FORECAST_HISTORY_DAYS days,
+# corrected by the EWMA (FORECAST_LEVEL_ALPHA) of the last FORECAST_RECENT_BUCKETS
+# residuals, damped by FORECAST_DAMPING per 15 minutes ahead.
+FORECAST_HISTORY_DAYS = int(os.environ.get("FORECAST_HISTORY_DAYS", 7))
+FORECAST_ALPHA = float(os.environ.get("FORECAST_ALPHA", 0.3))
+FORECAST_RECENT_BUCKETS = int(os.environ.get("FORECAST_RECENT_BUCKETS", 8))
+FORECAST_LEVEL_ALPHA = float(os.environ.get("FORECAST_LEVEL_ALPHA", 0.5))
+FORECAST_DAMPING = float(os.environ.get("FORECAST_DAMPING", 0.8))
+
+# Number of road segments aggregated per json_agg chunk when PostGIS
+# builds the road segment FeatureCollection (?format=geojson).
+GEOJSON_CHUNK_SIZE = int(os.environ.get("GEOJSON_CHUNK_SIZE", 1000))
+
+# Response compression: responses shorter than COMPRESSION_MIN_SIZE bytes are
+# sent as is, others with brotli (at BROTLI_QUALITY, 0-11) or gzip.
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", 4))
+
+# Road segment responses are cached for RESPONSE_CACHE_TTL seconds (keys change
+# on every write). Workers wait up to RESPONSE_CACHE_LOCK_TIMEOUT seconds for the
+# one computing a missing entry.
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 300))
+RESPONSE_CACHE_LOCK_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_LOCK_TIMEOUT", 10))
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Traffic Monitor API",
     "DESCRIPTION": "Traffic Monitor API",
@@ -143,6 +302,19 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# collectstatic gathers the static files (admin, API browser) in STATIC_ROOT,
+# with gzip and brotli copies, and WhiteNoise serves them from the app server.
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedStaticFilesStorage",
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -11,5 +11,8 @@ done
 echo "PostgreSQL is up - applying migrations..."
 python manage.py migrate
 
-echo "Starting Django server..."
+echo "Collecting static files..."
+python manage.py collectstatic --noinput
+
+echo "Starting server..."
 exec "$@"
@@ -0,0 +1,54 @@
+"""
+Gunicorn configuration of the production server, loaded automatically by
+`gunicorn` when started from the project directory.
+
+For more information on the settings, see
+https://docs.gunicorn.org/en/stable/settings.html
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# The views are synchronous, so the default is threaded WSGI workers:
+# GUNICORN_WORKERS processes serving GUNICORN_THREADS requests at a time each,
+# every thread keeping its own database connection (see DATABASE_CONN_MAX_AGE).
+# GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker serves core.asgi instead.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+wsgi_app = (
+    "core.asgi:application"
+    if "uvicorn" in worker_class.lower()
+    else "core.wsgi:application"
+)
+
+# Seconds before a silent worker is killed and restarted, seconds it gets to
+# finish its requests on restart, and seconds an idle keep-alive connection
+# is held open (raise it behind a load balancer with longer idle timeouts).
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+# Workers are restarted after serving GUNICORN_MAX_REQUESTS requests (plus a
+# random jitter so they don't all restart together) to bound memory growth.
+# 0 disables restarts.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+# Restart workers when the code changes, for development only.
+reload = os.environ.get("GUNICORN_RELOAD", "false").lower() in ("1", "true", "yes")
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def worker_exit(server, worker):
+    # Writes the sensor statistics still buffered in memory by the worker
+    from django.db import connections
+    from traffic_monitor.utils.sensor_stats import sensor_stats
+
+    sensor_stats.flush()
+    connections.close_all()
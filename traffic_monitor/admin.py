@@ -6,6 +6,7 @@ from traffic_monitor.models import (
     Car,
     Sensor,
     TrafficRecord,
+    IngestBatch,
 )
 
 
@@ -40,9 +41,14 @@ class TrafficRecordAdmin(admin.ModelAdmin):
     pass
 
 
+class IngestBatchAdmin(admin.ModelAdmin):
+    list_display = ["id", "status", "record_count", "created_at", "processed_at"]
+
+
 admin.site.register(RoadSegment, RoadSegmentAdmin)
 admin.site.register(SpeedReading, SpeedReadingAdmin)
 admin.site.register(TrafficClassification, TrafficClassificationAdmin)
 admin.site.register(Car, CarAdmin)
 admin.site.register(Sensor, SensorAdmin)
 admin.site.register(TrafficRecord, TrafficRecordAdmin)
+admin.site.register(IngestBatch, IngestBatchAdmin)
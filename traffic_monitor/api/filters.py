@@ -1,6 +1,9 @@
 import django_filters
-from django.db.models import OuterRef, Subquery, Count
-from traffic_monitor.models import RoadSegment, SpeedReading, TrafficClassification
+from traffic_monitor.models import (
+    RoadSegment,
+    TrafficClassification,
+    SpeedAnomaly,
+)
 
 
 class RoadSegmentFilter(django_filters.FilterSet):
@@ -17,17 +20,18 @@ class RoadSegmentFilter(django_filters.FilterSet):
         except TrafficClassification.DoesNotExist:
             return queryset.none()
 
-        latest_speed_subquery = (
-            SpeedReading.objects.filter(road_segment=OuterRef("pk"))
-            .order_by("-created_at")
-            .values("speed")[:1]
-        )
-
-        queryset = queryset.annotate(
-            latest_speed=Subquery(latest_speed_subquery),
-            speed_reading_count=Count("speed_readings"),
-        ).prefetch_related("speed_readings")
+        queryset = queryset.with_latest_speed()
 
         min_speed = classification.min_speed or 0
         max_speed = classification.max_speed or float("inf")
         return queryset.filter(latest_speed__gte=min_speed, latest_speed__lte=max_speed)
+
+
+class SpeedAnomalyFilter(django_filters.FilterSet):
+    since = django_filters.IsoDateTimeFilter(
+        field_name="detected_at", lookup_expr="gte"
+    )
+
+    class Meta:
+        model = SpeedAnomaly
+        fields = ["road_segment"]
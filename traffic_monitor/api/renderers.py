@@ -0,0 +1,50 @@
+import msgpack
+import orjson
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+
+class ORJSONRenderer(renderers.BaseRenderer):
+    """
+    JSON renderer encoding with orjson, selected with `?format=fastjson`.
+    Datetimes are rendered in UTC with a `Z` suffix, like DRF does with TIME_ZONE = "UTC".
+    """
+
+    media_type = "application/json"
+    format = "fastjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return orjson.dumps(
+            data,
+            default=encoders.JSONEncoder().default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+        )
+
+
+class GeoJSONRenderer(renderers.JSONRenderer):
+    """
+    Selected with `?format=geojson` by views streaming a FeatureCollection built by PostGIS.
+    Any other response (e.g. errors) is rendered as regular JSON.
+    """
+
+    media_type = "application/geo+json"
+    format = "geojson"
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """
+    MessagePack renderer, selected with `Accept: application/msgpack` or `?format=msgpack`.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=encoders.JSONEncoder().default)
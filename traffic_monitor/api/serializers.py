@@ -1,17 +1,73 @@
-from traffic_monitor.models import RoadSegment, SpeedReading, Car, Sensor, TrafficRecord
+from traffic_monitor.models import (
+    RoadSegment,
+    SpeedReading,
+    Car,
+    Sensor,
+    TrafficRecord,
+    IngestBatch,
+    SpeedAnomaly,
+    TrafficClassification,
+)
 from rest_framework import serializers
 from rest_framework_gis.serializers import GeoFeatureModelSerializer
 from rest_framework_gis.fields import GeometryField
 
 
-class RoadSegmentSerializer(GeoFeatureModelSerializer):
+class SparseFieldsMixin:
+    """
+    Keeps only the fields listed in the `sparse_fields` context entry, when set.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        sparse_fields = self.context.get("sparse_fields")
+        if sparse_fields is not None:
+            for name in list(self.fields):
+                if name not in sparse_fields:
+                    self.drop_field(name)
+
+    def drop_field(self, name):
+        self.fields.pop(name)
+
+
+class NullGeometryField(serializers.Field):
+    """
+    Read-only field rendering a null geometry without reading the instance.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return None
+
+    def to_representation(self, value):
+        return None
+
+
+class CachedGeometryField(GeometryField):
+    """
+    Geometry field rendering the GeoJSON precomputed in `<source>_geojson` when it's loaded.
+    """
+
+    def get_attribute(self, instance):
+        cached = f"{self.source}_geojson"
+        if cached not in instance.get_deferred_fields():
+            geojson = getattr(instance, cached, None)
+            if geojson is not None:
+                return geojson
+        return super().get_attribute(instance)
+
+
+class RoadSegmentSerializer(SparseFieldsMixin, GeoFeatureModelSerializer):
     speed_records = serializers.SerializerMethodField()
     traffic_classification = serializers.SerializerMethodField()
-    coordinate = GeometryField()
+    coordinate = CachedGeometryField()
 
     class Meta:
         model = RoadSegment
-        fields = "__all__"
+        exclude = ["coordinate_geojson"]
         geo_field = "coordinate"
 
     def validate_coordinate(self, value):
@@ -24,15 +80,32 @@ class RoadSegmentSerializer(GeoFeatureModelSerializer):
 
         return value
 
+    def drop_field(self, name):
+        # The GeoJSON feature always has an id and a (possibly null) geometry
+        if name == self.Meta.geo_field:
+            self.fields[name] = NullGeometryField()
+        elif name != "id":
+            super().drop_field(name)
+
     def get_speed_records(self, obj):
-        return obj.speed_readings.count()
+        count = getattr(obj, "speed_reading_count", None)
+        return obj.speed_readings.count() if count is None else count
 
     def get_traffic_classification(self, obj):
-        classification = obj.current_speed_classification()
+        if hasattr(obj, "latest_speed"):
+            if obj.latest_speed is None:
+                return None
+            if not hasattr(self, "_classifications"):
+                self._classifications = list(TrafficClassification.objects.all())
+            classification = TrafficClassification.for_speed(
+                obj.latest_speed, self._classifications
+            )
+        else:
+            classification = obj.current_speed_classification()
         return classification.name if classification else None
 
 
-class SpeedReadingSerializer(serializers.ModelSerializer):
+class SpeedReadingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = SpeedReading
         fields = "__all__"
@@ -52,11 +125,22 @@ class SensorSerializer(serializers.ModelSerializer):
 
 class TrafficRecordListSerializer(serializers.ListSerializer):
     def create(self, validated_data):
-        records = [TrafficRecord(**item) for item in validated_data]
-        return TrafficRecord.objects.bulk_create(records)
+        """
+        Records that already exist are skipped and keep a None primary key.
+        """
+        records = [
+            TrafficRecord(
+                car_id=item["car"],
+                sensor_id=item["sensor"],
+                road_segment_id=item["road_segment"],
+                timestamp=item["timestamp"],
+            )
+            for item in validated_data
+        ]
+        return TrafficRecord.objects.bulk_create_ignore_duplicates(records)
 
 
-class TrafficRecordSerializer(serializers.ModelSerializer):
+class TrafficRecordSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     car = serializers.PrimaryKeyRelatedField(queryset=Car.objects.all())
     sensor = serializers.PrimaryKeyRelatedField(queryset=Sensor.objects.all())
     road_segment = serializers.PrimaryKeyRelatedField(
@@ -67,4 +151,33 @@ class TrafficRecordSerializer(serializers.ModelSerializer):
         model = TrafficRecord
         fields = "__all__"
         depth = 1
+        # Replayed records are skipped on insert, not rejected as duplicates
+        validators = []
+
+
+class TrafficRecordIngestSerializer(serializers.Serializer):
+    """
+    Validates traffic records whose car, sensor and road segment were already
+    resolved to existing ids in bulk (see prepare_traffic_records), so no
+    related object is fetched per record.
+    """
+
+    car = serializers.IntegerField(min_value=1)
+    sensor = serializers.IntegerField(min_value=1)
+    road_segment = serializers.IntegerField(min_value=1)
+    timestamp = serializers.DateTimeField()
+
+    class Meta:
         list_serializer_class = TrafficRecordListSerializer
+
+
+class IngestBatchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = IngestBatch
+        exclude = ["payload"]
+
+
+class SpeedAnomalySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = SpeedAnomaly
+        fields = "__all__"
@@ -5,6 +5,17 @@ from traffic_monitor.api.views import (
     SpeedReadingListView,
     SpeedReadingDetailView,
     TrafficRecordListView,
+    IngestBatchDetailView,
+    CarTrajectoryView,
+    RoadSegmentFlowView,
+    RoadSegmentsFlowView,
+    RoadSegmentForecastView,
+    ODMatrixView,
+    SensorHealthView,
+    RouteView,
+    RouteETAView,
+    SpeedAnomalyListView,
+    DatabasePoolStatsView,
 )
 from drf_spectacular.views import SpectacularSwaggerView
 
@@ -15,6 +26,21 @@ urlpatterns = [
         RoadSegmentDetailView.as_view(),
         name="road-segment-detail",
     ),
+    path(
+        "road_segments/flow/",
+        RoadSegmentsFlowView.as_view(),
+        name="road-segments-flow",
+    ),
+    path(
+        "road_segments/<int:pk>/flow/",
+        RoadSegmentFlowView.as_view(),
+        name="road-segment-flow",
+    ),
+    path(
+        "road_segments/<int:pk>/forecast/",
+        RoadSegmentForecastView.as_view(),
+        name="road-segment-forecast",
+    ),
     path("speed_readings/", SpeedReadingListView.as_view(), name="speed-reading-list"),
     path(
         "speed_readings/<int:pk>/",
@@ -22,5 +48,21 @@ urlpatterns = [
         name="speed-reading-detail",
     ),
     path("traffic_records/", TrafficRecordListView.as_view(), name="traffic-records"),
+    path(
+        "traffic_records/batches/<int:pk>/",
+        IngestBatchDetailView.as_view(),
+        name="ingest-batch-detail",
+    ),
+    path(
+        "cars/<str:license_plate>/trajectory/",
+        CarTrajectoryView.as_view(),
+        name="car-trajectory",
+    ),
+    path("sensors/health/", SensorHealthView.as_view(), name="sensor-health"),
+    path("routes/", RouteView.as_view(), name="route"),
+    path("routes/eta/", RouteETAView.as_view(), name="route-eta"),
+    path("anomalies/", SpeedAnomalyListView.as_view(), name="speed-anomaly-list"),
+    path("od_matrix/", ODMatrixView.as_view(), name="od-matrix"),
+    path("db/pool/", DatabasePoolStatsView.as_view(), name="db-pool-stats"),
     path("docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
 ]
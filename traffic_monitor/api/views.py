@@ -1,34 +1,263 @@
 import datetime
-from django.db.models import Q
+import hashlib
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.functional import cached_property
+from django.utils.http import http_date
+from django.utils import timezone
+from django.http import StreamingHttpResponse
+from django.views.decorators.http import condition
+from django.db.models import F, Q, Sum
 from rest_framework import generics
 from traffic_monitor.models import (
     RoadSegment,
     SpeedReading,
     TrafficRecord,
+    IngestBatch,
+    Sensor,
+    SensorThroughput,
+    SpeedAnomaly,
+    SpeedForecast,
+    TrafficClassification,
 )
 from rest_framework.response import Response
 from traffic_monitor.api.serializers import (
     RoadSegmentSerializer,
     SpeedReadingSerializer,
     TrafficRecordSerializer,
+    IngestBatchSerializer,
+    SpeedAnomalySerializer,
 )
 from rest_framework.permissions import DjangoModelPermissionsOrAnonReadOnly
+from rest_framework.settings import api_settings
+from traffic_monitor.api.parsers import MessagePackParser
+from traffic_monitor.api.renderers import (
+    GeoJSONRenderer,
+    MessagePackRenderer,
+    ORJSONRenderer,
+)
 from drf_spectacular.utils import (
     extend_schema,
     OpenApiParameter,
     OpenApiTypes,
     OpenApiResponse,
 )
-from traffic_monitor.utils.api_key_authentication import HasAPIKeyOrReadOnly
-from traffic_monitor.utils.traffic_records_helper import (
-    get_or_create_car_dict,
-    get_valide_uuids,
+from traffic_monitor.utils.api_key_authentication import (
+    HasAPIKeyOrReadOnly,
+    HasAPIKeyOrIsStaff,
+)
+from traffic_monitor.utils import idempotency
+from traffic_monitor.utils.db_pool import connection_stats
+from traffic_monitor.utils.forecasting import HORIZONS
+from traffic_monitor.utils.geojson import stream_feature_collection
+from traffic_monitor.utils.ingest_queue import enqueue_traffic_records
+from traffic_monitor.utils.od_matrix import default_window_end, get_od_matrix
+from traffic_monitor.utils.query_params import parse_query_datetime
+from traffic_monitor.utils.route_graph import route_graph
+from traffic_monitor.utils.segment_flow import FLOW_BUCKETS, segment_flow
+from traffic_monitor.utils.response_cache import get_or_compute
+from traffic_monitor.utils.table_versions import (
+    row_version_key,
+    table_version_key,
+    table_version_stamps,
+    table_versions,
+    version_stamps,
 )
+from traffic_monitor.utils.traffic_records_helper import save_traffic_records
 from django_filters.rest_framework import DjangoFilterBackend
-from traffic_monitor.api.filters import RoadSegmentFilter
+from traffic_monitor.api.filters import RoadSegmentFilter, SpeedAnomalyFilter
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag / Last-Modified to GET responses from the versions of the
+    `version_models` tables, bumped in the transaction of every write to them,
+    and answers a matching If-None-Match with a 304 before running any other query.
+    The ETag also covers the query string and the rendered media type.
+    Last-Modified is informative only: with its one second precision it can't
+    tell apart writes within the same second, so If-Modified-Since is ignored.
+    """
+
+    version_models: tuple = ()
+
+    def conditional_get_enabled(self, request) -> bool:
+        return True
+
+    def get(self, request, *args, **kwargs):
+        if not self.conditional_get_enabled(request):
+            return super().get(request, *args, **kwargs)
+
+        versions, last_modified = table_version_stamps(self.version_models)
+        etag = hashlib.md5(
+            f"{versions}:{request.get_full_path()}:{request.accepted_media_type}".encode()
+        ).hexdigest()
+        response = condition(etag_func=lambda *args, **kwargs: etag)(super().get)(
+            request, *args, **kwargs
+        )
+        if last_modified is not None and response.status_code == 200:
+            response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
+
+
+class ResponseCacheMixin:
+    """
+    Caches GET responses (data, status and headers) for RESPONSE_CACHE_TTL seconds under
+    a key made of the full URL and the versions returned by `get_cache_versions()`,
+    those of the `version_models` tables by default, so a write to the underlying
+    data moves readers to a new key.
+    A missing entry is computed by a single worker while the others wait for it.
+    """
+
+    version_models: tuple = ()
+
+    def response_cache_enabled(self, request) -> bool:
+        return True
+
+    def get_cache_versions(self) -> list:
+        if not self.version_models:
+            raise ImproperlyConfigured(
+                f"{type(self).__name__} must set version_models or override "
+                "get_cache_versions()."
+            )
+        return table_versions(self.version_models)
+
+    def get(self, request, *args, **kwargs):
+        if not self.response_cache_enabled(request):
+            return super().get(request, *args, **kwargs)
+
+        versions = self.get_cache_versions()
+        key = (
+            "response:"
+            + hashlib.md5(
+                f"{versions}:{request.build_absolute_uri()}".encode()
+            ).hexdigest()
+        )
+        view_get = super().get
+
+        def compute():
+            response = view_get(request, *args, **kwargs)
+            # The content type is set by the renderer of each request
+            headers = {
+                name: value
+                for name, value in response.items()
+                if name != "Content-Type"
+            }
+            return response.data, response.status_code, headers
+
+        data, status, headers = get_or_compute(key, compute)
+        return Response(data, status=status, headers=headers)
+
+
+SPARSE_FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        name="fields",
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+        description="Comma separated fields to keep in the response.",
+    ),
+    OpenApiParameter(
+        name="omit",
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+        description="Comma separated fields to drop from the response.",
+    ),
+]
+
+
+class SparseFieldsMixin:
+    """
+    Lets list clients keep only some fields with `?fields=id,speed` or drop some with `?omit=...`.
+    Unrequested serializer fields are removed, their model columns (except the primary key) are deferred and
+    `annotate_fields()` only adds the annotations needed by the requested fields.
+    `field_columns` maps the fields not read from the model column of the same name.
+    """
+
+    field_columns: dict = {}
+
+    @cached_property
+    def sparse_fields(self) -> list | None:
+        """
+        Returns the requested serializer field names, or None when all fields are requested.
+        """
+        request = getattr(self, "request", None)
+        if request is None or request.method not in ("GET", "HEAD"):
+            return None
+        params = request.query_params
+        if "fields" not in params and "omit" not in params:
+            return None
+
+        names = list(self.get_serializer_class()().fields)
+        if "fields" in params:
+            requested = set(params["fields"].split(","))
+            names = [name for name in names if name in requested]
+        omitted = set(params.get("omit", "").split(","))
+        return [name for name in names if name not in omitted]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["sparse_fields"] = self.sparse_fields
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.sparse_fields
+        if fields is not None:
+            # The primary key is always loaded, so fields computed only from
+            # annotations still defer every model column
+            opts = queryset.model._meta
+            concrete = {field.name for field in opts.concrete_fields}
+            columns = [
+                column
+                for name in fields
+                for column in self.field_columns.get(name, [name])
+                if column in concrete
+            ]
+            queryset = queryset.only(opts.pk.name, *columns)
+        return self.annotate_fields(queryset, fields)
+
+    def annotate_fields(self, queryset, fields: list | None):
+        """
+        Adds the annotations needed by the requested fields (all of them when None).
+        """
+        return queryset
+
+
+class FastListMixin:
+    """
+    Lists rows built from `.values_list()` tuples instead of serializer instances
+    when the orjson renderer is selected (`?format=fastjson`), with the same output schema.
+    `fast_fields` maps each serializer field to its queryset lookup, in the serializer's order.
+    """
+
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, ORJSONRenderer]
+    fast_fields: dict = {}
+    sparse_fields = None
 
+    def list(self, request, *args, **kwargs):
+        if not isinstance(request.accepted_renderer, ORJSONRenderer):
+            return super().list(request, *args, **kwargs)
 
-class RoadSegmentListView(generics.ListCreateAPIView):
+        fields = {
+            name: lookup
+            for name, lookup in self.fast_fields.items()
+            if self.sparse_fields is None or name in self.sparse_fields
+        }
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values_list(*fields.values() or ["pk"])
+        page = self.paginate_queryset(rows)
+        names = list(fields)
+        data = [dict(zip(names, row)) for row in (rows if page is None else page)]
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+
+class RoadSegmentListView(
+    ConditionalGetMixin,
+    ResponseCacheMixin,
+    SparseFieldsMixin,
+    generics.ListCreateAPIView,
+):
     """
     API endpoint for listing and creating road segments with optional traffic classification filtering.
 
@@ -47,6 +276,14 @@ class RoadSegmentListView(generics.ListCreateAPIView):
     - HIGH
     - MEDIUM
     - LOW
+
+    ### Sparse Fieldsets
+    `fields` (e.g. `?fields=id,traffic_classification`) keeps only the listed fields, `omit` drops them.
+    Omitting `coordinate` renders features with a null geometry, without loading it.
+
+    ### Full Layer Download
+    `?format=geojson` streams every road segment matching the filters (no pagination) as a single
+    FeatureCollection built by PostGIS, with the same features as the paginated list.
     """
 
     serializer_class = RoadSegmentSerializer
@@ -54,6 +291,49 @@ class RoadSegmentListView(generics.ListCreateAPIView):
     queryset = RoadSegment.objects.all()
     filter_backends = [DjangoFilterBackend]
     filterset_class = RoadSegmentFilter
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, GeoJSONRenderer]
+    version_models = (RoadSegment, SpeedReading, TrafficClassification)
+    # Geometries are rendered from their precomputed GeoJSON
+    field_columns = {"coordinate": ["coordinate_geojson"]}
+    geojson_properties = {
+        "speed_records": "speed_reading_count",
+        "traffic_classification": "traffic_classification",
+        "road_length": "road_length",
+    }
+
+    def response_cache_enabled(self, request) -> bool:
+        return not isinstance(request.accepted_renderer, GeoJSONRenderer)
+
+    def list(self, request, *args, **kwargs):
+        if not isinstance(request.accepted_renderer, GeoJSONRenderer):
+            return super().list(request, *args, **kwargs)
+
+        fields = self.sparse_fields
+        if fields is None:
+            fields = list(self.get_serializer_class()().fields)
+        queryset = self.filter_queryset(self.get_queryset())
+        if "traffic_classification" in fields:
+            queryset = queryset.with_traffic_classification()
+
+        properties = {
+            name: F(column)
+            for name, column in self.geojson_properties.items()
+            if name in fields
+        }
+        geo_field = "coordinate" if "coordinate" in fields else None
+        return StreamingHttpResponse(
+            stream_feature_collection(queryset, properties, geo_field),
+            content_type=GeoJSONRenderer.media_type,
+        )
+
+    def annotate_fields(self, queryset, fields):
+        if fields is None:
+            queryset = queryset.defer("coordinate")
+        if fields is None or "speed_records" in fields:
+            queryset = queryset.with_speed_reading_count()
+        if fields is None or "traffic_classification" in fields:
+            queryset = queryset.with_latest_speed()
+        return queryset
 
     @extend_schema(
         parameters=[
@@ -63,13 +343,16 @@ class RoadSegmentListView(generics.ListCreateAPIView):
                 location=OpenApiParameter.QUERY,
                 description="Filter by: HIGH, MEDIUM, LOW",
             ),
+            *SPARSE_FIELDS_PARAMETERS,
         ]
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
 
-class RoadSegmentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class RoadSegmentDetailView(
+    ConditionalGetMixin, ResponseCacheMixin, generics.RetrieveUpdateDestroyAPIView
+):
     """
     API endpoint for retrieving, updating or deleting road segments.
 
@@ -89,6 +372,16 @@ class RoadSegmentDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = RoadSegment.objects.all()
     serializer_class = RoadSegmentSerializer
     permission_classes = [DjangoModelPermissionsOrAnonReadOnly]
+    version_models = (RoadSegment, SpeedReading, TrafficClassification)
+
+    def get_cache_versions(self) -> list:
+        versions, _ = version_stamps(
+            [
+                row_version_key(RoadSegment, self.kwargs["pk"]),
+                table_version_key(TrafficClassification),
+            ]
+        )
+        return versions
 
     @extend_schema(
         responses={
@@ -153,13 +446,21 @@ class RoadSegmentDetailView(generics.RetrieveUpdateDestroyAPIView):
         return super().delete(request, *args, **kwargs)
 
 
-class SpeedReadingListView(generics.ListCreateAPIView):
+class SpeedReadingListView(
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    FastListMixin,
+    generics.ListCreateAPIView,
+):
     """
     API endpoint for listing and creating speed readings.
 
     ### List Speed Readings
     Returns a list of all speed readings recorded in the system.
 
+    Add `?format=fastjson` to render the list with orjson straight from the database rows,
+    and `?fields=` or `?omit=` (comma separated) to keep or drop fields.
+
     ### Create Speed Reading
     Records a new speed reading for a specific road segment.
     """
@@ -167,8 +468,16 @@ class SpeedReadingListView(generics.ListCreateAPIView):
     queryset = SpeedReading.objects.all()
     serializer_class = SpeedReadingSerializer
     permission_classes = [DjangoModelPermissionsOrAnonReadOnly]
+    version_models = (SpeedReading,)
+    fast_fields = {
+        "id": "id",
+        "speed": "speed",
+        "created_at": "created_at",
+        "road_segment": "road_segment_id",
+    }
 
     @extend_schema(
+        parameters=SPARSE_FIELDS_PARAMETERS,
         responses={
             200: OpenApiResponse(
                 response=SpeedReadingSerializer(many=True),
@@ -177,7 +486,7 @@ class SpeedReadingListView(generics.ListCreateAPIView):
             400: OpenApiResponse(
                 description="Bad Request",
             ),
-        }
+        },
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
@@ -197,7 +506,9 @@ class SpeedReadingListView(generics.ListCreateAPIView):
         return super().post(request, *args, **kwargs)
 
 
-class SpeedReadingDetailView(generics.RetrieveUpdateDestroyAPIView):
+class SpeedReadingDetailView(
+    ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView
+):
     """
     API endpoint for retrieving, updating or deleting speed readings.
 
@@ -217,6 +528,7 @@ class SpeedReadingDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = SpeedReading.objects.all()
     serializer_class = SpeedReadingSerializer
     permission_classes = [DjangoModelPermissionsOrAnonReadOnly]
+    version_models = (SpeedReading,)
 
     @extend_schema(
         responses={
@@ -281,7 +593,12 @@ class SpeedReadingDetailView(generics.RetrieveUpdateDestroyAPIView):
         return super().delete(request, *args, **kwargs)
 
 
-class TrafficRecordListView(generics.ListCreateAPIView):
+class TrafficRecordListView(
+    ConditionalGetMixin,
+    SparseFieldsMixin,
+    FastListMixin,
+    generics.ListCreateAPIView,
+):
     """
     API endpoint for listing and creating Traffic Records.
 
@@ -290,6 +607,8 @@ class TrafficRecordListView(generics.ListCreateAPIView):
 
     **Query Parameters:**
     - `license_plate`: Filter traffic records by car license plate (only records from the last 24 hours are returned if this is provided).
+    - `format`: `fastjson` to render the list with orjson straight from the database rows.
+    - `fields` / `omit`: Comma separated fields to keep / drop.
 
     ### Create Traffic Records (chunks)
     Accepts a list of traffic records in chunks. Each object must include:
@@ -298,104 +617,803 @@ class TrafficRecordListView(generics.ListCreateAPIView):
     - `road_segment` (ID)
     - `timestamp`
 
+    Large payloads are processed in chunks of `TRAFFIC_RECORD_CHUNK_SIZE` records, each one saved in its own transaction.
+    A chunk that can't be saved is rolled back as a whole and reported in the `failed_chunks` field
+    (`start` and `end` indexes of the payload), while every other chunk stays committed.
+    Payloads of more than `TRAFFIC_RECORD_SERIALIZE_LIMIT` records are answered as with `ack=ids`.
+
+    **Query Parameters:**
+    - `ack`: `count` or `ids` to acknowledge the request with only the number or the ids of the created records,
+    instead of the serialized records.
+
+    - `async`: `true` to queue the records and return `202 Accepted` with a `batch_id` right away.
+    The queue is drained by the `process_ingest_queue` command, and the outcome of each batch is
+    available on `/api/traffic_records/batches/{batch_id}/`.
+
+    Records already stored (same sensor, car, road segment and timestamp) are skipped, so retried batches
+    don't create duplicates. A batch sent again by the same client with an `Idempotency-Key` header
+    that was already accepted gets the response of the first request back, for `IDEMPOTENCY_KEY_TTL`
+    seconds. Reusing the key with another payload returns `422`, and while the first request is still
+    being processed, `409`.
+
+    ### MessagePack
+    Records can be posted with `Content-Type: application/msgpack` and read with
+    `Accept: application/msgpack`, with the same structure as the JSON payloads.
+
     ### Any attempt to post against this endpoint must include an **API-Key**
-    Records missing any of the required related objects will be skipped and returned in the `invalid_inputs` field of the response.
+    Records missing any of the required related objects, or with invalid data, will be skipped and returned in the `invalid_inputs` field of the response.
     """
 
     serializer_class = TrafficRecordSerializer
     permission_classes = [HasAPIKeyOrReadOnly]
+    renderer_classes = [*FastListMixin.renderer_classes, MessagePackRenderer]
+    parser_classes = [*api_settings.DEFAULT_PARSER_CLASSES, MessagePackParser]
+    version_models = (TrafficRecord,)
+    fast_fields = {
+        "id": "id",
+        "car": "car_id",
+        "sensor": "sensor_id",
+        "road_segment": "road_segment_id",
+        "timestamp": "timestamp",
+    }
+
+    def conditional_get_enabled(self, request) -> bool:
+        # The license plate filter covers a sliding 24 hours window
+        return "license_plate" not in request.query_params
 
     def get_queryset(self):
         license_plate = self.request.query_params.get("license_plate", None)
 
-        traffic_records = TrafficRecord.objects.all().select_related(
-            "car", "sensor", "road_segment"
-        )
+        # Related objects are rendered as ids, so they are never joined
+        traffic_records = TrafficRecord.objects.all()
 
         if license_plate:
             date_range = datetime.datetime.now() - datetime.timedelta(days=1)
-            traffic_records = TrafficRecord.objects.filter(
+            traffic_records = traffic_records.filter(
                 Q(car__license_plate=license_plate) & Q(timestamp__gte=date_range)
             )
         return traffic_records
 
     @extend_schema(
+        parameters=SPARSE_FIELDS_PARAMETERS,
         responses={
             200: OpenApiResponse(
                 response=TrafficRecordSerializer(many=True),
                 description="List of traffic records",
             )
-        }
+        },
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
     @extend_schema(
         request=TrafficRecordSerializer(many=True),
+        parameters=[
+            OpenApiParameter(
+                name="ack",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                enum=["count", "ids"],
+                description="Return only the number (count) or the ids (ids) of the created records.",
+            ),
+            OpenApiParameter(
+                name="Idempotency-Key",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.HEADER,
+                description="Replaying a batch with the same key returns the first response.",
+            ),
+            OpenApiParameter(
+                name="async",
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description="Queue the records to be ingested later and return the batch id.",
+            ),
+        ],
         responses={
             201: OpenApiResponse(
                 description="Traffic records created successfully. Some inputs may be invalid.",
             ),
+            202: OpenApiResponse(
+                description="Traffic records queued for ingestion (async mode).",
+            ),
             400: OpenApiResponse(
                 description="Request payload must be a list of objects."
             ),
+            409: OpenApiResponse(
+                description="A request with the same Idempotency-Key is in progress."
+            ),
+            422: OpenApiResponse(
+                description="The Idempotency-Key was already used with another payload."
+            ),
         },
     )
     def post(self, request, *args, **kwargs):
-        return self.create(request, *args, **kwargs)
+        idempotency_key = request.headers.get("Idempotency-Key")
+        if not idempotency_key:
+            return self.create(request, *args, **kwargs)
+
+        key = idempotency.key_digest(
+            idempotency.request_principal(request), idempotency_key
+        )
+        payload_hash = idempotency.payload_digest(request.data)
+        stored = idempotency.claim(key, payload_hash)
+        if stored is not None:
+            stored_hash, data, status = stored
+            if stored_hash != payload_hash:
+                return Response(
+                    {"error": "Idempotency-Key already used with another payload"},
+                    status=422,
+                )
+            if status is None:
+                return Response(
+                    {"error": "A request with this Idempotency-Key is in progress"},
+                    status=409,
+                )
+            return Response(data, status=status)
+
+        try:
+            response = self.create(request, *args, **kwargs)
+        except Exception:
+            idempotency.release(key)
+            raise
+        if response.status_code < 300:
+            idempotency.store_response(key, response.data, response.status_code)
+        else:
+            idempotency.release(key)
+        return response
 
     def create(self, request, *args, **kwargs):
         data = request.data
         if not isinstance(data, list):
             return Response({"error": "Expected a list of objects"}, status=400)
 
-        license_plates = {item.get("car__license_plate") for item in data}
-        sensor_uuids = {item.get("sensor__uuid") for item in data}
-        segments = {item.get("road_segment") for item in data}
+        if request.query_params.get("async") in ("1", "true"):
+            if not all(isinstance(item, dict) for item in data):
+                return Response({"error": "Expected a list of objects"}, status=400)
+            batch = enqueue_traffic_records(data)
+            return Response({"batch_id": batch.id, "status": batch.status}, status=202)
+
+        ack = request.query_params.get("ack")
+        if ack not in (None, "count", "ids"):
+            return Response({"error": "ack must be one of: count, ids"}, status=400)
+        if ack is None and len(data) > settings.TRAFFIC_RECORD_SERIALIZE_LIMIT:
+            ack = "ids"
+
+        result = save_traffic_records(data, serialize=not ack)
+
+        response = result["data"]
+        if ack == "count":
+            response = {
+                "count": len(result["ids"]),
+                "invalid_inputs": result["invalid_inputs"],
+            }
+        elif ack == "ids":
+            response = {
+                "ids": result["ids"],
+                "invalid_inputs": result["invalid_inputs"],
+            }
+        elif result["invalid_inputs"] or result["failed_chunks"]:
+            response = {
+                "invalid_inputs": result["invalid_inputs"],
+                "data": result["data"],
+            }
+        if result["failed_chunks"]:
+            response["failed_chunks"] = result["failed_chunks"]
+        return Response(response, status=201)
+
+
+class IngestBatchDetailView(generics.RetrieveAPIView):
+    """
+    API endpoint for checking the outcome of a traffic record batch queued with `?async=true`.
+
+    ### Retrieve Ingest Batch
+    Returns the status of the batch (`PENDING`, `PROCESSING`, `DONE` or `FAILED`) and, once processed,
+    its result: the number of records created or already stored and the `invalid_inputs` and
+    `failed_chunks` of the batch.
 
-        road_segments = {
-            road.id: road for road in RoadSegment.objects.filter(id__in=segments)
+    ### Requests against this endpoint must include an **API-Key** or be made by a staff user
+    """
+
+    queryset = IngestBatch.objects.all()
+    serializer_class = IngestBatchSerializer
+    permission_classes = [HasAPIKeyOrIsStaff]
+
+    @extend_schema(
+        responses={
+            200: OpenApiResponse(
+                response=IngestBatchSerializer,
+                description="Successfully retrieved ingest batch status",
+            ),
+            404: OpenApiResponse(
+                description="No IngestBatch matches the given query.",
+            ),
         }
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class CarTrajectoryView(generics.GenericAPIView):
+    """
+    API endpoint for retrieving the trajectory of a car.
+
+    ### Retrieve Car Trajectory
+    Returns the time-ordered sightings of the car with the given license plate as compact arrays,
+    where the n-th item of every array belongs to the n-th sighting:
+    - `timestamps`
+    - `road_segments`: road segment ids
+    - `sensors`: sensor ids
+    - `dwell_times`: seconds since the previous sighting when the car stayed on the same road segment
+    - `transit_times`: seconds since the previous sighting when the car moved to another road segment
+
+    Both times are `null` for the first sighting.
+
+    **Query Parameters:**
+    - `from`: Start of the time window (ISO 8601). Defaults to 24 hours before `to`.
+    - `to`: End of the time window (ISO 8601). Defaults to now.
+    """
+
+    queryset = TrafficRecord.objects.all()
+    permission_classes = [HasAPIKeyOrReadOnly]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="from",
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                description="Start of the time window. Defaults to 24 hours before `to`.",
+            ),
+            OpenApiParameter(
+                name="to",
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                description="End of the time window. Defaults to now.",
+            ),
+        ],
+        responses={
+            200: OpenApiResponse(description="Trajectory of the car"),
+            400: OpenApiResponse(description="Invalid time window"),
+        },
+    )
+    def get(self, request, license_plate, *args, **kwargs):
+        try:
+            end = parse_query_datetime(request.query_params.get("to"), timezone.now())
+            start = parse_query_datetime(
+                request.query_params.get("from"), end - datetime.timedelta(days=1)
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        if start > end:
+            return Response({"error": "from must be before to"}, status=400)
+
+        sightings = (
+            self.get_queryset()
+            .filter(
+                car__license_plate=license_plate,
+                timestamp__gte=start,
+                timestamp__lte=end,
+            )
+            .order_by("timestamp")
+            .values_list("timestamp", "road_segment_id", "sensor_id")
+        )
+
+        trajectory = {
+            "license_plate": license_plate,
+            "from": start,
+            "to": end,
+            "timestamps": [],
+            "road_segments": [],
+            "sensors": [],
+            "dwell_times": [],
+            "transit_times": [],
+        }
+        previous = None
+
+        for timestamp, road_segment, sensor in sightings:
+            dwell_time = transit_time = None
+            if previous:
+                elapsed = (timestamp - previous[0]).total_seconds()
+                same_segment = road_segment == previous[1]
+                dwell_time = elapsed if same_segment else 0.0
+                transit_time = 0.0 if same_segment else elapsed
+
+            trajectory["timestamps"].append(timestamp)
+            trajectory["road_segments"].append(road_segment)
+            trajectory["sensors"].append(sensor)
+            trajectory["dwell_times"].append(dwell_time)
+            trajectory["transit_times"].append(transit_time)
+            previous = (timestamp, road_segment)
+
+        return Response(trajectory)
+
+
+class SegmentFlowMixin:
+    """
+    Parses the flow query parameters shared by the segment flow endpoints.
+    """
+
+    flow_parameters = [
+        OpenApiParameter(
+            name="bucket",
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            enum=list(FLOW_BUCKETS),
+            description="Size of the time buckets. Defaults to 15m.",
+        ),
+        OpenApiParameter(
+            name="from",
+            type=OpenApiTypes.DATETIME,
+            location=OpenApiParameter.QUERY,
+            description="Start of the time window. Defaults to 24 hours before `to`.",
+        ),
+        OpenApiParameter(
+            name="to",
+            type=OpenApiTypes.DATETIME,
+            location=OpenApiParameter.QUERY,
+            description="End of the time window. Defaults to now.",
+        ),
+    ]
+
+    def get_flow_params(self, request) -> tuple:
+        """
+        Returns the bucket and the time window of the request.
+        Raises ValueError when any of them is invalid.
+        """
+        bucket = request.query_params.get("bucket", "15m")
+        if bucket not in FLOW_BUCKETS:
+            raise ValueError(f"bucket must be one of: {', '.join(FLOW_BUCKETS)}")
+
+        end = parse_query_datetime(request.query_params.get("to"), timezone.now())
+        start = parse_query_datetime(
+            request.query_params.get("from"), end - datetime.timedelta(days=1)
+        )
+        if start > end:
+            raise ValueError("from must be before to")
+
+        return bucket, start, end
+
+
+class RoadSegmentFlowView(SegmentFlowMixin, generics.GenericAPIView):
+    """
+    API endpoint for the traffic flow of a road segment.
+
+    ### Retrieve Road Segment Flow
+    Returns the number of traffic records and distinct cars on the road segment per time bucket,
+    as compact arrays where the n-th item of every array belongs to the n-th bucket:
+    - `buckets`: start of each bucket
+    - `records`: traffic records in the bucket
+    - `cars`: distinct cars in the bucket
+
+    Buckets without traffic are left out, and the time window is expanded to whole buckets.
+    Older buckets are read from the rollups kept by the `rollup_segment_flow` command.
+    """
+
+    queryset = RoadSegment.objects.all()
+    permission_classes = [DjangoModelPermissionsOrAnonReadOnly]
+
+    @extend_schema(
+        parameters=SegmentFlowMixin.flow_parameters,
+        responses={
+            200: OpenApiResponse(description="Traffic flow of the road segment"),
+            400: OpenApiResponse(description="Invalid bucket or time window"),
+            404: OpenApiResponse(
+                description="No RoadSegment matches the given query.",
+            ),
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        segment = self.get_object()
+        try:
+            bucket, start, end = self.get_flow_params(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        flow = segment_flow([segment.id], bucket, start, end)
+        return Response(
+            {
+                "road_segment": segment.id,
+                "bucket": bucket,
+                "from": start,
+                "to": end,
+                **flow[segment.id],
+            }
+        )
 
-        sensors = get_valide_uuids(sensor_uuids)
-        cars = get_or_create_car_dict(license_plates)
-
-        prepared_data = []
-        errors = []
-
-        for idx, item in enumerate(data):
-
-            car = cars.get(item.get("car__license_plate"))
-            sensor = sensors.get(item.get("sensor__uuid"))
-            segment = road_segments.get(item.get("road_segment"))
-            timestamp = item.get("timestamp", None)
-
-            if not sensor or not segment or not car or not timestamp:
-                errors.append(
-                    {
-                        "index": idx,
-                        "error": "Missing related object",
-                        "car__license_plate": item.get("car__license_plate"),
-                        "sensor__uuid": item.get("sensor__uuid"),
-                        "timestamp": item.get("timestamp"),
-                        "road_segment": item.get("road_segment"),
-                    }
-                )
-                continue
 
-            prepared_data.append(
+class RoadSegmentsFlowView(SegmentFlowMixin, generics.GenericAPIView):
+    """
+    API endpoint for the traffic flow of several road segments.
+
+    ### Retrieve Road Segments Flow
+    Same as the flow of a single road segment, for every road segment id given in `ids`,
+    under the `road_segments` field of the response.
+
+    **Query Parameters:**
+    - `ids`: Comma separated road segment ids.
+    """
+
+    queryset = RoadSegment.objects.all()
+    permission_classes = [DjangoModelPermissionsOrAnonReadOnly]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="ids",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description="Comma separated road segment ids.",
+            ),
+            *SegmentFlowMixin.flow_parameters,
+        ],
+        responses={
+            200: OpenApiResponse(description="Traffic flow of the road segments"),
+            400: OpenApiResponse(description="Invalid ids, bucket or time window"),
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        try:
+            segment_ids = sorted(
+                {int(pk) for pk in request.query_params.get("ids", "").split(",")}
+            )
+            bucket, start, end = self.get_flow_params(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        return Response(
+            {
+                "bucket": bucket,
+                "from": start,
+                "to": end,
+                "road_segments": segment_flow(segment_ids, bucket, start, end),
+            }
+        )
+
+
+class ODMatrixView(generics.GenericAPIView):
+    """
+    API endpoint for the origin-destination matrix between sensors.
+
+    ### Retrieve OD Matrix
+    Counts how many times a car seen at a sensor was next seen at another sensor within `max_gap` minutes.
+    The sparse matrix is returned in coordinate format, where the n-th items of `origins`,
+    `destinations` and `counts` describe one non-empty cell, and `sensors` lists every sensor involved.
+    Matrices are stored for `OD_MATRIX_CACHE_TTL` seconds and shared by every worker,
+    and can be precomputed with the `compute_od_matrix` command.
+
+    **Query Parameters:**
+    - `from`: Start of the time window (ISO 8601). Defaults to 24 hours before `to`.
+    - `to`: End of the time window (ISO 8601). Defaults to now, rounded down to `OD_MATRIX_WINDOW_BUCKET` seconds.
+    - `max_gap`: Maximum minutes between two consecutive sightings of a car.
+    """
+
+    queryset = TrafficRecord.objects.all()
+    permission_classes = [HasAPIKeyOrReadOnly]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="from",
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                description="Start of the time window. Defaults to 24 hours before `to`.",
+            ),
+            OpenApiParameter(
+                name="to",
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                description="End of the time window. Defaults to now, rounded down to `OD_MATRIX_WINDOW_BUCKET` seconds.",
+            ),
+            OpenApiParameter(
+                name="max_gap",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Maximum minutes between two consecutive sightings of a car.",
+            ),
+        ],
+        responses={
+            200: OpenApiResponse(description="Origin-destination matrix"),
+            400: OpenApiResponse(description="Invalid time window or max_gap"),
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        try:
+            end = parse_query_datetime(
+                request.query_params.get("to"), default_window_end()
+            )
+            start = parse_query_datetime(
+                request.query_params.get("from"), end - datetime.timedelta(days=1)
+            )
+            max_gap = int(
+                request.query_params.get("max_gap", settings.OD_MATRIX_MAX_GAP)
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        if start > end or max_gap <= 0:
+            return Response(
+                {"error": "from must be before to and max_gap must be positive"},
+                status=400,
+            )
+
+        return Response(get_od_matrix(start, end, datetime.timedelta(minutes=max_gap)))
+
+
+class SensorHealthView(generics.GenericAPIView):
+    """
+    API endpoint for spotting dead sensors.
+
+    ### List Sensor Health
+    Returns, for every sensor:
+    - `last_seen`: timestamp of the most recent traffic record ingested from the sensor
+    - `record_count`: traffic records ingested from the sensor
+    - `records_per_minute`: average records per minute over the last `SENSOR_HEALTH_WINDOW` minutes
+
+    Statistics are accumulated during ingestion and written every few seconds,
+    so they can lag a little behind the traffic records.
+    """
+
+    queryset = Sensor.objects.all()
+    permission_classes = [HasAPIKeyOrReadOnly]
+
+    @extend_schema(
+        responses={
+            200: OpenApiResponse(description="Health of every sensor"),
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        window = settings.SENSOR_HEALTH_WINDOW
+        since = timezone.now().replace(second=0, microsecond=0) - datetime.timedelta(
+            minutes=window
+        )
+        throughput = dict(
+            SensorThroughput.objects.filter(minute__gte=since)
+            .values("sensor_id")
+            .annotate(total=Sum("record_count"))
+            .values_list("sensor_id", "total")
+        )
+
+        sensors = (
+            self.get_queryset()
+            .order_by("id")
+            .values_list(
+                "id", "name", "uuid", "stats__last_seen", "stats__record_count"
+            )
+        )
+        return Response(
+            [
                 {
-                    "car": car.id,
-                    "sensor": sensor.id,
-                    "road_segment": segment.id,
-                    "timestamp": timestamp,
+                    "id": sensor_id,
+                    "name": name,
+                    "uuid": uuid,
+                    "last_seen": last_seen,
+                    "record_count": record_count or 0,
+                    "records_per_minute": throughput.get(sensor_id, 0) / window,
                 }
+                for sensor_id, name, uuid, last_seen, record_count in sensors
+            ]
+        )
+
+
+class DatabasePoolStatsView(generics.GenericAPIView):
+    """
+    API endpoint for sizing the database connection pool.
+
+    ### Retrieve Database Connection Stats
+    Returns, for the worker process answering the request (`pid`) and every database alias:
+    - `pooled`: whether connections come from a pool (`DATABASE_POOL`)
+    - `conn_max_age` and `health_checks`: persistent connection settings
+    - `pool`: pool statistics, e.g. `pool_size`, `pool_available`, `requests_waiting`,
+      `requests_num` and `requests_wait_ms`, or `null` without pooling
+
+    ### Requests against this endpoint must include an **API-Key** or be made by a staff user
+    """
+
+    permission_classes = [HasAPIKeyOrIsStaff]
+
+    @extend_schema(
+        responses={
+            200: OpenApiResponse(description="Connection stats of this worker"),
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        return Response(connection_stats())
+
+
+class RoadSegmentForecastView(generics.GenericAPIView):
+    """
+    API endpoint for the short-term speed forecast of a road segment.
+
+    ### Retrieve Forecast
+    Returns the speed forecast 15, 30 and 60 minutes ahead with its predicted traffic classification.
+    Forecasts are computed for all road segments by the `forecast_speeds` command.
+    """
+
+    queryset = RoadSegment.objects.all()
+    permission_classes = [DjangoModelPermissionsOrAnonReadOnly]
+
+    @extend_schema(
+        responses={
+            200: OpenApiResponse(description="Speed forecast of the road segment"),
+            404: OpenApiResponse(description="Unknown road segment or no forecast yet"),
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        road_segment = self.get_object()
+        try:
+            forecast = SpeedForecast.objects.get(road_segment=road_segment)
+        except SpeedForecast.DoesNotExist:
+            return Response(
+                {"detail": "No forecast available for this road segment."}, status=404
             )
 
-        serializer = self.get_serializer(data=prepared_data, many=True)
-        serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
-        response = serializer.data
-        if errors:
-            response = {"invalid_inputs": errors, "data": serializer.data}
-        return Response(response, status=201)
+        classifications = list(TrafficClassification.objects.all())
+        forecasts = []
+        for horizon in HORIZONS:
+            speed = getattr(forecast, f"speed_{horizon}")
+            classification = TrafficClassification.for_speed(speed, classifications)
+            forecasts.append(
+                {
+                    "horizon": horizon,
+                    "speed": speed,
+                    "traffic_classification": (
+                        classification.name if classification else None
+                    ),
+                }
+            )
+        return Response(
+            {
+                "road_segment": road_segment.id,
+                "generated_at": forecast.generated_at,
+                "forecasts": forecasts,
+            }
+        )
+
+
+class RouteView(generics.GenericAPIView):
+    """
+    API endpoint for the fastest route between two road segments.
+
+    ### Retrieve Route
+    Returns the fastest sequence of connected road segments from `origin` to `destination` (both included),
+    weighted by `road_length / current speed`, along with the travel time in seconds of each segment and in total.
+    Road segments are connected when they share an endpoint, and segments without speed readings
+    use the `ROUTE_DEFAULT_SPEED`.
+
+    **Query Parameters:**
+    - `origin`: Road segment id where the route starts.
+    - `destination`: Road segment id where the route ends.
+    """
+
+    queryset = RoadSegment.objects.all()
+    permission_classes = [DjangoModelPermissionsOrAnonReadOnly]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="origin",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description="Road segment id where the route starts.",
+            ),
+            OpenApiParameter(
+                name="destination",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description="Road segment id where the route ends.",
+            ),
+        ],
+        responses={
+            200: OpenApiResponse(description="Fastest route"),
+            400: OpenApiResponse(description="Invalid origin or destination"),
+            404: OpenApiResponse(description="No route between the road segments."),
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        try:
+            origin = int(request.query_params.get("origin", ""))
+            destination = int(request.query_params.get("destination", ""))
+        except ValueError:
+            return Response(
+                {"error": "origin and destination must be road segment ids"},
+                status=400,
+            )
+
+        route = route_graph.route(origin, destination)
+        if route is None:
+            return Response(
+                {"detail": "No route between the road segments."}, status=404
+            )
+
+        road_segments, travel_times, travel_time = route
+        return Response(
+            {
+                "road_segments": road_segments,
+                "travel_times": travel_times,
+                "travel_time": travel_time,
+            }
+        )
+
+
+class RouteETAView(generics.GenericAPIView):
+    """
+    API endpoint for the travel time along a given list of road segments.
+
+    ### Retrieve ETA
+    Returns the current travel time in seconds of each road segment and their sum.
+
+    **Query Parameters:**
+    - `road_segments`: Comma separated road segment ids, in the order they are traveled.
+    """
+
+    queryset = RoadSegment.objects.all()
+    permission_classes = [DjangoModelPermissionsOrAnonReadOnly]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="road_segments",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description="Comma separated road segment ids.",
+            ),
+        ],
+        responses={
+            200: OpenApiResponse(description="Travel time along the road segments"),
+            400: OpenApiResponse(description="Invalid or unknown road segment ids"),
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        times, _ = route_graph.snapshot()
+        try:
+            road_segments = [
+                int(pk)
+                for pk in request.query_params.get("road_segments", "").split(",")
+            ]
+        except ValueError:
+            return Response(
+                {"error": "road_segments must be comma separated ids"}, status=400
+            )
+
+        unknown = [segment for segment in road_segments if segment not in times]
+        if unknown:
+            return Response({"error": f"Unknown road segments: {unknown}"}, status=400)
+
+        travel_times = [times[segment] for segment in road_segments]
+        return Response(
+            {
+                "road_segments": road_segments,
+                "travel_times": travel_times,
+                "travel_time": sum(travel_times),
+            }
+        )
+
+
+class SpeedAnomalyListView(SparseFieldsMixin, generics.ListAPIView):
+    """
+    API endpoint for listing congestion anomalies.
+
+    ### List Speed Anomalies
+    Returns the speed readings flagged as much lower than the usual speed of their road segment,
+    most recent first. Anomalies are detected by the `detect_anomalies` command.
+
+    **Query Parameters:**
+    - `road_segment`: Filter anomalies by road segment id.
+    - `since`: Only anomalies detected after this time (ISO 8601).
+    - `fields` / `omit`: Comma separated fields to keep / drop.
+    """
+
+    queryset = SpeedAnomaly.objects.all()
+    serializer_class = SpeedAnomalySerializer
+    permission_classes = [DjangoModelPermissionsOrAnonReadOnly]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = SpeedAnomalyFilter
+
+    @extend_schema(parameters=SPARSE_FIELDS_PARAMETERS)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TrafficMonitorConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "traffic_monitor"
+
+    def ready(self) -> None:
+        from traffic_monitor import signals  # noqa: F401
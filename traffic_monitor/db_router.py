@@ -0,0 +1,110 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+# Replica alias the reads of the current request / command are sent to (None: primary)
+_read_alias: ContextVar[str | None] = ContextVar("read_alias", default=None)
+
+# Seconds the replica lags behind the primary, NULL when the server isn't a
+# standby in recovery (e.g. a promoted replica or a standalone database)
+LAG_QUERY = (
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN NULL "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def replica_aliases() -> list[str]:
+    return [alias for alias in settings.DATABASES if alias.startswith("replica_")]
+
+
+class ReplicaMonitor:
+    """
+    Process-local view of the replicas lagging less than REPLICA_MAX_LAG seconds
+    behind the primary, refreshed at most every REPLICA_LAG_CHECK_INTERVAL seconds.
+    Unreachable replicas, and servers that aren't standbys in recovery, are left
+    out until the next check. The checks run outside the lock, so requests
+    arriving meanwhile use the previous list instead of waiting on the network.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._healthy: list[str] = []
+        self._checked_at = None
+
+    def healthy(self) -> list[str]:
+        now = time.monotonic()
+        with self._lock:
+            if (
+                self._checked_at is not None
+                and now - self._checked_at < settings.REPLICA_LAG_CHECK_INTERVAL
+            ):
+                return list(self._healthy)
+            self._checked_at = now
+
+        healthy = [
+            alias
+            for alias in replica_aliases()
+            if self.lag(alias) <= settings.REPLICA_MAX_LAG
+        ]
+        with self._lock:
+            self._healthy = healthy
+        return list(healthy)
+
+    def lag(self, alias: str) -> float:
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(LAG_QUERY)
+                (lag,) = cursor.fetchone()
+        except DatabaseError:
+            return float("inf")
+        return float("inf") if lag is None else float(lag)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._healthy = []
+            self._checked_at = None
+
+
+replica_monitor = ReplicaMonitor()
+
+
+def choose_replica() -> str | None:
+    healthy = replica_monitor.healthy() if replica_aliases() else []
+    return random.choice(healthy) if healthy else None
+
+
+@contextmanager
+def use_replica():
+    """
+    Sends the reads made inside the block to a single healthy replica, if any.
+    """
+    token = _read_alias.set(choose_replica())
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Sends reads to the replica chosen for the current request or command
+    (see ReplicaRoutingMiddleware and use_replica), and everything else to
+    the primary. Replicas are never migrated, they follow the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
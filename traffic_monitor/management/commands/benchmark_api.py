@@ -0,0 +1,155 @@
+import datetime
+import random
+from importlib import import_module
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user_model,
+)
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from traffic_monitor.models import RoadSegment, Sensor
+from traffic_monitor.utils.benchmark import run_benchmark
+from traffic_monitor.utils.sensor_stats import sensor_stats
+from traffic_monitor.utils.traffic_records_helper import save_traffic_records
+
+# The list endpoints are paginated with LimitOffsetPagination, while the GeoJSON
+# rendering streams the whole collection
+DEFAULT_PATHS = [
+    "/api/road_segments/",
+    "/api/road_segments/?limit=1000",
+    "/api/road_segments/?format=geojson",
+    "/api/speed_readings/",
+    "/api/traffic_records/",
+    "/api/sensors/health/",
+]
+
+
+class Command(BaseCommand):
+    """
+    Custom command to measure the throughput and latency of a running server
+    on the API endpoints, e.g. to compare server configurations.
+    Every path is requested `--requests` times from `--concurrency` threads, after
+    a short warm-up, and a line with the requests per second, the errors and the
+    p50/p95/p99 latencies is written per path.
+    The traffic record and sensor health endpoints only answer GETs of staff users:
+    `--user` sends the requests with a session of that staff user, created in the
+    database of the server and deleted at the end.
+    `--seed-records` first ingests that many generated traffic records, spread over
+    the sensors and the road segments imported with import_csv.
+    The command can be called from the command line as follows:
+    python3 manage.py benchmark_api --base-url http://localhost:8000 --user admin --seed-records 100000
+    """
+
+    help = "Benchmark the API endpoints of a running server."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            type=str,
+            default="http://localhost:8000",
+            help="URL of the server under test",
+        )
+        parser.add_argument(
+            "--path",
+            dest="paths",
+            action="append",
+            help="Path to request, can be repeated (defaults to the main list endpoints)",
+        )
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument(
+            "--user",
+            type=str,
+            help="Username of the staff user the requests are authenticated as",
+        )
+        parser.add_argument(
+            "--api-key",
+            type=str,
+            help="API key sent in the Authorization header, for the endpoints that accept it",
+        )
+        parser.add_argument(
+            "--seed-records",
+            type=int,
+            default=0,
+            help="Number of traffic records to ingest before the benchmark",
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs["requests"] < 1 or kwargs["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+
+        if kwargs["seed_records"] > 0:
+            self.seed_traffic_records(kwargs["seed_records"])
+
+        headers = {}
+        if kwargs["api_key"]:
+            headers["Authorization"] = f"API-Key {kwargs['api_key']}"
+        session = self.create_session(kwargs["user"]) if kwargs["user"] else None
+        if session is not None:
+            headers["Cookie"] = f"{settings.SESSION_COOKIE_NAME}={session.session_key}"
+        base_url = kwargs["base_url"].rstrip("/")
+
+        try:
+            for path in kwargs["paths"] or DEFAULT_PATHS:
+                url = base_url + path
+                run_benchmark(
+                    url, kwargs["concurrency"], kwargs["concurrency"], headers
+                )
+                result = run_benchmark(
+                    url, kwargs["requests"], kwargs["concurrency"], headers
+                )
+                self.stdout.write(
+                    f"{path}: {result['requests_per_second']:.1f} req/s, "
+                    f"{result['errors']} errors, "
+                    f"p50 {result['p50_ms']:.1f} ms, "
+                    f"p95 {result['p95_ms']:.1f} ms, "
+                    f"p99 {result['p99_ms']:.1f} ms"
+                )
+        finally:
+            if session is not None:
+                session.delete()
+
+    def create_session(self, username: str):
+        """
+        Returns a new session authenticating the staff user, as a login would.
+        """
+        user = get_user_model().objects.filter(username=username).first()
+        if user is None or not user.is_staff:
+            raise CommandError(f"{username} is not a staff user.")
+
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        return session
+
+    def seed_traffic_records(self, count: int) -> None:
+        """
+        Ingests generated traffic records of 1000 cars over the last 24 hours,
+        through the same path as the traffic record endpoint.
+        """
+        sensors = [str(uuid) for uuid in Sensor.objects.values_list("uuid", flat=True)]
+        segments = list(RoadSegment.objects.values_list("id", flat=True))
+        if not sensors or not segments:
+            raise CommandError(
+                "Seeding needs sensors and road segments, import them first."
+            )
+
+        now = timezone.now()
+        payload = [
+            {
+                "car__license_plate": f"BENCH{random.randrange(1000):04d}",
+                "sensor__uuid": random.choice(sensors),
+                "road_segment": random.choice(segments),
+                "timestamp": now
+                - datetime.timedelta(seconds=random.uniform(0, 24 * 60 * 60)),
+            }
+            for _ in range(count)
+        ]
+        result = save_traffic_records(payload, serialize=False)
+        sensor_stats.flush()
+        self.stdout.write(f"Seeded {len(result['ids'])} traffic records.")
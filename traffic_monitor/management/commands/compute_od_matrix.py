@@ -0,0 +1,69 @@
+import csv
+import datetime
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from traffic_monitor.db_router import use_replica
+from traffic_monitor.utils.od_matrix import (
+    compute_od_matrix,
+    default_window_end,
+    store_od_matrix,
+)
+from traffic_monitor.utils.query_params import parse_query_datetime
+
+
+class Command(BaseCommand):
+    """
+    Custom command to compute the origin-destination matrix between sensors:
+    how many cars seen at a sensor were next seen at another one, within
+    `--max-gap` minutes, for the given time window.
+    The matrix is stored in the table read by /api/od_matrix/, so requests
+    with the same window are answered right away by every worker, and it can
+    also be written to a CSV file with the origin, destination and count columns.
+    Without `--to`, the window ends at the current time rounded down to
+    OD_MATRIX_WINDOW_BUCKET seconds, like the default window of the endpoint.
+    Traffic records are read from a replica when one is configured.
+    The command can be called from the command line as follows:
+    python3 manage.py compute_od_matrix --from 2025-05-22T00:00:00Z --to 2025-05-23T00:00:00Z --output od.csv
+    """
+
+    help = "Compute the origin-destination matrix between sensors."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from", dest="start", type=str, help="Start of the time window"
+        )
+        parser.add_argument("--to", dest="end", type=str, help="End of the time window")
+        parser.add_argument(
+            "--max-gap",
+            type=int,
+            default=settings.OD_MATRIX_MAX_GAP,
+            help="Maximum minutes between two consecutive sightings of a car",
+        )
+        parser.add_argument("--output", type=str, help="Path of the CSV file to write")
+
+    def handle(self, *args, **kwargs):
+        try:
+            end = parse_query_datetime(kwargs["end"], default_window_end())
+            start = parse_query_datetime(
+                kwargs["start"], end - datetime.timedelta(days=1)
+            )
+        except ValueError as e:
+            raise CommandError(e)
+
+        max_gap = datetime.timedelta(minutes=kwargs["max_gap"])
+        with use_replica():
+            matrix = compute_od_matrix(start, end, max_gap)
+        store_od_matrix(matrix)
+
+        if kwargs["output"]:
+            with open(kwargs["output"], "w", newline="") as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(["origin", "destination", "count"])
+                writer.writerows(
+                    zip(matrix["origins"], matrix["destinations"], matrix["counts"])
+                )
+
+        self.stdout.write(
+            f"OD matrix computed: {len(matrix['sensors'])} sensors, "
+            f"{len(matrix['counts'])} sensor pairs."
+        )
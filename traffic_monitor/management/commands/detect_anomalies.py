@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from traffic_monitor.db_router import use_replica
+from traffic_monitor.utils.anomalies import detect_anomalies
+
+
+class Command(BaseCommand):
+    """
+    Custom command to flag congestion anomalies on every road segment.
+    It loads the recent speed readings of all road segments into NumPy arrays,
+    computes an EWMA baseline per segment in a single vectorized pass and stores
+    the segments whose latest reading dropped sharply below it.
+    Stored anomalies are served by /api/anomalies/. Speed readings are read
+    from a replica when one is configured.
+    The command is meant to run periodically (e.g. from cron) as follows:
+    python3 manage.py detect_anomalies
+    """
+
+    help = "Detect road segments whose speed dropped sharply below their usual pattern."
+
+    def handle(self, *args, **kwargs):
+        with use_replica():
+            anomalies = detect_anomalies()
+        self.stdout.write(f"{len(anomalies)} anomalies detected.")
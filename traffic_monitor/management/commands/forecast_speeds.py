@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from traffic_monitor.db_router import use_replica
+from traffic_monitor.utils.forecasting import forecast_speeds
+
+
+class Command(BaseCommand):
+    """
+    Custom command to forecast the speed of every road segment 15, 30 and 60 minutes ahead.
+    It aggregates the speed readings of the last days into 15-minute averages in the
+    database, fits a seasonal EWMA model to all road segments at once with NumPy
+    matrix operations and stores the result in the SpeedForecast table.
+    Stored forecasts are served by /api/road_segments/<id>/forecast/. Speed readings are read
+    from a replica when one is configured.
+    The command is meant to run periodically (e.g. every 15 minutes from cron) as follows:
+    python3 manage.py forecast_speeds
+    """
+
+    help = "Forecast the speed of every road segment 15, 30 and 60 minutes ahead."
+
+    def handle(self, *args, **kwargs):
+        with use_replica():
+            count = forecast_speeds()
+        self.stdout.write(f"{count} road segments forecasted.")
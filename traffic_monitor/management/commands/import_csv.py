@@ -2,7 +2,8 @@ from django.core.management.base import BaseCommand
 import pandas as pd
 from django.utils import timezone
 from django.contrib.gis.geos import LineString
-from traffic_monitor.models import RoadSegment, SpeedReading
+from traffic_monitor.models import RoadSegment, SpeedReading, TableVersion
+from traffic_monitor.utils.table_versions import row_version_key, table_version_key
 
 
 class Command(BaseCommand):
@@ -99,6 +100,12 @@ class Command(BaseCommand):
 
     def save_speed_readings(self, readings) -> None:
         """
-        Bulk saves the speed readings to the database.
+        Bulk saves the speed readings, then bumps their versions in a single
+        upsert once the insert committed.
         """
         SpeedReading.objects.bulk_create(readings)
+        segment_ids = {reading.road_segment_id for reading in readings}
+        TableVersion.objects.bump(
+            [table_version_key(SpeedReading)]
+            + [row_version_key(RoadSegment, pk) for pk in segment_ids]
+        )
@@ -0,0 +1,52 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from traffic_monitor.utils.ingest_queue import process_ingest_queue
+from traffic_monitor.utils.sensor_stats import sensor_stats
+
+
+class Command(BaseCommand):
+    """
+    Custom command to drain the asynchronous traffic record ingestion queue.
+    Pending batches posted with `?async=true` are merged into groups of up to
+    `--max-records` records and ingested together, and every batch gets its
+    own result, available on /api/traffic_records/batches/<id>/.
+    By default the command exits when the queue is empty. With `--loop` it
+    keeps polling for new batches every `--interval` seconds.
+    The command can be called from the command line as follows:
+    python3 manage.py process_ingest_queue --loop
+    """
+
+    help = "Ingest the traffic record batches waiting in the queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-records",
+            type=int,
+            default=settings.INGEST_QUEUE_MAX_RECORDS,
+            help="Maximum number of records ingested together",
+        )
+        parser.add_argument(
+            "--loop", action="store_true", help="Keep polling for new batches"
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait between polls when the queue is empty",
+        )
+
+    def handle(self, *args, **kwargs):
+        processed = 0
+
+        while True:
+            batches = process_ingest_queue(kwargs["max_records"])
+            processed += batches
+
+            if not batches:
+                if not kwargs["loop"]:
+                    break
+                time.sleep(kwargs["interval"])
+
+        sensor_stats.flush()
+        self.stdout.write(f"Processed {processed} batches.")
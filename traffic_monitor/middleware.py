@@ -0,0 +1,109 @@
+import re
+import brotli
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from traffic_monitor.db_router import use_replica
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PRIMARY_PIN_COOKIE = "primary_pin"
+
+re_accepts_brotli = re.compile(r"\bbr\b(?!\s*;\s*q=0(\.0*)?\s*(,|$))")
+
+
+def brotli_sequence(sequence):
+    """
+    Compresses an iterable of bytes with brotli, flushing after every chunk
+    so streamed content reaches the client as it is produced.
+    """
+    compressor = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+    for item in sequence:
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def abrotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+    async for item in sequence:
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compresses responses with brotli when the client accepts it, gzip otherwise.
+    Responses shorter than COMPRESSION_MIN_SIZE bytes are left uncompressed,
+    while streaming responses are always compressed, chunk by chunk.
+    """
+
+    def process_response(self, request, response):
+        if (
+            not response.streaming
+            and len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if response.has_header("Content-Encoding") or not re_accepts_brotli.search(
+            accept_encoding
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = abrotli_sequence(
+                    response.streaming_content
+                )
+            else:
+                response.streaming_content = brotli_sequence(response.streaming_content)
+            del response.headers["Content-Length"]
+        else:
+            compressed_content = brotli.compress(
+                response.content, quality=settings.BROTLI_QUALITY
+            )
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers["Content-Length"] = str(len(response.content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sends the reads of safe-method requests to a healthy replica. A client that
+    made a successful write keeps reading from the primary for REPLICA_PIN_SECONDS
+    (tracked with a cookie), so it always reads its own writes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in SAFE_METHODS:
+            if PRIMARY_PIN_COOKIE in request.COOKIES:
+                return self.get_response(request)
+            with use_replica():
+                return self.get_response(request)
+
+        response = self.get_response(request)
+        if response.status_code < 400:
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("traffic_monitor", "0008_load_sensor_data"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngestBatch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "pending"),
+                            ("PROCESSING", "processing"),
+                            ("DONE", "done"),
+                            ("FAILED", "failed"),
+                        ],
+                        db_index=True,
+                        default="PENDING",
+                        max_length=10,
+                    ),
+                ),
+                ("payload", models.JSONField(default=list)),
+                ("record_count", models.PositiveIntegerField()),
+                ("result", models.JSONField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
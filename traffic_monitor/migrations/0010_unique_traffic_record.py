@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Remove the traffic records duplicated by retried batches before
+    adding the unique constraint used to skip them on ingestion.
+    """
+
+    dependencies = [
+        ("traffic_monitor", "0009_ingestbatch"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            """
+            DELETE FROM traffic_monitor_trafficrecord duplicate
+            USING traffic_monitor_trafficrecord original
+            WHERE duplicate.id > original.id
+              AND duplicate.sensor_id = original.sensor_id
+              AND duplicate.car_id = original.car_id
+              AND duplicate.road_segment_id = original.road_segment_id
+              AND duplicate.timestamp = original.timestamp
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name="trafficrecord",
+            constraint=models.UniqueConstraint(
+                fields=("sensor", "car", "road_segment", "timestamp"),
+                name="unique_traffic_record",
+            ),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:30
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Add the indexes used by the API hot queries. The foreign key indexes
+    now covered by the composite ones are only dropped afterwards.
+    """
+
+    dependencies = [
+        ("traffic_monitor", "0010_unique_traffic_record"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="speedreading",
+            index=models.Index(
+                fields=["road_segment", "-created_at"],
+                name="speedreading_seg_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="speedreading",
+            index=models.Index(fields=["-created_at"], name="speedreading_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="trafficrecord",
+            index=models.Index(
+                fields=["car", "timestamp"], name="trafficrecord_car_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trafficrecord",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["timestamp"], name="trafficrecord_time_brin"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="speedreading",
+            name="road_segment",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="speed_readings",
+                to="traffic_monitor.roadsegment",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="trafficrecord",
+            name="car",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="traffic_records",
+                to="traffic_monitor.car",
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("traffic_monitor", "0011_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SegmentFlowRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket_seconds", models.PositiveIntegerField()),
+                ("bucket_start", models.DateTimeField()),
+                ("record_count", models.PositiveIntegerField()),
+                ("car_count", models.PositiveIntegerField()),
+                (
+                    "road_segment",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="flow_rollups",
+                        to="traffic_monitor.roadsegment",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["bucket_seconds", "bucket_start"],
+                        name="flowrollup_bucket_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("road_segment", "bucket_seconds", "bucket_start"),
+                        name="unique_segment_flow_rollup",
+                    )
+                ],
+            },
+        ),
+    ]
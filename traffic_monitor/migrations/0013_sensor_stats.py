@@ -0,0 +1,64 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("traffic_monitor", "0012_segmentflowrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SensorStats",
+            fields=[
+                (
+                    "sensor",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="traffic_monitor.sensor",
+                    ),
+                ),
+                ("record_count", models.BigIntegerField(default=0)),
+                ("last_seen", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SensorThroughput",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("minute", models.DateTimeField(db_index=True)),
+                ("record_count", models.PositiveIntegerField(default=0)),
+                (
+                    "sensor",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="throughput",
+                        to="traffic_monitor.sensor",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("sensor", "minute"), name="unique_sensor_throughput"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("traffic_monitor", "0013_sensor_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SpeedAnomaly",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("reading_at", models.DateTimeField()),
+                ("speed", models.FloatField()),
+                ("baseline", models.FloatField()),
+                ("z_score", models.FloatField()),
+                ("detected_at", models.DateTimeField(db_index=True)),
+                (
+                    "road_segment",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="speed_anomalies",
+                        to="traffic_monitor.roadsegment",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-detected_at"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("road_segment", "reading_at"),
+                        name="unique_speed_anomaly",
+                    )
+                ],
+            },
+        ),
+    ]
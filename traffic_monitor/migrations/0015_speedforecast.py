@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("traffic_monitor", "0014_speedanomaly"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SpeedForecast",
+            fields=[
+                (
+                    "road_segment",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="forecast",
+                        serialize=False,
+                        to="traffic_monitor.roadsegment",
+                    ),
+                ),
+                ("speed_15", models.FloatField()),
+                ("speed_30", models.FloatField()),
+                ("speed_60", models.FloatField()),
+                ("generated_at", models.DateTimeField()),
+            ],
+        ),
+    ]
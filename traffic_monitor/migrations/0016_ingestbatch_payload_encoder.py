@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:45
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("traffic_monitor", "0015_speedforecast"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="ingestbatch",
+            name="payload",
+            field=models.JSONField(
+                default=list, encoder=django.core.serializers.json.DjangoJSONEncoder
+            ),
+        ),
+    ]
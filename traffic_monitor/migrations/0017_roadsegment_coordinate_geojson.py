@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:49
+
+import json
+from django.db import migrations, models
+
+
+def fill_coordinate_geojson(apps, schema_editor):
+    RoadSegment = apps.get_model("traffic_monitor", "RoadSegment")
+
+    road_segments = []
+    for road_segment in RoadSegment.objects.only("id", "coordinate").iterator():
+        road_segment.coordinate_geojson = json.loads(road_segment.coordinate.geojson)
+        road_segments.append(road_segment)
+
+    RoadSegment.objects.bulk_update(
+        road_segments, ["coordinate_geojson"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("traffic_monitor", "0016_ingestbatch_payload_encoder"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="roadsegment",
+            name="coordinate_geojson",
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_coordinate_geojson, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-19 01:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("traffic_monitor", "0017_roadsegment_coordinate_geojson"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TableVersion",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=100, primary_key=True, serialize=False),
+                ),
+                ("version", models.BigIntegerField(default=0)),
+                ("modified_at", models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 01:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("traffic_monitor", "0018_tableversion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ingestbatch",
+            name="claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.1 on 2026-10-19 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("traffic_monitor", "0020_idempotencykey"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ODMatrix",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start", models.DateTimeField()),
+                ("end", models.DateTimeField()),
+                ("max_gap", models.PositiveIntegerField()),
+                ("matrix", models.JSONField()),
+                ("computed_at", models.DateTimeField(db_index=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("start", "end", "max_gap"),
+                        name="unique_od_matrix_window",
+                    )
+                ],
+            },
+        ),
+    ]
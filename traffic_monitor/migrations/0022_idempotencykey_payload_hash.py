@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-19 14:10
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("traffic_monitor", "0021_odmatrix"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="idempotencykey",
+            name="payload_hash",
+            field=models.CharField(default="", max_length=64),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name="idempotencykey",
+            name="response",
+            field=models.JSONField(
+                encoder=django.core.serializers.json.DjangoJSONEncoder, null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="idempotencykey",
+            name="status_code",
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-19 14:40
+
+import django.contrib.gis.db.models.functions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("traffic_monitor", "0022_idempotencykey_payload_hash"),
+    ]
+
+    operations = [
+        # A column can't be altered into a generated one
+        migrations.RemoveField(
+            model_name="roadsegment",
+            name="coordinate_geojson",
+        ),
+        migrations.AddField(
+            model_name="roadsegment",
+            name="coordinate_geojson",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.functions.comparison.Cast(
+                    django.contrib.gis.db.models.functions.AsGeoJSON("coordinate"),
+                    models.JSONField(),
+                ),
+                output_field=models.JSONField(),
+            ),
+        ),
+    ]
@@ -2,10 +2,70 @@ from typing import Any
 from django.db import models
 from django.contrib.gis.db import models
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.contrib.gis.db.models.functions import AsGeoJSON
 from django.contrib.gis.geos import LineString
+from django.contrib.postgres.indexes import BrinIndex
+from django.db import connections, router
+from django.db.models.functions import Cast, Coalesce
 
 
-class RoadSegmentManager(models.Manager):
+class RoadSegmentQuerySet(models.QuerySet):
+    """
+    Custom QuerySet adding the speed reading data of the road segments as subqueries.
+    """
+
+    def with_latest_speed(self) -> "RoadSegmentQuerySet":
+        """
+        Annotates `latest_speed`, the speed of the latest reading of each road segment.
+        """
+        if "latest_speed" in self.query.annotations:
+            return self
+        return self.annotate(
+            latest_speed=models.Subquery(
+                SpeedReading.objects.filter(road_segment=models.OuterRef("pk"))
+                .order_by("-created_at")
+                .values("speed")[:1]
+            )
+        )
+
+    def with_traffic_classification(self) -> "RoadSegmentQuerySet":
+        """
+        Annotates `traffic_classification`, the classification name of the latest speed.
+        """
+        latest_speed = models.OuterRef("latest_speed")
+        return self.with_latest_speed().annotate(
+            traffic_classification=models.Subquery(
+                TrafficClassification.objects.filter(
+                    models.Q(min_speed__lte=latest_speed)
+                    | models.Q(min_speed__isnull=True),
+                    models.Q(max_speed__gte=latest_speed)
+                    | models.Q(max_speed__isnull=True),
+                )
+                .order_by("min_speed")
+                .values("name")[:1]
+            )
+        )
+
+    def with_speed_reading_count(self) -> "RoadSegmentQuerySet":
+        """
+        Annotates `speed_reading_count`, the number of readings of each road segment.
+        """
+        return self.annotate(
+            speed_reading_count=Coalesce(
+                models.Subquery(
+                    SpeedReading.objects.filter(road_segment=models.OuterRef("pk"))
+                    .order_by()
+                    .values("road_segment")
+                    .annotate(count=models.Count("*"))
+                    .values("count")
+                ),
+                0,
+            )
+        )
+
+
+class RoadSegmentManager(models.Manager.from_queryset(RoadSegmentQuerySet)):
     """
     Custom Manager to filter for coordinates that might match the input even when reversed.
     """
@@ -24,6 +84,120 @@ class RoadSegmentManager(models.Manager):
         return queryset.exists()
 
 
+class VersionedQuerySet(models.QuerySet):
+    """
+    QuerySet of a high-volume table without delete signals, so Django can still
+    fast-delete its rows, that bumps the table version once per bulk delete.
+    Rows deleted in cascade are bumped by the post_delete receiver of the parent.
+    """
+
+    def version_names(self) -> list[str]:
+        return [self.model._meta.label_lower]
+
+    def delete(self):
+        names = self.version_names()
+        deleted = super().delete()
+        if deleted[0]:
+            TableVersion.objects.bump(names)
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class SpeedReadingQuerySet(VersionedQuerySet):
+    def version_names(self) -> list[str]:
+        # Row versions of the road segments, see utils.table_versions.row_version_key
+        segment_label = RoadSegment._meta.label_lower
+        segment_ids = self.order_by().values_list("road_segment_id", flat=True)
+        return super().version_names() + [
+            f"{segment_label}:{pk}" for pk in set(segment_ids)
+        ]
+
+
+class TrafficRecordManager(models.Manager.from_queryset(VersionedQuerySet)):
+    """
+    Custom Manager to insert traffic records skipping the ones already stored.
+    """
+
+    def bulk_create_ignore_duplicates(self, records: list) -> list:
+        """
+        Inserts the records in a single INSERT ... ON CONFLICT DO NOTHING statement.
+        Inserted records get their primary key set, while records matching an
+        existing (sensor, car, road_segment, timestamp) keep a None primary key.
+        The table version isn't bumped here: callers bump it once the insert
+        committed (see save_traffic_records), so concurrent inserts don't queue
+        behind the lock of the version row until their transaction ends.
+        """
+        if not records:
+            return records
+
+        connection = connections[self._db or router.db_for_write(self.model)]
+        quote_name = connection.ops.quote_name
+        opts = self.model._meta
+        columns = ", ".join(
+            quote_name(opts.get_field(name).column)
+            for name in ("sensor", "car", "road_segment", "timestamp")
+        )
+        sql = (
+            f"INSERT INTO {quote_name(opts.db_table)} ({columns}) "
+            "SELECT * FROM unnest("
+            "%s::bigint[], %s::bigint[], %s::bigint[], %s::timestamptz[]) "
+            f"ON CONFLICT ({columns}) DO NOTHING "
+            f"RETURNING {quote_name(opts.pk.column)}, {columns}"
+        )
+        params = [
+            [record.sensor_id for record in records],
+            [record.car_id for record in records],
+            [record.road_segment_id for record in records],
+            [record.timestamp for record in records],
+        ]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            inserted = {tuple(row[1:]): row[0] for row in cursor.fetchall()}
+
+        for record in records:
+            key = (
+                record.sensor_id,
+                record.car_id,
+                record.road_segment_id,
+                record.timestamp,
+            )
+            record.pk = inserted.pop(key, None)
+            record._state.adding = record.pk is None
+            record._state.db = self.db
+
+        return records
+
+    def origin_destination_counts(self, start, end, max_gap) -> list[tuple]:
+        """
+        Pairs every sighting of a car with its next sighting at another sensor,
+        within the time window and at most max_gap apart, and counts the pairs.
+        Sorting and pairing run in the database with a window function over
+        (car, timestamp). Returns (origin_sensor_id, destination_sensor_id, count) rows.
+        """
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        sql = (
+            "SELECT origin, destination, COUNT(*) FROM ("
+            "  SELECT sensor_id AS origin,"
+            "         LEAD(sensor_id) OVER sightings AS destination,"
+            '         LEAD("timestamp") OVER sightings - "timestamp" AS gap'
+            f"  FROM {table}"
+            '  WHERE "timestamp" >= %s AND "timestamp" < %s'
+            '  WINDOW sightings AS (PARTITION BY car_id ORDER BY "timestamp")'
+            ") AS pairs "
+            "WHERE destination <> origin AND gap <= %s "
+            "GROUP BY origin, destination "
+            "ORDER BY origin, destination"
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [start, end, max_gap])
+            return cursor.fetchall()
+
+
 class TrafficClassification(models.Model):
     """
     Model representing the Traffic Classification available on Admin Panel.
@@ -47,6 +221,24 @@ class TrafficClassification(models.Model):
     def __str__(self) -> str:
         return f"{self.get_name_display()} ({self.min_speed or 'Null'} a {self.max_speed or 'Null'})"
 
+    @staticmethod
+    def for_speed(
+        speed: float, classifications: list
+    ) -> "TrafficClassification | None":
+        """
+        Same rules as SpeedReading.classification, over already loaded classifications.
+        """
+        for classification in sorted(
+            classifications, key=lambda c: (c.min_speed is None, c.min_speed or 0)
+        ):
+            if (
+                classification.min_speed is None or classification.min_speed <= speed
+            ) and (
+                classification.max_speed is None or classification.max_speed >= speed
+            ):
+                return classification
+        return None
+
 
 class RoadSegment(models.Model):
     """
@@ -55,6 +247,13 @@ class RoadSegment(models.Model):
 
     coordinate = models.LineStringField()
     road_length = models.FloatField()
+    # GeoJSON of `coordinate` computed by the database on every write, bulk
+    # ones included, so lists don't serialize geometries
+    coordinate_geojson = models.GeneratedField(
+        expression=Cast(AsGeoJSON("coordinate"), models.JSONField()),
+        output_field=models.JSONField(),
+        db_persist=True,
+    )
 
     objects = RoadSegmentManager()
 
@@ -89,11 +288,16 @@ class SpeedReading(models.Model):
     """
 
     road_segment = models.ForeignKey(
-        RoadSegment, on_delete=models.CASCADE, related_name="speed_readings"
+        RoadSegment,
+        on_delete=models.CASCADE,
+        related_name="speed_readings",
+        db_index=False,  # Covered by speedreading_seg_created_idx
     )
     speed = models.FloatField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = SpeedReadingQuerySet.as_manager()
+
     @property
     def classification(self) -> TrafficClassification | None:
         """
@@ -115,12 +319,29 @@ class SpeedReading(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["road_segment", "-created_at"],
+                name="speedreading_seg_created_idx",
+            ),
+            models.Index(fields=["-created_at"], name="speedreading_created_idx"),
+        ]
 
     def __str__(self) -> str:
         return (
             f"SpeedReading-> RoadSegment:{self.road_segment.id} at speed:{self.speed})"
         )
 
+    def delete(self, *args, **kwargs):
+        deleted = super().delete(*args, **kwargs)
+        TableVersion.objects.bump(
+            [
+                self._meta.label_lower,
+                f"{RoadSegment._meta.label_lower}:{self.road_segment_id}",
+            ]
+        )
+        return deleted
+
 
 class Car(models.Model):
     """
@@ -155,12 +376,383 @@ class TrafficRecord(models.Model):
         Sensor, on_delete=models.CASCADE, related_name="traffic_records"
     )
     car = models.ForeignKey(
-        Car, on_delete=models.CASCADE, related_name="traffic_records"
+        Car,
+        on_delete=models.CASCADE,
+        related_name="traffic_records",
+        db_index=False,  # Covered by trafficrecord_car_time_idx
     )
     road_segment = models.ForeignKey(
         RoadSegment, on_delete=models.CASCADE, related_name="traffic_records"
     )
     timestamp = models.DateTimeField()
 
+    objects = TrafficRecordManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["sensor", "car", "road_segment", "timestamp"],
+                name="unique_traffic_record",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["car", "timestamp"], name="trafficrecord_car_time_idx"
+            ),
+            BrinIndex(fields=["timestamp"], name="trafficrecord_time_brin"),
+        ]
+
     def __str__(self) -> str:
         return f"TrafficRecord-> Sensor:{self.sensor.name} Car:{self.car.license_plate} RoadSegment:{self.road_segment.id} at {self.timestamp}"
+
+    def delete(self, *args, **kwargs):
+        deleted = super().delete(*args, **kwargs)
+        TableVersion.objects.bump([self._meta.label_lower])
+        return deleted
+
+
+class IngestBatch(models.Model):
+    """
+    Model representing a batch of traffic records queued for asynchronous ingestion.
+    """
+
+    STATUS_CHOICES = [
+        ("PENDING", "pending"),
+        ("PROCESSING", "processing"),
+        ("DONE", "done"),
+        ("FAILED", "failed"),
+    ]
+
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default="PENDING", db_index=True
+    )
+    payload = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    record_count = models.PositiveIntegerField()
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"IngestBatch-> id:{self.id} records:{self.record_count} status:{self.status}"
+
+
+class SegmentFlowRollup(models.Model):
+    """
+    Model representing the traffic records and distinct cars counted on a road segment
+    during a time bucket, pre-aggregated for the flow endpoints.
+    """
+
+    road_segment = models.ForeignKey(
+        RoadSegment,
+        on_delete=models.CASCADE,
+        related_name="flow_rollups",
+        db_index=False,  # Covered by unique_segment_flow_rollup
+    )
+    bucket_seconds = models.PositiveIntegerField()
+    bucket_start = models.DateTimeField()
+    record_count = models.PositiveIntegerField()
+    car_count = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["road_segment", "bucket_seconds", "bucket_start"],
+                name="unique_segment_flow_rollup",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["bucket_seconds", "bucket_start"],
+                name="flowrollup_bucket_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"SegmentFlowRollup-> RoadSegment:{self.road_segment_id} at {self.bucket_start} ({self.bucket_seconds}s)"
+
+
+class ODMatrix(models.Model):
+    """
+    Model representing an origin-destination matrix computed for a time window,
+    shared by every worker process until it is OD_MATRIX_CACHE_TTL seconds old.
+    """
+
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    max_gap = models.PositiveIntegerField()  # Seconds
+    # Sparse matrix in coordinate format: sensors, origins, destinations, counts
+    matrix = models.JSONField()
+    computed_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["start", "end", "max_gap"],
+                name="unique_od_matrix_window",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"ODMatrix-> {self.start} to {self.end} (max gap {self.max_gap}s)"
+
+
+class SensorStatsManager(models.Manager):
+    """
+    Custom Manager to accumulate sensor statistics with a single upsert.
+    """
+
+    def add(self, stats: dict) -> None:
+        """
+        Adds {sensor_id: (record_count, last_seen)} to the stored statistics,
+        keeping the most recent last_seen of each sensor. Sensors deleted in
+        the meantime are skipped.
+        """
+        if not stats:
+            return
+
+        connection = connections[self._db or router.db_for_write(self.model)]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        sensors = connection.ops.quote_name(Sensor._meta.db_table)
+        sql = (
+            f"INSERT INTO {table} AS stats (sensor_id, record_count, last_seen, updated_at) "
+            "SELECT sensor_id, record_count, last_seen, NOW() FROM unnest("
+            "%s::bigint[], %s::bigint[], %s::timestamptz[]) "
+            "AS batch (sensor_id, record_count, last_seen) "
+            f"WHERE sensor_id IN (SELECT id FROM {sensors}) "
+            "ON CONFLICT (sensor_id) DO UPDATE SET "
+            "record_count = stats.record_count + EXCLUDED.record_count, "
+            "last_seen = GREATEST(stats.last_seen, EXCLUDED.last_seen), "
+            "updated_at = EXCLUDED.updated_at"
+        )
+        sensor_ids = sorted(stats)
+        params = [
+            sensor_ids,
+            [stats[sensor_id][0] for sensor_id in sensor_ids],
+            [stats[sensor_id][1] for sensor_id in sensor_ids],
+        ]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+
+class SensorStats(models.Model):
+    """
+    Model representing the ingestion statistics of a sensor.
+    """
+
+    sensor = models.OneToOneField(
+        Sensor, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    record_count = models.BigIntegerField(default=0)
+    last_seen = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = SensorStatsManager()
+
+    def __str__(self) -> str:
+        return f"SensorStats-> Sensor:{self.sensor_id} records:{self.record_count} last seen:{self.last_seen}"
+
+
+class SensorThroughputManager(models.Manager):
+    """
+    Custom Manager to accumulate the per-minute sensor throughput with a single upsert.
+    """
+
+    def add(self, counts: dict) -> None:
+        """
+        Adds {(sensor_id, minute): record_count} to the stored throughput.
+        Sensors deleted in the meantime are skipped.
+        """
+        if not counts:
+            return
+
+        connection = connections[self._db or router.db_for_write(self.model)]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        sensors = connection.ops.quote_name(Sensor._meta.db_table)
+        sql = (
+            f"INSERT INTO {table} AS throughput (sensor_id, minute, record_count) "
+            "SELECT * FROM unnest(%s::bigint[], %s::timestamptz[], %s::integer[]) "
+            "AS batch (sensor_id, minute, record_count) "
+            f"WHERE sensor_id IN (SELECT id FROM {sensors}) "
+            "ON CONFLICT (sensor_id, minute) DO UPDATE SET "
+            "record_count = throughput.record_count + EXCLUDED.record_count"
+        )
+        keys = sorted(counts)
+        params = [
+            [sensor_id for sensor_id, _ in keys],
+            [minute for _, minute in keys],
+            [counts[key] for key in keys],
+        ]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+
+class SensorThroughput(models.Model):
+    """
+    Model representing the traffic records ingested from a sensor during a minute.
+    """
+
+    sensor = models.ForeignKey(
+        Sensor,
+        on_delete=models.CASCADE,
+        related_name="throughput",
+        db_index=False,  # Covered by unique_sensor_throughput
+    )
+    minute = models.DateTimeField(db_index=True)
+    record_count = models.PositiveIntegerField(default=0)
+
+    objects = SensorThroughputManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["sensor", "minute"], name="unique_sensor_throughput"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"SensorThroughput-> Sensor:{self.sensor_id} at {self.minute}: {self.record_count}"
+
+
+class SpeedAnomaly(models.Model):
+    """
+    Model representing a speed reading much lower than the usual speed of its road segment.
+    """
+
+    road_segment = models.ForeignKey(
+        RoadSegment,
+        on_delete=models.CASCADE,
+        related_name="speed_anomalies",
+        db_index=False,  # Covered by unique_speed_anomaly
+    )
+    reading_at = models.DateTimeField()
+    speed = models.FloatField()
+    baseline = models.FloatField()
+    z_score = models.FloatField()
+    detected_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ["-detected_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["road_segment", "reading_at"], name="unique_speed_anomaly"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"SpeedAnomaly-> RoadSegment:{self.road_segment_id} at {self.reading_at} speed:{self.speed} (baseline:{self.baseline})"
+
+
+class SpeedForecast(models.Model):
+    """
+    Model representing the latest short-term speed forecast of a road segment.
+    """
+
+    road_segment = models.OneToOneField(
+        RoadSegment, on_delete=models.CASCADE, primary_key=True, related_name="forecast"
+    )
+    speed_15 = models.FloatField()
+    speed_30 = models.FloatField()
+    speed_60 = models.FloatField()
+    generated_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"SpeedForecast-> RoadSegment:{self.road_segment_id} 15m:{self.speed_15} 30m:{self.speed_30} 60m:{self.speed_60}"
+
+
+class TableVersionManager(models.Manager):
+    """
+    Custom Manager to bump version counters with a single upsert.
+    """
+
+    def bump(self, names) -> None:
+        """
+        Increments the version of every name and stamps it as modified now.
+        The upsert runs on the connection writes go to, inside its current
+        transaction: the version rows stay locked until it ends, so high-volume
+        writers bump once per statement, after their data committed.
+        Names are locked in sorted order, so concurrent single bumps can't
+        deadlock, but transactions bumping several times can.
+        """
+        names = sorted(set(names))
+        if not names:
+            return
+
+        connection = connections[self._db or router.db_for_write(self.model)]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        sql = (
+            f"INSERT INTO {table} AS versions (name, version, modified_at) "
+            "SELECT name, 1, clock_timestamp() FROM unnest(%s::varchar[]) AS batch (name) "
+            "ON CONFLICT (name) DO UPDATE SET "
+            "version = versions.version + 1, modified_at = EXCLUDED.modified_at"
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [names])
+
+
+class TableVersion(models.Model):
+    """
+    Model representing the write counter of a table, or of a single row, used
+    to validate cached API responses across worker processes.
+    """
+
+    name = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    modified_at = models.DateTimeField()
+
+    objects = TableVersionManager()
+
+    def __str__(self) -> str:
+        return f"TableVersion-> {self.name}: {self.version}"
+
+
+class IdempotencyKeyManager(models.Manager):
+    def claim(self, key: str, payload_hash: str, now, expiry, stale) -> bool:
+        """
+        Inserts a pending key, without status nor response, in a single
+        INSERT ... ON CONFLICT statement, so only one request claims it.
+        A key created before expiry, or still pending since before stale,
+        is claimed again. Returns whether the key was claimed.
+        """
+        connection = connections[self._db or router.db_for_write(self.model)]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        sql = (
+            f"INSERT INTO {table} AS claims "
+            "(key, payload_hash, status_code, response, created_at) "
+            "VALUES (%s, %s, NULL, NULL, %s) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "payload_hash = EXCLUDED.payload_hash, status_code = NULL, "
+            "response = NULL, created_at = EXCLUDED.created_at "
+            "WHERE claims.created_at < %s "
+            "OR (claims.status_code IS NULL AND claims.created_at < %s) "
+            "RETURNING key"
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [key, payload_hash, now, expiry, stale])
+            return cursor.fetchone() is not None
+
+
+class IdempotencyKey(models.Model):
+    """
+    Model representing the response given to a traffic record request sent
+    with an Idempotency-Key header, replayed to every worker process that
+    receives the same key again with the same payload.
+    A key without status code is held by a request still being processed.
+    """
+
+    # SHA-256 of the principal and the header value, so keys of any length
+    # fit and clients can't replay each other's responses
+    key = models.CharField(max_length=64, primary_key=True)
+    payload_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(encoder=DjangoJSONEncoder, null=True)
+    created_at = models.DateTimeField(db_index=True)
+
+    objects = IdempotencyKeyManager()
+
+    def __str__(self) -> str:
+        return f"IdempotencyKey-> {self.key}: {self.status_code}"
@@ -0,0 +1,90 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from traffic_monitor.models import (
+    Car,
+    RoadSegment,
+    Sensor,
+    SpeedReading,
+    TableVersion,
+    TrafficClassification,
+    TrafficRecord,
+)
+from traffic_monitor.utils.route_graph import route_graph
+from traffic_monitor.utils.sensor_registry import sensor_registry
+from traffic_monitor.utils.table_versions import (
+    bump_row_versions,
+    bump_table_version,
+    row_version_key,
+    table_version_key,
+)
+from traffic_monitor.utils.traffic_records_helper import car_cache
+
+
+@receiver(post_save, sender=Sensor)
+def register_sensor(sender, instance, **kwargs) -> None:
+    sensor_registry.set(instance.uuid, instance.id)
+
+
+@receiver(post_delete, sender=Sensor)
+def unregister_sensor(sender, instance, **kwargs) -> None:
+    sensor_registry.discard(instance.uuid)
+
+
+@receiver(post_save, sender=Car)
+def refresh_car_cache(sender, instance, created, **kwargs) -> None:
+    if not created:  # A renamed plate may still be cached under its old value
+        car_cache.clear()
+
+
+@receiver(post_delete, sender=Car)
+def evict_car(sender, instance, **kwargs) -> None:
+    car_cache.discard(instance.license_plate)
+
+
+@receiver(post_save, sender=RoadSegment)
+@receiver(post_delete, sender=RoadSegment)
+def invalidate_route_graph(sender, **kwargs) -> None:
+    route_graph.invalidate()
+
+
+@receiver(post_save, sender=RoadSegment)
+@receiver(post_save, sender=TrafficRecord)
+@receiver(post_save, sender=TrafficClassification)
+@receiver(post_delete, sender=TrafficClassification)
+def bump_version(sender, **kwargs) -> None:
+    bump_table_version(sender)
+
+
+@receiver(post_save, sender=RoadSegment)
+def bump_road_segment_version(sender, instance, **kwargs) -> None:
+    bump_row_versions(RoadSegment, [instance.pk])
+
+
+@receiver(post_save, sender=SpeedReading)
+def bump_speed_reading_versions(sender, instance, **kwargs) -> None:
+    TableVersion.objects.bump(
+        [
+            table_version_key(SpeedReading),
+            row_version_key(RoadSegment, instance.road_segment_id),
+        ]
+    )
+
+
+# Speed readings and traffic records have no delete receivers, so Django still
+# deletes them in bulk: their own deletes bump once per statement (see
+# VersionedQuerySet), and the cascades of their parents are bumped here.
+@receiver(post_delete, sender=RoadSegment)
+def bump_deleted_road_segment_versions(sender, instance, **kwargs) -> None:
+    TableVersion.objects.bump(
+        [
+            table_version_key(model)
+            for model in (RoadSegment, SpeedReading, TrafficRecord)
+        ]
+        + [row_version_key(RoadSegment, instance.pk)]
+    )
+
+
+@receiver(post_delete, sender=Car)
+@receiver(post_delete, sender=Sensor)
+def bump_deleted_traffic_records_version(sender, **kwargs) -> None:
+    bump_table_version(TrafficRecord)
@@ -7,9 +7,32 @@ from traffic_monitor.models import (
     Car,
 )
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.contrib.gis.geos import LineString
 from rest_framework.test import APIClient
 from django.utils import timezone
+from traffic_monitor.db_router import replica_monitor
+from traffic_monitor.utils.route_graph import route_graph
+from traffic_monitor.utils.sensor_registry import sensor_registry
+from traffic_monitor.utils.sensor_stats import sensor_stats
+from traffic_monitor.utils.traffic_records_helper import car_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    sensor_registry.clear()
+    car_cache.clear()
+    sensor_stats.clear()
+    route_graph.invalidate()
+    replica_monitor.clear()
+    cache.clear()
+    yield
+    sensor_registry.clear()
+    car_cache.clear()
+    sensor_stats.clear()
+    route_graph.invalidate()
+    replica_monitor.clear()
+    cache.clear()
 
 
 @pytest.fixture
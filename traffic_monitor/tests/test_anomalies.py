@@ -0,0 +1,79 @@
+import datetime
+import numpy as np
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from traffic_monitor.models import SpeedAnomaly, SpeedReading
+from traffic_monitor.utils.anomalies import ewma_baselines, speed_matrix
+
+
+def test_speed_matrix_keeps_latest_readings_per_segment():
+    segment_ids = np.array([1, 1, 1, 2])
+    speeds = np.array([10.0, 20.0, 30.0, 40.0])
+
+    segments, matrix, latest = speed_matrix(segment_ids, speeds, window=2)
+
+    assert segments.tolist() == [1, 2]
+    assert matrix[0].tolist() == [20.0, 30.0]
+    assert np.isnan(matrix[1, 0]) and matrix[1, 1] == 40.0
+    assert latest.tolist() == [2, 3]
+
+
+def test_ewma_baselines_skips_missing_readings():
+    history = np.array([[np.nan, 10.0, 10.0], [50.0, 50.0, 50.0]])
+
+    mean, std, count = ewma_baselines(history, alpha=0.5)
+
+    assert mean.tolist() == [10.0, 50.0]
+    assert std.tolist() == [0.0, 0.0]
+    assert count.tolist() == [2, 3]
+
+
+@pytest.fixture
+def congested_segment(sample_road_segment):
+    now = timezone.now()
+    speeds = [50.0, 52.0, 49.0, 51.0, 50.0, 48.0, 10.0]
+    for minutes, speed in enumerate(speeds):
+        reading = SpeedReading.objects.create(
+            road_segment=sample_road_segment, speed=speed
+        )
+        SpeedReading.objects.filter(id=reading.id).update(
+            created_at=now - datetime.timedelta(minutes=len(speeds) - minutes)
+        )
+    return sample_road_segment
+
+
+@pytest.mark.django_db
+def test_detect_anomalies_command(congested_segment):
+
+    call_command("detect_anomalies", stdout=StringIO())
+    call_command("detect_anomalies", stdout=StringIO())
+
+    anomaly = SpeedAnomaly.objects.get()
+    assert anomaly.road_segment == congested_segment
+    assert anomaly.speed == 10.0
+    assert anomaly.z_score < -3
+
+
+@pytest.mark.django_db
+def test_detect_anomalies_ignores_usual_speeds(sample_road_segment):
+
+    for speed in [50.0, 52.0, 49.0, 51.0, 50.0, 48.0, 47.0]:
+        SpeedReading.objects.create(road_segment=sample_road_segment, speed=speed)
+
+    call_command("detect_anomalies", stdout=StringIO())
+
+    assert not SpeedAnomaly.objects.exists()
+
+
+@pytest.mark.django_db
+def test_get_anomalies(api_client, congested_segment):
+
+    call_command("detect_anomalies", stdout=StringIO())
+
+    response = api_client.get("/api/anomalies/", {"road_segment": congested_segment.id})
+
+    assert response.status_code == 200
+    assert response.data["count"] == 1
+    assert response.data["results"][0]["speed"] == 10.0
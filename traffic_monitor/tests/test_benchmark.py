@@ -0,0 +1,126 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from traffic_monitor.models import SensorStats, TrafficRecord
+from traffic_monitor.utils.benchmark import run_benchmark
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/missing/":
+            status = 404
+        elif self.path == "/staff/":
+            status = 200 if "sessionid=" in self.headers.get("Cookie", "") else 403
+        else:
+            status = 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_run_benchmark(server):
+
+    result = run_benchmark(f"{server}/api/road_segments/", requests=20, concurrency=4)
+
+    assert result["requests"] == 20
+    assert result["errors"] == 0
+    assert result["requests_per_second"] > 0
+    assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+
+
+def test_run_benchmark_counts_errors(server):
+
+    result = run_benchmark(f"{server}/missing/", requests=5, concurrency=2)
+
+    assert result["errors"] == 5
+
+
+def test_benchmark_api_command(server):
+    out = StringIO()
+
+    call_command(
+        "benchmark_api",
+        base_url=server,
+        paths=["/api/road_segments/", "/api/speed_readings/"],
+        requests=10,
+        concurrency=2,
+        stdout=out,
+    )
+
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 2
+    assert lines[0].startswith("/api/road_segments/:")
+    assert "0 errors" in lines[1]
+
+
+@pytest.mark.django_db
+def test_benchmark_api_command_authenticates_staff_user(server, super_user):
+    out = StringIO()
+
+    call_command(
+        "benchmark_api",
+        base_url=server,
+        paths=["/staff/"],
+        requests=5,
+        concurrency=2,
+        user=super_user.username,
+        stdout=out,
+    )
+
+    assert "0 errors" in out.getvalue()
+    assert not Session.objects.exists()
+
+
+@pytest.mark.django_db
+def test_benchmark_api_command_rejects_non_staff_user(server, django_user_model):
+    django_user_model.objects.create_user(username="viewer", password="viewer")
+
+    with pytest.raises(CommandError):
+        call_command(
+            "benchmark_api",
+            base_url=server,
+            paths=["/staff/"],
+            user="viewer",
+            stdout=StringIO(),
+        )
+
+
+@pytest.mark.django_db
+def test_benchmark_api_command_seeds_traffic_records(
+    server, sample_road_segment, sample_sensor
+):
+    out = StringIO()
+
+    call_command(
+        "benchmark_api",
+        base_url=server,
+        paths=["/api/road_segments/"],
+        requests=2,
+        concurrency=1,
+        seed_records=50,
+        stdout=out,
+    )
+
+    assert out.getvalue().startswith(
+        f"Seeded {TrafficRecord.objects.count()} traffic records."
+    )
+    assert TrafficRecord.objects.count() > 0
+    assert SensorStats.objects.filter(sensor=sample_sensor).exists()
@@ -0,0 +1,27 @@
+from django.db import connections
+from traffic_monitor.utils.db_pool import connection_stats
+
+
+class FakePool:
+    def get_stats(self):
+        return {"pool_min": 2, "pool_max": 10, "pool_size": 3, "requests_waiting": 0}
+
+
+def test_connection_stats_without_pool():
+
+    stats = connection_stats()["databases"]["default"]
+
+    assert stats["pooled"] is False
+    assert stats["pool"] is None
+    assert stats["conn_max_age"] == connections["default"].settings_dict["CONN_MAX_AGE"]
+
+
+def test_connection_stats_with_pool(monkeypatch):
+    monkeypatch.setattr(
+        type(connections["default"]), "pool", property(lambda self: FakePool())
+    )
+
+    stats = connection_stats()["databases"]["default"]
+
+    assert stats["pooled"] is True
+    assert stats["pool"]["pool_size"] == 3
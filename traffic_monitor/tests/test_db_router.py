@@ -0,0 +1,123 @@
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+from traffic_monitor.db_router import ReplicaRouter, replica_monitor, use_replica
+from traffic_monitor.middleware import PRIMARY_PIN_COOKIE, ReplicaRoutingMiddleware
+from traffic_monitor.models import SpeedReading
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    lags = {"replica_1": 0.0, "replica_2": 0.0}
+    monkeypatch.setattr("traffic_monitor.db_router.replica_aliases", lambda: list(lags))
+    monkeypatch.setattr(replica_monitor, "lag", lambda alias: lags[alias])
+    return lags
+
+
+def test_router_reads_from_primary_by_default(replicas):
+    router = ReplicaRouter()
+
+    assert router.db_for_read(SpeedReading) is None
+    assert router.db_for_write(SpeedReading) == "default"
+
+
+def test_router_reads_from_replica_inside_use_replica(replicas):
+    router = ReplicaRouter()
+
+    with use_replica():
+        assert router.db_for_read(SpeedReading) in ("replica_1", "replica_2")
+        assert router.db_for_write(SpeedReading) == "default"
+
+    assert router.db_for_read(SpeedReading) is None
+
+
+def test_router_skips_lagging_replicas(settings, replicas):
+    settings.REPLICA_MAX_LAG = 5
+    replicas["replica_1"] = 60.0
+
+    with use_replica():
+        assert ReplicaRouter().db_for_read(SpeedReading) == "replica_2"
+
+
+def test_router_skips_servers_not_in_recovery(settings, monkeypatch):
+    class Cursor:
+        def __init__(self, lag):
+            self.lag = lag
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+        def execute(self, sql):
+            assert "pg_is_in_recovery()" in sql
+
+        def fetchone(self):
+            return (self.lag,)
+
+    class Connection:
+        def __init__(self, lag):
+            self.lag = lag
+
+        def cursor(self):
+            return Cursor(self.lag)
+
+    # The standalone server answers NULL, the standby its lag
+    monkeypatch.setattr(
+        "traffic_monitor.db_router.connections",
+        {"replica_1": Connection(None), "replica_2": Connection(0.5)},
+    )
+    monkeypatch.setattr(
+        "traffic_monitor.db_router.replica_aliases", lambda: ["replica_1", "replica_2"]
+    )
+
+    with use_replica():
+        assert ReplicaRouter().db_for_read(SpeedReading) == "replica_2"
+
+
+def test_replica_lag_is_checked_outside_the_lock(replicas, monkeypatch):
+    locked = []
+
+    def lag(alias):
+        locked.append(replica_monitor._lock.locked())
+        return 0.0
+
+    monkeypatch.setattr(replica_monitor, "lag", lag)
+
+    assert sorted(replica_monitor.healthy()) == ["replica_1", "replica_2"]
+    assert locked == [False, False]
+
+
+def test_router_without_replicas_reads_from_primary():
+
+    with use_replica():
+        assert ReplicaRouter().db_for_read(SpeedReading) is None
+
+
+def test_router_only_migrates_primary():
+    router = ReplicaRouter()
+
+    assert router.allow_migrate("default", "traffic_monitor")
+    assert not router.allow_migrate("replica_1", "traffic_monitor")
+
+
+def test_middleware_routes_safe_requests_to_replica(replicas):
+    read_from = []
+
+    def view(request):
+        read_from.append(ReplicaRouter().db_for_read(SpeedReading))
+        return HttpResponse(status=201 if request.method == "POST" else 200)
+
+    middleware = ReplicaRoutingMiddleware(view)
+    factory = RequestFactory()
+
+    middleware(factory.get("/api/speed_readings/"))
+    response = middleware(factory.post("/api/speed_readings/"))
+    pinned_request = factory.get("/api/speed_readings/")
+    pinned_request.COOKIES[PRIMARY_PIN_COOKIE] = "1"
+    middleware(pinned_request)
+
+    assert read_from[0] in ("replica_1", "replica_2")
+    assert read_from[1:] == [None, None]
+    assert PRIMARY_PIN_COOKIE in response.cookies
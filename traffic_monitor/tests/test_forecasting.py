@@ -0,0 +1,90 @@
+import datetime
+import numpy as np
+import pytest
+from io import StringIO
+from types import SimpleNamespace
+from django.core.management import call_command
+from django.utils import timezone
+from traffic_monitor.models import SpeedForecast, SpeedReading, TrafficClassification
+from traffic_monitor.utils.forecasting import (
+    SLOTS_PER_DAY,
+    last_observed,
+    seasonal_forecast,
+)
+
+
+def test_last_observed_skips_missing_buckets():
+    history = np.array([[10.0, 20.0, np.nan], [np.nan, np.nan, np.nan]])
+
+    last = last_observed(history)
+
+    assert last[0] == 20.0
+    assert np.isnan(last[1])
+
+
+def test_seasonal_forecast_follows_daily_profile(settings):
+    settings.FORECAST_DAMPING = 0.0
+    day = np.full(SLOTS_PER_DAY, 50.0)
+    day[8] = 10.0  # Daily rush hour at 02:00
+    history = np.concatenate([day, day, day[:4]])[np.newaxis, :]
+
+    forecasts = seasonal_forecast(
+        history, [2 * SLOTS_PER_DAY + 8, 2 * SLOTS_PER_DAY + 9], days=2
+    )
+
+    assert forecasts[0].tolist() == pytest.approx([10.0, 50.0])
+
+
+def test_seasonal_forecast_applies_recent_residuals(settings):
+    settings.FORECAST_DAMPING = 0.5
+    settings.FORECAST_LEVEL_ALPHA = 1.0
+    day = np.full(SLOTS_PER_DAY, 50.0)
+    today = np.full(4, 40.0)
+    history = np.concatenate([day, today])[np.newaxis, :]
+
+    forecasts = seasonal_forecast(
+        history, [SLOTS_PER_DAY + 4, SLOTS_PER_DAY + 5], days=1
+    )
+
+    assert forecasts[0].tolist() == pytest.approx([45.0, 47.5])
+
+
+def test_seasonal_forecast_falls_back_to_last_speed():
+    history = np.full((1, SLOTS_PER_DAY + 2), np.nan)
+    history[0, -1] = 30.0
+
+    forecasts = seasonal_forecast(history, [SLOTS_PER_DAY + 3], days=1)
+
+    assert forecasts[0].tolist() == [30.0]
+
+
+def test_traffic_classification_for_speed():
+    classifications = [
+        SimpleNamespace(name="LOW", min_speed=51.0, max_speed=None),
+        SimpleNamespace(name="HIGH", min_speed=0, max_speed=20.99),
+        SimpleNamespace(name="MEDIUM", min_speed=21.0, max_speed=50.99),
+    ]
+
+    assert TrafficClassification.for_speed(10.0, classifications).name == "HIGH"
+    assert TrafficClassification.for_speed(30.0, classifications).name == "MEDIUM"
+    assert TrafficClassification.for_speed(80.0, classifications).name == "LOW"
+
+
+@pytest.mark.django_db
+def test_forecast_speeds_command(sample_road_segment):
+    now = timezone.now()
+    for minutes in range(15, 120, 15):
+        reading = SpeedReading.objects.create(
+            road_segment=sample_road_segment, speed=30.0
+        )
+        SpeedReading.objects.filter(id=reading.id).update(
+            created_at=now - datetime.timedelta(minutes=minutes)
+        )
+
+    call_command("forecast_speeds", stdout=StringIO())
+    call_command("forecast_speeds", stdout=StringIO())
+
+    forecast = SpeedForecast.objects.get()
+    assert forecast.road_segment == sample_road_segment
+    assert forecast.speed_15 == pytest.approx(30.0)
+    assert forecast.speed_60 == pytest.approx(30.0)
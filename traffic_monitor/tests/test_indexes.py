@@ -0,0 +1,55 @@
+import datetime
+import pytest
+from django.db import connection
+from django.utils import timezone
+from traffic_monitor.models import SpeedReading, TrafficRecord
+
+
+@pytest.fixture
+def without_seqscan():
+    """
+    Test tables are tiny, so the planner would always pick a sequential scan.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+
+
+@pytest.mark.django_db
+def test_latest_speed_reading_uses_segment_index(without_seqscan, sample_road_segment):
+
+    plan = (
+        SpeedReading.objects.filter(road_segment=sample_road_segment)
+        .order_by("-created_at")[:1]
+        .explain()
+    )
+
+    assert "speedreading_seg_created_idx" in plan
+
+
+@pytest.mark.django_db
+def test_speed_reading_default_ordering_uses_index(without_seqscan):
+
+    plan = SpeedReading.objects.all()[:25].explain()
+
+    assert "speedreading_created_idx" in plan
+
+
+@pytest.mark.django_db
+def test_license_plate_lookup_uses_car_index(without_seqscan):
+
+    plan = TrafficRecord.objects.filter(
+        car__license_plate="AA00AA",
+        timestamp__gte=timezone.now() - datetime.timedelta(days=1),
+    ).explain()
+
+    assert "trafficrecord_car_time_idx" in plan
+
+
+@pytest.mark.django_db
+def test_timestamp_range_uses_brin_index(without_seqscan):
+
+    plan = TrafficRecord.objects.filter(
+        timestamp__gte=timezone.now() - datetime.timedelta(days=1)
+    ).explain()
+
+    assert "trafficrecord_time_brin" in plan
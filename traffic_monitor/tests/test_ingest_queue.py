@@ -0,0 +1,122 @@
+import datetime
+import pytest
+from django.utils import timezone
+from traffic_monitor.models import IngestBatch, TrafficRecord
+from traffic_monitor.utils import ingest_queue
+from traffic_monitor.utils.ingest_queue import (
+    FAILED_BATCH_ERROR,
+    enqueue_traffic_records,
+    process_ingest_queue,
+)
+
+
+@pytest.mark.django_db
+def test_process_ingest_queue_merges_batches(traffic_record_list_payload):
+
+    first = enqueue_traffic_records(traffic_record_list_payload)
+    second = enqueue_traffic_records(
+        [{"car__license_plate": "CC22CC"}] + traffic_record_list_payload
+    )
+
+    assert process_ingest_queue(max_records=10) == 2
+
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert first.status == "DONE"
+    assert first.result["count"] == 2
+    assert first.result["invalid_inputs"] == []
+    assert second.status == "DONE"
+    assert second.result["count"] == 2
+    assert second.result["invalid_inputs"][0]["index"] == 0
+    assert second.payload == []
+    assert TrafficRecord.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_process_ingest_queue_respects_max_records(traffic_record_list_payload):
+
+    enqueue_traffic_records(traffic_record_list_payload)
+    enqueue_traffic_records(traffic_record_list_payload)
+
+    assert process_ingest_queue(max_records=2) == 1
+    assert IngestBatch.objects.filter(status="PENDING").count() == 1
+    assert process_ingest_queue(max_records=2) == 1
+    assert process_ingest_queue(max_records=2) == 0
+
+
+@pytest.mark.django_db
+def test_process_ingest_queue_reclaims_stale_batches(
+    settings, traffic_record_list_payload
+):
+
+    settings.INGEST_QUEUE_CLAIM_TIMEOUT = 60
+    stale = enqueue_traffic_records(traffic_record_list_payload)
+    running = enqueue_traffic_records(traffic_record_list_payload)
+    IngestBatch.objects.filter(id=stale.id).update(
+        status="PROCESSING",
+        claimed_at=timezone.now() - datetime.timedelta(seconds=120),
+    )
+    IngestBatch.objects.filter(id=running.id).update(
+        status="PROCESSING", claimed_at=timezone.now()
+    )
+
+    assert process_ingest_queue(max_records=10) == 1
+
+    stale.refresh_from_db()
+    running.refresh_from_db()
+    assert stale.status == "DONE"
+    assert stale.result["count"] == 2
+    assert running.status == "PROCESSING"
+
+
+@pytest.mark.django_db
+def test_process_ingest_queue_fails_only_the_broken_batch(
+    traffic_record_list_payload, monkeypatch
+):
+
+    first = enqueue_traffic_records(traffic_record_list_payload)
+    broken = enqueue_traffic_records([{"car__license_plate": "CC22CC"}])
+    save_traffic_records = ingest_queue.save_traffic_records
+
+    def fail_on_broken_batch(data, serialize=True):
+        if {"car__license_plate": "CC22CC"} in data:
+            raise RuntimeError("secret connection details")
+        return save_traffic_records(data, serialize)
+
+    monkeypatch.setattr(ingest_queue, "save_traffic_records", fail_on_broken_batch)
+
+    assert process_ingest_queue(max_records=10) == 2
+
+    first.refresh_from_db()
+    broken.refresh_from_db()
+    assert first.status == "DONE"
+    assert first.result["count"] == 2
+    assert broken.status == "FAILED"
+    assert broken.result == {"error": FAILED_BATCH_ERROR}
+    assert TrafficRecord.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_process_ingest_queue_counts_records_stored_before_a_failure(
+    traffic_record_list_payload, monkeypatch
+):
+
+    first = enqueue_traffic_records(traffic_record_list_payload)
+    second = enqueue_traffic_records(traffic_record_list_payload[::-1])
+    save_traffic_records = ingest_queue.save_traffic_records
+
+    def fail_after_saving(data, serialize=True):
+        result = save_traffic_records(data, serialize)
+        if len(data) > len(traffic_record_list_payload):
+            raise RuntimeError("connection lost")
+        return result
+
+    monkeypatch.setattr(ingest_queue, "save_traffic_records", fail_after_saving)
+
+    assert process_ingest_queue(max_records=10) == 2
+
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert first.result["count"] == 2
+    assert second.result["count"] == 2
+    assert TrafficRecord.objects.count() == 2
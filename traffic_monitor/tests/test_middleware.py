@@ -0,0 +1,52 @@
+import brotli
+import gzip
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from traffic_monitor.middleware import CompressionMiddleware
+
+
+@pytest.fixture
+def compress(settings):
+    settings.COMPRESSION_MIN_SIZE = 100
+
+    def compress(response, accept_encoding):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    return compress
+
+
+def test_compression_prefers_brotli(compress):
+    content = b'{"speed": 50.0}' * 100
+
+    response = compress(HttpResponse(content), "gzip, deflate, br")
+
+    assert response["Content-Encoding"] == "br"
+    assert response["Vary"] == "Accept-Encoding"
+    assert brotli.decompress(response.content) == content
+
+
+def test_compression_falls_back_to_gzip(compress):
+    content = b'{"speed": 50.0}' * 100
+
+    response = compress(HttpResponse(content), "gzip, br;q=0")
+
+    assert response["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.content) == content
+
+
+def test_compression_skips_small_responses(compress):
+
+    response = compress(HttpResponse(b'{"speed": 50.0}'), "gzip, br")
+
+    assert not response.has_header("Content-Encoding")
+
+
+def test_compression_streaming_response(compress):
+    chunks = [b'{"type": "FeatureCollection", "features": [', b"{}, " * 50, b"{}]}"]
+
+    response = compress(StreamingHttpResponse(iter(chunks)), "br")
+
+    assert response["Content-Encoding"] == "br"
+    assert brotli.decompress(b"".join(response.streaming_content)) == b"".join(chunks)
@@ -1,6 +1,13 @@
 import pytest
 from django.contrib.gis.geos import LineString
-from traffic_monitor.models import TrafficClassification, RoadSegment, SpeedReading
+from django.db.models.deletion import Collector
+from traffic_monitor.models import (
+    TrafficClassification,
+    RoadSegment,
+    SpeedReading,
+    TrafficRecord,
+)
+from traffic_monitor.utils.table_versions import row_version, table_versions
 from django.core.exceptions import ValidationError
 
 
@@ -141,3 +148,72 @@ def test_speed_reading_classification_property(sample_road_segment):
 def test_speed_reading_classification_no_match(sample_road_segment):
     reading = SpeedReading.objects.create(road_segment=sample_road_segment, speed=-10.0)
     assert reading.classification is None
+
+
+@pytest.mark.django_db
+def test_road_segment_coordinate_geojson_follows_coordinate(
+    sample_road_segment, reversed_line_string
+):
+
+    assert sample_road_segment.coordinate_geojson["type"] == "LineString"
+
+    sample_road_segment.coordinate = reversed_line_string
+    sample_road_segment.save(update_fields=["coordinate"])
+    sample_road_segment.refresh_from_db()
+
+    assert sample_road_segment.coordinate_geojson["coordinates"] == [
+        list(point) for point in reversed_line_string.coords
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_created_road_segments_have_coordinate_geojson(reversed_line_string):
+
+    (road_segment,) = RoadSegment.objects.bulk_create(
+        [RoadSegment(coordinate=reversed_line_string, road_length=100.0)]
+    )
+    road_segment.refresh_from_db()
+
+    assert road_segment.coordinate_geojson["coordinates"] == [
+        list(point) for point in reversed_line_string.coords
+    ]
+
+
+def test_traffic_records_are_fast_deleted():
+    # No delete receivers, so cascades delete them without loading each row
+    collector = Collector(using="default", origin=None)
+
+    assert collector.can_fast_delete(TrafficRecord.objects.all())
+
+
+def test_speed_readings_are_fast_deleted():
+    collector = Collector(using="default", origin=None)
+
+    assert collector.can_fast_delete(SpeedReading.objects.all())
+
+
+@pytest.mark.django_db
+def test_speed_reading_delete_bumps_versions(sample_road_segment):
+    SpeedReading.objects.create(road_segment=sample_road_segment, speed=50)
+    before = table_versions([SpeedReading]), row_version(
+        RoadSegment, sample_road_segment.pk
+    )
+
+    SpeedReading.objects.filter(road_segment=sample_road_segment).delete()
+
+    after = table_versions([SpeedReading]), row_version(
+        RoadSegment, sample_road_segment.pk
+    )
+    assert after[0][0] == before[0][0] + 1
+    assert after[1] == before[1] + 1
+
+
+@pytest.mark.django_db
+def test_road_segment_delete_bumps_cascaded_versions(sample_traffic_record):
+    before = table_versions([SpeedReading, TrafficRecord])
+
+    sample_traffic_record.road_segment.delete()
+
+    assert not TrafficRecord.objects.exists()
+    after = table_versions([SpeedReading, TrafficRecord])
+    assert [version - 1 for version in after] == before
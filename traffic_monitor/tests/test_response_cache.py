@@ -0,0 +1,77 @@
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import generics
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from traffic_monitor.api.views import ResponseCacheMixin
+from traffic_monitor.utils.response_cache import get_or_compute
+
+
+class SourceView(generics.GenericAPIView):
+    permission_classes = [AllowAny]
+    calls = 0
+
+    def get(self, request, *args, **kwargs):
+        SourceView.calls += 1
+        return Response({"id": 1}, status=203, headers={"X-Source": "view"})
+
+
+class CachedView(ResponseCacheMixin, SourceView):
+    def get_cache_versions(self) -> list:
+        return [1]
+
+
+class UnversionedView(ResponseCacheMixin, SourceView):
+    pass
+
+
+def test_get_or_compute_caches_value():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"count": 1}
+
+    assert get_or_compute("key", compute) == {"count": 1}
+    assert get_or_compute("key", compute) == {"count": 1}
+    assert len(calls) == 1
+
+
+def test_get_or_compute_waits_for_lock_holder(settings, monkeypatch):
+    settings.RESPONSE_CACHE_LOCK_TIMEOUT = 1
+    cache.add("key:lock", 1)
+    monkeypatch.setattr(
+        "traffic_monitor.utils.response_cache.time.sleep",
+        lambda seconds: cache.set("key", "computed elsewhere"),
+    )
+
+    assert get_or_compute("key", lambda: "computed here") == "computed elsewhere"
+
+
+def test_get_or_compute_releases_lock_on_error():
+
+    with pytest.raises(ValueError):
+        get_or_compute("key", lambda: int("not a number"))
+
+    assert cache.get("key:lock") is None
+
+
+def test_response_cache_mixin_restores_status_and_headers():
+    SourceView.calls = 0
+    view = CachedView.as_view()
+
+    responses = [view(APIRequestFactory().get("/cached/")) for _ in range(2)]
+
+    assert SourceView.calls == 1
+    for response in responses:
+        assert response.status_code == 203
+        assert response["X-Source"] == "view"
+        assert response.data == {"id": 1}
+
+
+def test_response_cache_mixin_requires_versions():
+
+    with pytest.raises(ImproperlyConfigured):
+        UnversionedView.as_view()(APIRequestFactory().get("/cached/"))
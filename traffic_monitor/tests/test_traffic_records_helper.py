@@ -0,0 +1,203 @@
+import datetime
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from traffic_monitor.api.serializers import TrafficRecordListSerializer
+from traffic_monitor.models import Car, Sensor, TrafficRecord
+from traffic_monitor.utils.lru_cache import LRUCache
+from traffic_monitor.utils.traffic_records_helper import (
+    car_cache,
+    get_or_create_car_dict,
+    get_valide_uuids,
+    save_traffic_records,
+)
+
+
+@pytest.mark.django_db
+def test_get_or_create_car_dict_creates_missing_plates(
+    sample_car, django_assert_num_queries
+):
+
+    with django_assert_num_queries(3):
+        cars = get_or_create_car_dict({"AA00AA", "BB11BB", "CC22CC"})
+
+    assert cars["AA00AA"] == sample_car.id
+    assert cars["BB11BB"] == Car.objects.get(license_plate="BB11BB").id
+    assert cars["CC22CC"] == Car.objects.get(license_plate="CC22CC").id
+    assert Car.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_get_or_create_car_dict_skips_insert_when_all_known(
+    sample_car, django_assert_num_queries
+):
+
+    with django_assert_num_queries(1):
+        cars = get_or_create_car_dict({"AA00AA"})
+
+    assert cars == {"AA00AA": sample_car.id}
+
+
+@pytest.mark.django_db
+def test_get_or_create_car_dict_uses_car_cache(sample_car, django_assert_num_queries):
+
+    get_or_create_car_dict({"AA00AA", "BB11BB"})
+
+    with django_assert_num_queries(0):
+        cars = get_or_create_car_dict({"AA00AA", "BB11BB"})
+
+    assert cars["AA00AA"] == sample_car.id
+    assert car_cache.stats()["hits"] == 2
+    assert car_cache.stats()["misses"] == 2
+
+
+@pytest.mark.django_db
+def test_car_cache_evicts_deleted_cars(sample_car):
+
+    get_or_create_car_dict({"AA00AA"})
+    sample_car.delete()
+
+    cars = get_or_create_car_dict({"AA00AA"})
+
+    assert cars["AA00AA"] == Car.objects.get(license_plate="AA00AA").id
+    assert cars["AA00AA"] != sample_car.id
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+
+    cache.set_many({"a": 1, "b": 2})
+    cache.get_many(["a"])
+    cache.set_many({"c": 3})
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+    assert cache.stats() == {"hits": 3, "misses": 1, "size": 2, "maxsize": 2}
+
+
+@pytest.mark.django_db
+def test_get_or_create_car_dict_invalid_plates():
+
+    cars = get_or_create_car_dict({None, "", "X" * 16})
+
+    assert cars == {None: None, "": None, "X" * 16: None}
+    assert Car.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_get_or_create_car_dict_strips_plates(sample_car):
+
+    cars = get_or_create_car_dict({" AA00AA", "AA00AA\n", " BB11BB ", "   "})
+
+    assert cars == {
+        " AA00AA": sample_car.id,
+        "AA00AA\n": sample_car.id,
+        " BB11BB ": Car.objects.get(license_plate="BB11BB").id,
+        "   ": None,
+    }
+    assert Car.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_get_valide_uuids_maps_known_sensors(sample_sensor):
+
+    sensors = get_valide_uuids({sample_sensor.uuid, "not-a-uuid", None})
+
+    assert sensors == {
+        str(sample_sensor.uuid): sample_sensor.id,
+        "not-a-uuid": None,
+        "None": None,
+    }
+
+
+@pytest.mark.django_db
+def test_get_valide_uuids_unknown_sensor():
+
+    sensors = get_valide_uuids({"00000000-0000-0000-0000-000000000000"})
+
+    assert sensors == {"00000000-0000-0000-0000-000000000000": None}
+
+
+@pytest.mark.django_db
+def test_get_valide_uuids_uses_registry(sample_sensor, django_assert_num_queries):
+
+    get_valide_uuids({sample_sensor.uuid})
+
+    with django_assert_num_queries(0):
+        sensors = get_valide_uuids({sample_sensor.uuid})
+
+    assert sensors[str(sample_sensor.uuid)] == sample_sensor.id
+
+
+@pytest.mark.django_db
+def test_sensor_registry_follows_sensor_changes(sample_sensor):
+
+    get_valide_uuids({sample_sensor.uuid})
+    sample_sensor.delete()
+
+    assert get_valide_uuids({"2fad650b-de67-48c5-bb0c-0d6eb02e8499"}) == {
+        "2fad650b-de67-48c5-bb0c-0d6eb02e8499": None
+    }
+
+    sensor = Sensor.objects.create(
+        name="New Sensor", uuid="2fad650b-de67-48c5-bb0c-0d6eb02e8499"
+    )
+
+    assert get_valide_uuids({"2fad650b-de67-48c5-bb0c-0d6eb02e8499"}) == {
+        "2fad650b-de67-48c5-bb0c-0d6eb02e8499": sensor.id
+    }
+
+
+@pytest.mark.django_db
+def test_save_traffic_records_queries_dont_grow_with_records(
+    traffic_record_list_payload,
+):
+    start = datetime.datetime(2025, 5, 22, tzinfo=datetime.timezone.utc)
+
+    def payload(count: int, offset: int) -> list:
+        return [
+            {
+                **traffic_record_list_payload[index % 2],
+                "timestamp": (
+                    start + datetime.timedelta(seconds=offset + index)
+                ).isoformat(),
+            }
+            for index in range(count)
+        ]
+
+    save_traffic_records(payload(2, 0))  # Warms the car cache and sensor registry
+
+    query_counts = []
+    for count, offset in ((2, 100), (20, 200)):
+        with CaptureQueriesContext(connection) as context:
+            result = save_traffic_records(payload(count, offset))
+        assert len(result["ids"]) == count
+        query_counts.append(len(context.captured_queries))
+
+    assert query_counts[0] == query_counts[1]
+    assert TrafficRecord.objects.count() == 24
+
+
+@pytest.mark.django_db
+def test_save_traffic_records_retries_chunks_with_stale_cars(
+    sample_car, traffic_record_list_payload, monkeypatch
+):
+
+    # Car deleted and created again by another worker process
+    car_cache.set_many({"AA00AA": sample_car.id + 1000})
+    create = TrafficRecordListSerializer.create
+    calls = []
+
+    def fail_on_stale_car(self, validated_data):
+        calls.append(validated_data)
+        if validated_data[0]["car"] != sample_car.id:
+            raise IntegrityError("foreign key violation")
+        return create(self, validated_data)
+
+    monkeypatch.setattr(TrafficRecordListSerializer, "create", fail_on_stale_car)
+
+    result = save_traffic_records(traffic_record_list_payload, serialize=False)
+
+    assert len(calls) == 2
+    assert result["failed_chunks"] == []
+    assert TrafficRecord.objects.filter(car=sample_car).count() == 1
+    assert car_cache.get_many(["AA00AA"]) == {"AA00AA": sample_car.id}
@@ -0,0 +1,80 @@
+import pytest
+import datetime
+from django.contrib.gis.geos import LineString
+from traffic_monitor.models import RoadSegment, TrafficRecord
+
+
+@pytest.mark.django_db
+def test_get_car_trajectory(
+    api_client,
+    super_user,
+    sample_road_segment,
+    sample_sensor,
+    sample_car,
+    django_assert_num_queries,
+):
+
+    api_client.force_authenticate(user=super_user)
+
+    other_segment = RoadSegment.objects.create(
+        coordinate=LineString((1.0, 2.0), (3.0, 4.0)), road_length=50.0
+    )
+    start = datetime.datetime(2025, 5, 22, 17, 0, tzinfo=datetime.timezone.utc)
+    for minutes, segment in [
+        (0, sample_road_segment),
+        (2, sample_road_segment),
+        (5, other_segment),
+    ]:
+        TrafficRecord.objects.create(
+            road_segment=segment,
+            sensor=sample_sensor,
+            car=sample_car,
+            timestamp=start + datetime.timedelta(minutes=minutes),
+        )
+
+    with django_assert_num_queries(1):
+        response = api_client.get(
+            "/api/cars/AA00AA/trajectory/",
+            {"from": "2025-05-22T16:00:00Z", "to": "2025-05-22T18:00:00Z"},
+        )
+
+    assert response.status_code == 200
+    assert response.data["road_segments"] == [
+        sample_road_segment.id,
+        sample_road_segment.id,
+        other_segment.id,
+    ]
+    assert response.data["sensors"] == [sample_sensor.id] * 3
+    assert response.data["dwell_times"] == [None, 120.0, 0.0]
+    assert response.data["transit_times"] == [None, 0.0, 180.0]
+
+
+@pytest.mark.django_db
+def test_get_car_trajectory_default_window(
+    api_client, super_user, sample_traffic_record
+):
+
+    api_client.force_authenticate(user=super_user)
+
+    response = api_client.get("/api/cars/AA00AA/trajectory/")
+
+    assert response.status_code == 200
+    assert len(response.data["timestamps"]) == 1
+
+
+@pytest.mark.django_db
+def test_get_car_trajectory_invalid_window(api_client, super_user):
+
+    api_client.force_authenticate(user=super_user)
+
+    response = api_client.get("/api/cars/AA00AA/trajectory/", {"from": "yesterday"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_get_car_trajectory_without_credentials(api_client):
+
+    response = api_client.get("/api/cars/AA00AA/trajectory/")
+
+    assert response.status_code == 403
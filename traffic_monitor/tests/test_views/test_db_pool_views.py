@@ -0,0 +1,19 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_get_db_pool_stats(api_client, settings):
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}")
+    response = api_client.get("/api/db/pool/")
+
+    assert response.status_code == 200
+    assert "default" in response.data["databases"]
+
+
+@pytest.mark.django_db
+def test_get_db_pool_stats_without_credentials(api_client):
+
+    response = api_client.get("/api/db/pool/")
+
+    assert response.status_code == 403
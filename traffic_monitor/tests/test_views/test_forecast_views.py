@@ -0,0 +1,39 @@
+import pytest
+from django.utils import timezone
+from traffic_monitor.models import SpeedForecast
+
+
+@pytest.mark.django_db
+def test_get_road_segment_forecast(api_client, sample_road_segment):
+    SpeedForecast.objects.create(
+        road_segment=sample_road_segment,
+        speed_15=15.0,
+        speed_30=35.0,
+        speed_60=60.0,
+        generated_at=timezone.now(),
+    )
+
+    response = api_client.get(f"/api/road_segments/{sample_road_segment.id}/forecast/")
+
+    assert response.status_code == 200
+    assert response.data["road_segment"] == sample_road_segment.id
+    assert [
+        (forecast["horizon"], forecast["traffic_classification"])
+        for forecast in response.data["forecasts"]
+    ] == [(15, "HIGH"), (30, "MEDIUM"), (60, "LOW")]
+
+
+@pytest.mark.django_db
+def test_get_road_segment_forecast_not_computed(api_client, sample_road_segment):
+
+    response = api_client.get(f"/api/road_segments/{sample_road_segment.id}/forecast/")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_get_unknown_road_segment_forecast(api_client):
+
+    response = api_client.get("/api/road_segments/999/forecast/")
+
+    assert response.status_code == 404
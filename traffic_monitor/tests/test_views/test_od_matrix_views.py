@@ -0,0 +1,120 @@
+import pytest
+import datetime
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from traffic_monitor.models import Car, ODMatrix, Sensor, TrafficRecord
+from traffic_monitor.utils.od_matrix import default_window_end
+
+START = datetime.datetime(2025, 5, 22, 17, 0, tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture
+def other_sensor():
+    return Sensor.objects.create(
+        name="Other Sensor", uuid="4bcb4d8f-0a1b-4bbd-8d7b-1b6a4c9f3f10"
+    )
+
+
+@pytest.fixture
+def od_records(sample_road_segment, sample_sensor, other_sensor, sample_car):
+    other_car = Car.objects.create(license_plate="BB11BB")
+    sightings = [
+        (sample_car, sample_sensor, 0),
+        (sample_car, other_sensor, 10),
+        (sample_car, sample_sensor, 200),
+        (other_car, sample_sensor, 5),
+        (other_car, other_sensor, 30),
+    ]
+    for car, sensor, minutes in sightings:
+        TrafficRecord.objects.create(
+            road_segment=sample_road_segment,
+            sensor=sensor,
+            car=car,
+            timestamp=START + datetime.timedelta(minutes=minutes),
+        )
+
+
+@pytest.mark.django_db
+def test_get_od_matrix(api_client, super_user, sample_sensor, other_sensor, od_records):
+
+    api_client.force_authenticate(user=super_user)
+
+    response = api_client.get(
+        "/api/od_matrix/",
+        {"from": "2025-05-22T16:00:00Z", "to": "2025-05-23T00:00:00Z", "max_gap": 60},
+    )
+
+    assert response.status_code == 200
+    assert response.data["origins"] == [sample_sensor.id]
+    assert response.data["destinations"] == [other_sensor.id]
+    assert response.data["counts"] == [2]
+
+
+@pytest.mark.django_db
+def test_compute_od_matrix_command_stores_matrix(
+    api_client, super_user, od_records, tmp_path, django_assert_num_queries
+):
+
+    output = tmp_path / "od.csv"
+    call_command(
+        "compute_od_matrix",
+        "--from=2025-05-22T16:00:00Z",
+        "--to=2025-05-23T00:00:00Z",
+        "--max-gap=300",
+        f"--output={output}",
+        stdout=StringIO(),
+    )
+
+    assert len(output.read_text().splitlines()) == 3
+
+    cache.clear()  # Other worker processes don't share the local cache
+    api_client.force_authenticate(user=super_user)
+    with django_assert_num_queries(1):
+        response = api_client.get(
+            "/api/od_matrix/",
+            {
+                "from": "2025-05-22T16:00:00Z",
+                "to": "2025-05-23T00:00:00Z",
+                "max_gap": 300,
+            },
+        )
+
+    assert sorted(response.data["counts"]) == [1, 2]
+
+
+@pytest.mark.django_db
+def test_get_od_matrix_invalid_max_gap(api_client, super_user):
+
+    api_client.force_authenticate(user=super_user)
+
+    response = api_client.get("/api/od_matrix/", {"max_gap": "soon"})
+
+    assert response.status_code == 400
+
+
+def test_default_window_end_is_bucketed(settings):
+
+    settings.OD_MATRIX_WINDOW_BUCKET = 300
+
+    end = default_window_end()
+
+    assert end.timestamp() % 300 == 0
+    assert end.microsecond == 0
+    assert timezone.now() - datetime.timedelta(seconds=300) < end <= timezone.now()
+
+
+@pytest.mark.django_db
+def test_get_od_matrix_default_window_is_reused(
+    api_client, super_user, od_records, django_assert_num_queries
+):
+
+    api_client.force_authenticate(user=super_user)
+    first = api_client.get("/api/od_matrix/")
+
+    with django_assert_num_queries(1):
+        second = api_client.get("/api/od_matrix/")
+
+    assert second.data == first.data
+    assert ODMatrix.objects.count() == 1
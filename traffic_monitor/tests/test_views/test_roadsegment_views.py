@@ -1,6 +1,9 @@
+import json
 import pytest
 from traffic_monitor.models import RoadSegment, SpeedReading
 from django.contrib.gis.geos import LineString
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 
 @pytest.mark.django_db
@@ -17,6 +20,121 @@ def test_get_road_segment_list(api_client, sample_road_segment):
     assert response_read.data["count"] == 2
 
 
+@pytest.mark.django_db
+def test_get_road_segment_list_annotates_speed_data(
+    api_client, sample_road_segment, sample_speed_readings
+):
+
+    response_read = api_client.get("/api/road_segments/", format="json")
+
+    properties = response_read.data["results"]["features"][0]["properties"]
+    assert properties["speed_records"] == 3
+    assert properties["traffic_classification"] == "LOW"
+
+
+@pytest.mark.django_db
+def test_get_road_segment_list_sparse_fields(
+    api_client, sample_road_segment, sample_speed_readings
+):
+
+    response_read = api_client.get(
+        "/api/road_segments/", {"fields": "id,traffic_classification"}
+    )
+
+    feature = response_read.data["results"]["features"][0]
+    assert response_read.status_code == 200
+    assert feature["id"] == sample_road_segment.id
+    assert feature["geometry"] is None
+    assert feature["properties"] == {"traffic_classification": "LOW"}
+
+
+@pytest.mark.django_db
+def test_get_road_segment_list_sparse_fields_defers_columns(
+    api_client, sample_road_segment, sample_speed_readings
+):
+
+    with CaptureQueriesContext(connection) as context:
+        response_read = api_client.get(
+            "/api/road_segments/", {"fields": "traffic_classification"}
+        )
+
+    feature = response_read.data["results"]["features"][0]
+    assert feature["properties"] == {"traffic_classification": "LOW"}
+    table = RoadSegment._meta.db_table
+    for column in ("coordinate", "coordinate_geojson", "road_length"):
+        assert not any(
+            f'"{table}"."{column}"' in query["sql"]
+            for query in context.captured_queries
+        )
+
+
+@pytest.mark.django_db
+def test_get_road_segment_list_omit_fields(api_client, sample_road_segment):
+
+    response_read = api_client.get(
+        "/api/road_segments/", {"omit": "speed_records,traffic_classification"}
+    )
+
+    feature = response_read.data["results"]["features"][0]
+    assert feature["geometry"]["type"] == "LineString"
+    assert feature["properties"] == {"road_length": 100.0}
+
+
+@pytest.mark.django_db
+def test_get_road_segment_list_geojson(
+    api_client, sample_road_segment, sample_speed_readings
+):
+    RoadSegment.objects.create(
+        coordinate=LineString((104.110012, 31.64971387), (104.1119814, 31.653166)),
+        road_length=50.0,
+    )
+
+    response = api_client.get("/api/road_segments/", {"limit": 10})
+    geojson_response = api_client.get("/api/road_segments/", {"format": "geojson"})
+
+    assert geojson_response.status_code == 200
+    assert geojson_response["Content-Type"] == "application/geo+json"
+    collection = json.loads(b"".join(geojson_response.streaming_content))
+    features = response.json()["results"]["features"]
+    assert collection["type"] == "FeatureCollection"
+    assert sorted(f["id"] for f in collection["features"]) == sorted(
+        f["id"] for f in features
+    )
+    by_id = {f["id"]: f for f in collection["features"]}
+    for feature in features:
+        assert by_id[feature["id"]]["properties"] == feature["properties"]
+        coordinates = by_id[feature["id"]]["geometry"]["coordinates"]
+        assert sum(coordinates, []) == pytest.approx(
+            sum(feature["geometry"]["coordinates"], [])
+        )
+
+
+@pytest.mark.django_db
+def test_get_road_segment_list_geojson_sparse_fields(api_client, sample_road_segment):
+
+    response = api_client.get(
+        "/api/road_segments/", {"format": "geojson", "fields": "road_length"}
+    )
+
+    collection = json.loads(b"".join(response.streaming_content))
+    assert collection["features"] == [
+        {
+            "id": sample_road_segment.id,
+            "type": "Feature",
+            "geometry": None,
+            "properties": {"road_length": 100.0},
+        }
+    ]
+
+
+@pytest.mark.django_db
+def test_get_road_segment_list_geojson_empty(api_client):
+
+    response = api_client.get("/api/road_segments/", {"format": "geojson"})
+
+    assert json.loads(b"".join(response.streaming_content))["features"] == []
+
+
 @pytest.mark.django_db
 def test_get_road_segment_list_with_filter(
     api_client, sample_road_segment, sample_speed_readings
@@ -259,3 +377,104 @@ def test_delete_road_segment_without_credentials(api_client, user, sample_road_s
         response_delete.data["detail"]
         == "You do not have permission to perform this action."
     )
+
+
+@pytest.mark.django_db
+def test_get_road_segment_list_not_modified(
+    api_client, sample_road_segment, django_assert_num_queries
+):
+
+    response = api_client.get("/api/road_segments/")
+
+    assert response.has_header("ETag")
+    assert response.has_header("Last-Modified")
+
+    # Only the table versions are read
+    with django_assert_num_queries(1):
+        cached_response = api_client.get(
+            "/api/road_segments/", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+
+    assert cached_response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_get_road_segment_list_ignores_if_modified_since(
+    api_client, sample_road_segment
+):
+
+    response = api_client.get("/api/road_segments/")
+    # Written within the same second as the first response
+    SpeedReading.objects.create(road_segment=sample_road_segment, speed=30.0)
+    modified_response = api_client.get(
+        "/api/road_segments/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+
+    assert modified_response.status_code == 200
+    assert modified_response["ETag"] != response["ETag"]
+
+
+@pytest.mark.django_db
+def test_get_road_segment_list_modified_by_new_speed_reading(
+    api_client, sample_road_segment
+):
+
+    response = api_client.get("/api/road_segments/")
+    SpeedReading.objects.create(road_segment=sample_road_segment, speed=30.0)
+    modified_response = api_client.get(
+        "/api/road_segments/", HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+
+    assert modified_response.status_code == 200
+    assert modified_response["ETag"] != response["ETag"]
+
+
+@pytest.mark.django_db
+def test_get_road_segment_detail_etag_depends_on_url(api_client, sample_road_segment):
+
+    response = api_client.get("/api/road_segments/")
+    detail_response = api_client.get(
+        f"/api/road_segments/{sample_road_segment.id}/",
+        HTTP_IF_NONE_MATCH=response["ETag"],
+    )
+
+    assert detail_response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_get_road_segment_detail_cached(
+    api_client, sample_road_segment, django_assert_num_queries
+):
+    other_road_segment = RoadSegment.objects.create(
+        coordinate=LineString((104.110012, 31.64971387), (104.1119814, 31.653166)),
+        road_length=50.0,
+    )
+    url = f"/api/road_segments/{sample_road_segment.id}/"
+    api_client.get(url)
+
+    SpeedReading.objects.create(road_segment=other_road_segment, speed=30.0)
+    # Only the versions are read, by the conditional GET and by the response cache
+    with django_assert_num_queries(2):
+        response = api_client.get(url)
+    assert response.data["properties"]["speed_records"] == 0
+
+    SpeedReading.objects.create(road_segment=sample_road_segment, speed=30.0)
+    response = api_client.get(url)
+    assert response.data["properties"]["speed_records"] == 1
+
+
+@pytest.mark.django_db
+def test_get_road_segment_list_renders_precomputed_geometry(
+    api_client, sample_road_segment
+):
+    geojson = {"type": "LineString", "coordinates": [[0.0, 0.0], [1.0, 1.0]]}
+    # Bulk updates skip save(), the GeoJSON is still computed by the database
+    RoadSegment.objects.filter(id=sample_road_segment.id).update(
+        coordinate=LineString((0.0, 0.0), (1.0, 1.0))
+    )
+
+    response = api_client.get("/api/road_segments/")
+    sparse_response = api_client.get("/api/road_segments/", {"fields": "coordinate"})
+
+    assert response.data["results"]["features"][0]["geometry"] == geojson
+    assert sparse_response.data["results"]["features"][0]["geometry"] == geojson
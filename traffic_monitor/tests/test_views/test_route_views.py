@@ -0,0 +1,152 @@
+import pytest
+from django.contrib.gis.geos import LineString
+from traffic_monitor.models import RoadSegment, SpeedReading
+from traffic_monitor.utils.table_versions import bump_table_version
+
+
+@pytest.fixture
+def road_network():
+    """
+    a -> b -> d is the short way, a -> c -> d is the long way around.
+    """
+    segments = {
+        "ab": RoadSegment.objects.create(
+            coordinate=LineString((0.0, 0.0), (1.0, 0.0)), road_length=1000.0
+        ),
+        "bd": RoadSegment.objects.create(
+            coordinate=LineString((1.0, 0.0), (2.0, 0.0)), road_length=1000.0
+        ),
+        "ac": RoadSegment.objects.create(
+            coordinate=LineString((0.0, 0.0), (1.0, 1.0)), road_length=1500.0
+        ),
+        "cd": RoadSegment.objects.create(
+            coordinate=LineString((1.0, 1.0), (2.0, 0.0)), road_length=1500.0
+        ),
+        "isolated": RoadSegment.objects.create(
+            coordinate=LineString((9.0, 9.0), (8.0, 8.0)), road_length=100.0
+        ),
+    }
+    for segment in segments.values():
+        SpeedReading.objects.create(road_segment=segment, speed=36.0)
+    return segments
+
+
+@pytest.mark.django_db
+def test_get_route(api_client, road_network):
+
+    response = api_client.get(
+        "/api/routes/",
+        {"origin": road_network["ab"].id, "destination": road_network["bd"].id},
+    )
+
+    assert response.status_code == 200
+    assert response.data["road_segments"] == [
+        road_network["ab"].id,
+        road_network["bd"].id,
+    ]
+    assert response.data["travel_time"] == pytest.approx(200.0)
+
+
+@pytest.mark.django_db
+def test_get_route_follows_current_speeds(api_client, road_network):
+
+    SpeedReading.objects.create(road_segment=road_network["bd"], speed=3.6)
+
+    response = api_client.get(
+        "/api/routes/",
+        {"origin": road_network["ab"].id, "destination": road_network["cd"].id},
+    )
+
+    assert response.status_code == 200
+    assert response.data["road_segments"] == [
+        road_network["ab"].id,
+        road_network["ac"].id,
+        road_network["cd"].id,
+    ]
+
+
+@pytest.mark.django_db
+def test_get_route_reloads_speeds_after_ttl(api_client, settings, road_network):
+
+    settings.ROUTE_SPEED_TTL = 3600
+    params = {"origin": road_network["ab"].id, "destination": road_network["cd"].id}
+    api_client.get("/api/routes/", params)
+    SpeedReading.objects.create(road_segment=road_network["bd"], speed=3.6)
+
+    # New readings don't reload the speeds before the TTL
+    cached = api_client.get("/api/routes/", params)
+    settings.ROUTE_SPEED_TTL = 0
+    reloaded = api_client.get("/api/routes/", params)
+
+    assert road_network["bd"].id in cached.data["road_segments"]
+    assert reloaded.data["road_segments"] == [
+        road_network["ab"].id,
+        road_network["ac"].id,
+        road_network["cd"].id,
+    ]
+
+
+@pytest.mark.django_db
+def test_get_route_picks_up_segments_written_by_other_processes(
+    api_client, road_network
+):
+    params = {
+        "origin": road_network["ab"].id,
+        "destination": road_network["isolated"].id,
+    }
+    assert api_client.get("/api/routes/", params).status_code == 404
+
+    # Written without signals, like another worker process would: only the table version changes
+    (bridge,) = RoadSegment.objects.bulk_create(
+        [
+            RoadSegment(
+                coordinate=LineString((2.0, 0.0), (9.0, 9.0)),
+                road_length=100.0,
+            )
+        ]
+    )
+    bump_table_version(RoadSegment)
+
+    response = api_client.get("/api/routes/", params)
+
+    assert response.status_code == 200
+    assert response.data["road_segments"][-2:] == [
+        bridge.id,
+        road_network["isolated"].id,
+    ]
+    assert len(response.data["travel_times"]) == len(response.data["road_segments"])
+
+
+@pytest.mark.django_db
+def test_get_route_not_connected(api_client, road_network):
+
+    response = api_client.get(
+        "/api/routes/",
+        {"origin": road_network["ab"].id, "destination": road_network["isolated"].id},
+    )
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_get_eta(api_client, road_network):
+
+    response = api_client.get(
+        "/api/routes/eta/",
+        {"road_segments": f"{road_network['ac'].id},{road_network['cd'].id}"},
+    )
+
+    assert response.status_code == 200
+    assert response.data["travel_times"] == [
+        pytest.approx(150.0),
+        pytest.approx(150.0),
+    ]
+    assert response.data["travel_time"] == pytest.approx(300.0)
+
+
+@pytest.mark.django_db
+def test_get_eta_unknown_segment(api_client, road_network):
+
+    response = api_client.get("/api/routes/eta/", {"road_segments": "99999"})
+
+    assert response.status_code == 400
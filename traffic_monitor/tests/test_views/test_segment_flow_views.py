@@ -0,0 +1,94 @@
+import pytest
+import datetime
+from io import StringIO
+from django.core.management import call_command
+from traffic_monitor.models import Car, SegmentFlowRollup, TrafficRecord
+
+START = datetime.datetime(2025, 5, 22, 17, 0, tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture
+def flow_records(sample_road_segment, sample_sensor, sample_car):
+    other_car = Car.objects.create(license_plate="BB11BB")
+    for minutes, car in [
+        (1, sample_car),
+        (5, sample_car),
+        (7, other_car),
+        (20, sample_car),
+    ]:
+        TrafficRecord.objects.create(
+            road_segment=sample_road_segment,
+            sensor=sample_sensor,
+            car=car,
+            timestamp=START + datetime.timedelta(minutes=minutes),
+        )
+
+
+@pytest.mark.django_db
+def test_get_road_segment_flow(api_client, sample_road_segment, flow_records):
+
+    response = api_client.get(
+        f"/api/road_segments/{sample_road_segment.id}/flow/",
+        {"bucket": "15m", "from": "2025-05-22T17:00:00Z", "to": "2025-05-22T18:00:00Z"},
+    )
+
+    assert response.status_code == 200
+    assert response.data["buckets"] == [START, START + datetime.timedelta(minutes=15)]
+    assert response.data["records"] == [3, 1]
+    assert response.data["cars"] == [2, 1]
+
+
+@pytest.mark.django_db
+def test_get_road_segment_flow_reads_rollups(
+    api_client, sample_road_segment, flow_records
+):
+
+    call_command("rollup_segment_flow", stdout=StringIO())
+    assert SegmentFlowRollup.objects.filter(bucket_seconds=3600).count() == 1
+
+    TrafficRecord.objects.all().delete()
+
+    response = api_client.get(
+        f"/api/road_segments/{sample_road_segment.id}/flow/",
+        {"bucket": "1h", "from": "2025-05-22T17:00:00Z", "to": "2025-05-22T18:00:00Z"},
+    )
+
+    assert response.status_code == 200
+    assert response.data["records"] == [4]
+    assert response.data["cars"] == [2]
+
+
+@pytest.mark.django_db
+def test_get_road_segments_flow(api_client, sample_road_segment, flow_records):
+
+    response = api_client.get(
+        "/api/road_segments/flow/",
+        {
+            "ids": f"{sample_road_segment.id},999",
+            "bucket": "1h",
+            "from": "2025-05-22T17:00:00Z",
+            "to": "2025-05-22T18:00:00Z",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.data["road_segments"][sample_road_segment.id]["records"] == [4]
+    assert response.data["road_segments"][999]["records"] == []
+
+
+@pytest.mark.django_db
+def test_get_road_segment_flow_invalid_bucket(api_client, sample_road_segment):
+
+    response = api_client.get(
+        f"/api/road_segments/{sample_road_segment.id}/flow/", {"bucket": "7m"}
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_get_road_segments_flow_invalid_ids(api_client):
+
+    response = api_client.get("/api/road_segments/flow/", {"ids": "1,a"})
+
+    assert response.status_code == 400
@@ -0,0 +1,64 @@
+import time
+import pytest
+from traffic_monitor.models import SensorStats
+
+
+@pytest.mark.django_db
+def test_get_sensor_health(
+    api_client, settings, super_user, sample_sensor, traffic_record_list_payload
+):
+
+    settings.SENSOR_STATS_FLUSH_INTERVAL = 0
+    settings.SENSOR_HEALTH_WINDOW = 1
+    api_client.credentials(HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}")
+    api_client.post("/api/traffic_records/", traffic_record_list_payload, format="json")
+
+    stats = SensorStats.objects.get(sensor=sample_sensor)
+    assert stats.record_count == 2
+    assert stats.last_seen.isoformat() == "2025-05-22T17:05:21.713000+00:00"
+
+    api_client.credentials()
+    api_client.force_authenticate(user=super_user)
+    response = api_client.get("/api/sensors/health/")
+
+    assert response.status_code == 200
+    health = next(item for item in response.data if item["id"] == sample_sensor.id)
+    assert health["record_count"] == 2
+    assert health["records_per_minute"] == 2
+
+
+@pytest.mark.django_db
+def test_sensor_stats_are_buffered(
+    api_client, settings, sample_sensor, traffic_record_list_payload
+):
+
+    settings.SENSOR_STATS_FLUSH_INTERVAL = 3600
+    api_client.credentials(HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}")
+    api_client.post("/api/traffic_records/", traffic_record_list_payload, format="json")
+
+    assert not SensorStats.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sensor_stats_are_flushed_by_timer(
+    api_client, settings, sample_sensor, traffic_record_list_payload
+):
+
+    settings.SENSOR_STATS_FLUSH_INTERVAL = 1
+    api_client.credentials(HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}")
+    api_client.post("/api/traffic_records/", traffic_record_list_payload, format="json")
+    assert not SensorStats.objects.exists()
+
+    deadline = time.monotonic() + 5
+    while not SensorStats.objects.exists() and time.monotonic() < deadline:
+        time.sleep(0.1)
+
+    assert SensorStats.objects.get(sensor=sample_sensor).record_count == 2
+
+
+@pytest.mark.django_db
+def test_get_sensor_health_without_credentials(api_client):
+
+    response = api_client.get("/api/sensors/health/")
+
+    assert response.status_code == 403
@@ -11,6 +11,32 @@ def test_get_speed_reading_list(api_client, sample_speed_readings):
     assert response_read.data["count"] == 3
 
 
+@pytest.mark.django_db
+def test_get_speed_reading_list_fastjson(api_client, sample_speed_readings):
+
+    response = api_client.get("/api/speed_readings/", {"limit": 2})
+    fast_response = api_client.get(
+        "/api/speed_readings/", {"limit": 2, "format": "fastjson"}
+    )
+
+    assert fast_response.status_code == 200
+    assert fast_response["Content-Type"] == "application/json"
+    assert fast_response.json() == response.json()
+
+
+@pytest.mark.django_db
+def test_get_speed_reading_list_sparse_fields(api_client, sample_speed_readings):
+
+    response = api_client.get("/api/speed_readings/", {"fields": "id,speed"})
+    fast_response = api_client.get(
+        "/api/speed_readings/", {"fields": "id,speed", "format": "fastjson"}
+    )
+
+    assert response.status_code == 200
+    assert set(response.data["results"][0]) == {"id", "speed"}
+    assert fast_response.json() == response.json()
+
+
 @pytest.mark.django_db
 def test_create_speed_reading(api_client, super_user, sample_road_segment):
 
@@ -1,5 +1,13 @@
+import msgpack
 import pytest
-from traffic_monitor.models import TrafficRecord
+from io import StringIO
+from django.core.management import call_command
+from django.db import IntegrityError
+from traffic_monitor.api.serializers import TrafficRecordListSerializer
+from django.core.cache import cache
+from traffic_monitor.models import IdempotencyKey, TrafficRecord, IngestBatch
+from traffic_monitor.utils import idempotency
+from traffic_monitor.utils.traffic_records_helper import FAILED_CHUNK_ERROR
 import datetime
 from django.conf import settings
 from django.utils import timezone
@@ -19,6 +27,47 @@ def test_get_traffic_record_list_view(api_client, super_user, sample_traffic_rec
     assert read_response.data["count"] == 1
 
 
+@pytest.mark.django_db
+def test_get_traffic_record_list_view_fastjson(
+    api_client, super_user, sample_traffic_record
+):
+
+    api_client.force_authenticate(user=super_user)
+
+    response = api_client.get("/api/traffic_records/")
+    fast_response = api_client.get("/api/traffic_records/", {"format": "fastjson"})
+
+    assert fast_response.status_code == 200
+    assert fast_response.json() == response.json()
+    assert fast_response.json()["results"][0]["car"] == sample_traffic_record.car_id
+
+
+@pytest.mark.django_db
+def test_get_traffic_record_list_modified_by_bulk_insert(
+    api_client, super_user, sample_traffic_record, traffic_record_list_payload
+):
+
+    api_client.force_authenticate(user=super_user)
+    response = api_client.get("/api/traffic_records/")
+    assert (
+        api_client.get(
+            "/api/traffic_records/", HTTP_IF_NONE_MATCH=response["ETag"]
+        ).status_code
+        == 304
+    )
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}")
+    api_client.post(
+        "/api/traffic_records/", data=traffic_record_list_payload, format="json"
+    )
+    modified_response = api_client.get(
+        "/api/traffic_records/", HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+
+    assert modified_response.status_code == 200
+    assert modified_response.data["count"] == 3
+
+
 @pytest.mark.django_db
 def test_get_traffic_record_list_view_without_credentials(
     api_client, sample_traffic_record
@@ -89,6 +138,37 @@ def test_traffic_record_create_view(
     assert read_response.data["count"] == 2
 
 
+@pytest.mark.django_db
+def test_traffic_record_create_view_msgpack(
+    api_client, super_user, traffic_record_list_payload
+):
+    traffic_record_list_payload[0]["timestamp"] = datetime.datetime(
+        2023, 5, 29, 17, 5, 21, tzinfo=datetime.timezone.utc
+    )
+    api_client.credentials(HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}")
+
+    create_response = api_client.post(
+        "/api/traffic_records/?ack=count",
+        data=msgpack.packb(traffic_record_list_payload, datetime=True),
+        content_type="application/msgpack",
+        HTTP_ACCEPT="application/msgpack",
+    )
+
+    assert create_response.status_code == 201
+    assert create_response["Content-Type"] == "application/msgpack"
+    assert msgpack.unpackb(create_response.content) == {
+        "count": 2,
+        "invalid_inputs": [],
+    }
+
+    api_client.force_authenticate(user=super_user)
+    read_response = api_client.get(
+        "/api/traffic_records/", HTTP_ACCEPT="application/msgpack"
+    )
+
+    assert msgpack.unpackb(read_response.content) == read_response.data
+
+
 @pytest.mark.django_db
 def test_traffic_record_accepts_only_lists(
     api_client, sample_road_segment, sample_sensor
@@ -180,3 +260,360 @@ def test_create_traffic_records_all_invalid(api_client):
     assert response.status_code == 201
     assert len(response.data["invalid_inputs"]) == 3
     assert len(response.data["data"]) == 0
+
+
+@pytest.mark.django_db
+def test_create_traffic_records_unknown_sensor(api_client, sample_road_segment):
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}")
+
+    payload = [
+        {
+            "road_segment": sample_road_segment.id,
+            "car__license_plate": "AA00AA",
+            "timestamp": "2023-05-29T17:05:21.713Z",
+            "sensor__uuid": "00000000-0000-0000-0000-000000000000",
+        },
+    ]
+
+    response = api_client.post("/api/traffic_records/", payload, format="json")
+
+    assert response.status_code == 201
+    assert len(response.data["invalid_inputs"]) == 1
+    assert len(response.data["data"]) == 0
+
+
+@pytest.mark.django_db
+def test_create_traffic_records_in_chunks(
+    api_client, settings, traffic_record_list_payload
+):
+
+    settings.TRAFFIC_RECORD_CHUNK_SIZE = 1
+    api_client.credentials(HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}")
+
+    response = api_client.post(
+        "/api/traffic_records/", traffic_record_list_payload, format="json"
+    )
+
+    assert response.status_code == 201
+    assert len(response.data) == 2
+    assert TrafficRecord.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_create_traffic_records_reports_failed_chunks(
+    api_client, settings, traffic_record_list_payload, monkeypatch
+):
+
+    settings.TRAFFIC_RECORD_CHUNK_SIZE = 1
+    api_client.credentials(HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}")
+
+    create = TrafficRecordListSerializer.create
+    calls = []
+
+    def fail_second_chunk(self, validated_data):
+        calls.append(validated_data)
+        if len(calls) >= 2:
+            raise IntegrityError("chunk failed")
+        return create(self, validated_data)
+
+    monkeypatch.setattr(TrafficRecordListSerializer, "create", fail_second_chunk)
+
+    response = api_client.post(
+        "/api/traffic_records/", traffic_record_list_payload, format="json"
+    )
+
+    assert response.status_code == 201
+    assert len(response.data["data"]) == 1
+    assert response.data["failed_chunks"] == [
+        {"start": 1, "end": 2, "error": FAILED_CHUNK_ERROR}
+    ]
+    assert "chunk failed" not in str(response.data)
+    assert TrafficRecord.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_create_traffic_records_large_payload_returns_ids(
+    api_client, settings, traffic_record_list_payload
+):
+
+    settings.TRAFFIC_RECORD_SERIALIZE_LIMIT = 1
+    api_client.credentials(HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}")
+
+    response = api_client.post(
+        "/api/traffic_records/", traffic_record_list_payload, format="json"
+    )
+
+    assert response.status_code == 201
+    assert sorted(response.data["ids"]) == sorted(
+        TrafficRecord.objects.values_list("id", flat=True)
+    )
+    assert "data" not in response.data
+
+
+@pytest.mark.django_db
+def test_create_traffic_records_reports_invalid_data(
+    api_client, sample_road_segment, sample_sensor
+):
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}")
+
+    payload = [
+        {
+            "road_segment": sample_road_segment.id,
+            "car__license_plate": "AA00AA",
+            "timestamp": "not-a-date",
+            "sensor__uuid": str(sample_sensor.uuid),
+        },
+        {
+            "road_segment": sample_road_segment.id,
+            "car__license_plate": "AA00AA",
+            "timestamp": "2023-05-29T17:05:21.713Z",
+            "sensor__uuid": str(sample_sensor.uuid),
+        },
+    ]
+
+    response = api_client.post("/api/traffic_records/", payload, format="json")
+
+    assert response.status_code == 201
+    assert len(response.data["data"]) == 1
+    assert response.data["invalid_inputs"][0]["index"] == 0
+    assert "timestamp" in response.data["invalid_inputs"][0]
+
+
+@pytest.mark.django_db
+def test_create_traffic_records_ack_count(api_client, traffic_record_list_payload):
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}")
+
+    response = api_client.post(
+        "/api/traffic_records/?ack=count", traffic_record_list_payload, format="json"
+    )
+
+    assert response.status_code == 201
+    assert response.data == {"count": 2, "invalid_inputs": []}
+
+
+@pytest.mark.django_db
+def test_create_traffic_records_ack_ids(api_client, traffic_record_list_payload):
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}")
+
+    response = api_client.post(
+        "/api/traffic_records/?ack=ids",
+        traffic_record_list_payload + [{"road_segment": 1}],
+        format="json",
+    )
+
+    assert response.status_code == 201
+    assert sorted(response.data["ids"]) == sorted(
+        TrafficRecord.objects.values_list("id", flat=True)
+    )
+    assert len(response.data["invalid_inputs"]) == 1
+
+
+@pytest.mark.django_db
+def test_create_traffic_records_invalid_ack(api_client, traffic_record_list_payload):
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}")
+
+    response = api_client.post(
+        "/api/traffic_records/?ack=all", traffic_record_list_payload, format="json"
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_create_traffic_records_async(api_client, traffic_record_list_payload):
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}")
+
+    response = api_client.post(
+        "/api/traffic_records/?async=true", traffic_record_list_payload, format="json"
+    )
+
+    assert response.status_code == 202
+    assert response.data["status"] == "PENDING"
+    assert TrafficRecord.objects.count() == 0
+
+    call_command("process_ingest_queue", stdout=StringIO())
+
+    status_response = api_client.get(
+        f"/api/traffic_records/batches/{response.data['batch_id']}/"
+    )
+
+    assert status_response.status_code == 200
+    assert status_response.data["status"] == "DONE"
+    assert status_response.data["result"]["count"] == 2
+    assert TrafficRecord.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_get_ingest_batch_without_credentials(api_client):
+
+    batch = IngestBatch.objects.create(payload=[], record_count=0)
+
+    response = api_client.get(f"/api/traffic_records/batches/{batch.id}/")
+
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_create_traffic_records_skips_duplicates(
+    api_client, traffic_record_list_payload
+):
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}")
+
+    api_client.post("/api/traffic_records/", traffic_record_list_payload, format="json")
+    response = api_client.post(
+        "/api/traffic_records/?ack=count",
+        traffic_record_list_payload + traffic_record_list_payload[:1],
+        format="json",
+    )
+
+    assert response.status_code == 201
+    assert response.data["count"] == 0
+    assert response.data["invalid_inputs"] == []
+    assert TrafficRecord.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_create_traffic_records_idempotency_key(
+    api_client, traffic_record_list_payload
+):
+
+    api_client.credentials(
+        HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}",
+        HTTP_IDEMPOTENCY_KEY="batch-1",
+    )
+
+    first = api_client.post(
+        "/api/traffic_records/?ack=ids", traffic_record_list_payload, format="json"
+    )
+    replay = api_client.post(
+        "/api/traffic_records/?ack=ids", traffic_record_list_payload, format="json"
+    )
+
+    assert replay.status_code == first.status_code == 201
+    assert replay.data == first.data
+    assert len(replay.data["ids"]) == 2
+    assert IdempotencyKey.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_create_traffic_records_idempotency_key_survives_cache_clear(
+    api_client, traffic_record_list_payload
+):
+
+    api_client.credentials(
+        HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}",
+        HTTP_IDEMPOTENCY_KEY="batch-1",
+    )
+
+    first = api_client.post(
+        "/api/traffic_records/?ack=ids", traffic_record_list_payload, format="json"
+    )
+    cache.clear()  # Another worker process doesn't share the local cache
+    replay = api_client.post(
+        "/api/traffic_records/?ack=ids", traffic_record_list_payload, format="json"
+    )
+
+    assert replay.data == first.data
+
+
+@pytest.mark.django_db
+def test_create_traffic_records_expired_idempotency_key(
+    api_client, settings, traffic_record_list_payload
+):
+
+    settings.IDEMPOTENCY_KEY_TTL = 60
+    api_client.credentials(
+        HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}",
+        HTTP_IDEMPOTENCY_KEY="batch-1",
+    )
+
+    api_client.post(
+        "/api/traffic_records/?ack=ids", traffic_record_list_payload, format="json"
+    )
+    IdempotencyKey.objects.update(
+        created_at=timezone.now() - datetime.timedelta(seconds=120)
+    )
+    replay = api_client.post(
+        "/api/traffic_records/?ack=ids", traffic_record_list_payload, format="json"
+    )
+
+    assert replay.data["ids"] == []
+
+
+@pytest.mark.django_db
+def test_create_traffic_records_idempotency_key_with_another_payload(
+    api_client, traffic_record_list_payload
+):
+
+    api_client.credentials(
+        HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}",
+        HTTP_IDEMPOTENCY_KEY="batch-1",
+    )
+
+    api_client.post(
+        "/api/traffic_records/?ack=ids", traffic_record_list_payload[:1], format="json"
+    )
+    response = api_client.post(
+        "/api/traffic_records/?ack=ids", traffic_record_list_payload, format="json"
+    )
+
+    assert response.status_code == 422
+    assert TrafficRecord.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_create_traffic_records_idempotency_key_in_progress(
+    api_client, traffic_record_list_payload
+):
+
+    key = idempotency.key_digest(f"api-key:{settings.API_KEY}", "batch-1")
+    assert (
+        idempotency.claim(key, idempotency.payload_digest(traffic_record_list_payload))
+        is None
+    )
+    api_client.credentials(
+        HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}",
+        HTTP_IDEMPOTENCY_KEY="batch-1",
+    )
+
+    response = api_client.post(
+        "/api/traffic_records/?ack=ids", traffic_record_list_payload, format="json"
+    )
+
+    assert response.status_code == 409
+    assert TrafficRecord.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_create_traffic_records_idempotency_key_released_on_error(
+    api_client, traffic_record_list_payload
+):
+
+    api_client.credentials(
+        HTTP_AUTHORIZATION=f"API-Key {settings.API_KEY}",
+        HTTP_IDEMPOTENCY_KEY="batch-1",
+    )
+
+    rejected = api_client.post(
+        "/api/traffic_records/?ack=nope", traffic_record_list_payload, format="json"
+    )
+    accepted = api_client.post(
+        "/api/traffic_records/?ack=ids", traffic_record_list_payload, format="json"
+    )
+
+    assert rejected.status_code == 400
+    assert accepted.status_code == 201
+    assert len(accepted.data["ids"]) == 2
+
+
+def test_idempotency_key_digest_is_scoped_to_the_principal():
+    assert idempotency.key_digest("user:1", "batch-1") != idempotency.key_digest(
+        "user:2", "batch-1"
+    )
@@ -0,0 +1,107 @@
+import datetime
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from traffic_monitor.models import SpeedAnomaly, SpeedReading
+
+
+def speed_matrix(
+    segment_ids: np.ndarray, speeds: np.ndarray, window: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Groups readings sorted by (segment, time) into a (segments, window) matrix
+    holding the last `window` speeds of every segment, right-aligned so the
+    latest reading is in the last column and missing ones are NaN.
+    Returns the segment ids, the matrix and the position of the latest
+    reading of every segment.
+    """
+    segments, starts, counts = np.unique(
+        segment_ids, return_index=True, return_counts=True
+    )
+    rows = np.repeat(np.arange(len(segments)), counts)
+    positions = np.arange(len(speeds)) - np.repeat(starts, counts)
+    columns = window - np.repeat(counts, counts) + positions
+
+    matrix = np.full((len(segments), window), np.nan)
+    keep = columns >= 0
+    matrix[rows[keep], columns[keep]] = speeds[keep]
+    return segments, matrix, starts + counts - 1
+
+
+def ewma_baselines(
+    history: np.ndarray, alpha: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes the exponentially weighted mean and standard deviation of every
+    row of the history matrix at once, skipping NaN values.
+    Returns the means, the standard deviations and the number of readings per row.
+    """
+    rows = history.shape[0]
+    mean = np.full(rows, np.nan)
+    var = np.zeros(rows)
+
+    for column in history.T:
+        present = ~np.isnan(column)
+        first = present & np.isnan(mean)
+        update = present & ~first
+
+        mean[first] = column[first]
+        diff = column[update] - mean[update]
+        increment = alpha * diff
+        mean[update] += increment
+        var[update] = (1 - alpha) * (var[update] + diff * increment)
+
+    return mean, np.sqrt(var), np.count_nonzero(~np.isnan(history), axis=1)
+
+
+def detect_anomalies(now: datetime.datetime | None = None) -> list[SpeedAnomaly]:
+    """
+    Flags the road segments whose latest speed reading dropped sharply below
+    their usual speed, in one vectorized pass over the readings of every segment
+    since ANOMALY_LOOKBACK_HOURS.
+    The baseline is the EWMA of the previous readings, and a reading is an
+    anomaly when its z-score is below -ANOMALY_Z_THRESHOLD. New anomalies are
+    stored, and readings already flagged are skipped.
+    """
+    now = now or timezone.now()
+    readings = (
+        SpeedReading.objects.filter(
+            created_at__gte=now
+            - datetime.timedelta(hours=settings.ANOMALY_LOOKBACK_HOURS)
+        )
+        .order_by("road_segment_id", "created_at")
+        .values_list("road_segment_id", "created_at", "speed")
+    )
+    rows = list(readings)
+    if not rows:
+        return []
+
+    segment_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    speeds = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+    segments, matrix, latest_positions = speed_matrix(
+        segment_ids, speeds, settings.ANOMALY_WINDOW + 1
+    )
+
+    mean, std, count = ewma_baselines(matrix[:, :-1], settings.ANOMALY_ALPHA)
+    latest = matrix[:, -1]
+    z_scores = (latest - mean) / np.maximum(std, settings.ANOMALY_MIN_STD)
+    flagged = np.flatnonzero(
+        (count >= settings.ANOMALY_MIN_READINGS)
+        & (z_scores < -settings.ANOMALY_Z_THRESHOLD)
+    )
+    if not len(flagged):
+        return []
+
+    anomalies = [
+        SpeedAnomaly(
+            road_segment_id=int(segments[idx]),
+            reading_at=rows[latest_positions[idx]][1],
+            speed=float(latest[idx]),
+            baseline=float(mean[idx]),
+            z_score=float(z_scores[idx]),
+            detected_at=now,
+        )
+        for idx in flagged
+    ]
+    SpeedAnomaly.objects.bulk_create(anomalies, ignore_conflicts=True)
+    return anomalies
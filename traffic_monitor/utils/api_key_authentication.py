@@ -24,3 +24,20 @@ class HasAPIKeyOrReadOnly(permissions.BasePermission):
         if not request.user.is_staff:
             return False
         return True
+
+
+class HasAPIKeyOrIsStaff(permissions.BasePermission):
+    """
+    Grants access to requests carrying the API key, on any method,
+    or made by a staff user.
+    """
+
+    API_KEY = settings.API_KEY
+
+    def has_permission(self, request, view) -> bool:
+        auth_header = request.META.get("HTTP_AUTHORIZATION", "")
+
+        if auth_header.startswith("API-Key "):
+            provided_key = auth_header.split(" ")[1]
+            return provided_key == self.API_KEY
+        return bool(request.user and request.user.is_staff)
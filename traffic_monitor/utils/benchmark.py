@@ -0,0 +1,55 @@
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+def timed_get(url: str, headers: dict, timeout: float) -> tuple[float, bool]:
+    """
+    Returns the seconds a GET of the url took and whether it succeeded (2xx or 304).
+    """
+    request = urllib.request.Request(url, headers=headers)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            ok = True
+    except urllib.error.HTTPError as e:
+        ok = e.code == 304
+    except OSError:
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def run_benchmark(
+    url: str,
+    requests: int,
+    concurrency: int,
+    headers: dict | None = None,
+    timeout: float = 30,
+) -> dict:
+    """
+    Sends `requests` GETs of the url from `concurrency` threads and returns the
+    throughput (requests per second), the error count and the 50th, 95th and
+    99th latency percentiles in milliseconds.
+    """
+    headers = headers or {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(
+            executor.map(lambda _: timed_get(url, headers, timeout), range(requests))
+        )
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([seconds for seconds, _ in results]) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "url": url,
+        "requests": requests,
+        "errors": sum(not ok for _, ok in results),
+        "requests_per_second": requests / elapsed,
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+    }
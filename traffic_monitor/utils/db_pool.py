@@ -0,0 +1,23 @@
+import os
+from django.db import connections
+
+
+def connection_stats() -> dict:
+    """
+    Returns, for every database alias, how this process reuses its connections:
+    the persistent connection settings or, when pooling is enabled, the psycopg
+    pool statistics (size, available and waiting counts plus the cumulative
+    request, wait time and connection counters). Every worker process has its
+    own pool, so a pool is sized per process.
+    """
+    stats = {"pid": os.getpid(), "databases": {}}
+    for alias in connections:
+        connection = connections[alias]
+        pool = getattr(connection, "pool", None)
+        stats["databases"][alias] = {
+            "pooled": pool is not None,
+            "conn_max_age": connection.settings_dict["CONN_MAX_AGE"],
+            "health_checks": connection.settings_dict["CONN_HEALTH_CHECKS"],
+            "pool": pool.get_stats() if pool is not None else None,
+        }
+    return stats
@@ -0,0 +1,126 @@
+import datetime
+import numpy as np
+from django.conf import settings
+from django.db.models import Avg
+from django.utils import timezone
+from traffic_monitor.models import SpeedForecast, SpeedReading
+from traffic_monitor.utils.segment_flow import DateBin, floor_bucket
+
+BUCKET = datetime.timedelta(minutes=15)
+SLOTS_PER_DAY = 96
+HORIZONS = (15, 30, 60)
+
+
+def ewma(rows: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Exponentially weighted mean along the last axis of an array, skipping NaN
+    values. Every other axis is computed at once.
+    """
+    mean = np.full(rows.shape[:-1], np.nan)
+    for column in np.moveaxis(rows, -1, 0):
+        mean = np.where(
+            np.isnan(mean),
+            column,
+            np.where(np.isnan(column), mean, alpha * column + (1 - alpha) * mean),
+        )
+    return mean
+
+
+def last_observed(history: np.ndarray) -> np.ndarray:
+    """
+    Returns the last non-NaN value of every row (NaN for empty rows).
+    """
+    present = ~np.isnan(history)
+    positions = np.where(present, np.arange(history.shape[1]), 0)
+    last = np.maximum.accumulate(positions, axis=1)[:, -1]
+    values = history[np.arange(history.shape[0]), last]
+    return np.where(present.any(axis=1), values, np.nan)
+
+
+def seasonal_forecast(history: np.ndarray, targets: list[int], days: int) -> np.ndarray:
+    """
+    Forecasts every row of the history matrix, made of 15-minute buckets starting
+    at midnight `days` days ago, for the target bucket indexes.
+    The daily profile is an EWMA of each time-of-day slot across the complete days,
+    corrected by the damped EWMA of the latest residuals against that profile.
+    Slots without history fall back to the last observed speed.
+    Returns a (rows, targets) matrix.
+    """
+    segments, observed = history.shape
+    padded = np.full((segments, (days + 1) * SLOTS_PER_DAY), np.nan)
+    padded[:, :observed] = history
+    daily = padded.reshape(segments, days + 1, SLOTS_PER_DAY)
+
+    profile = ewma(np.swapaxes(daily[:, :days], 1, 2), settings.FORECAST_ALPHA)
+
+    recent = np.arange(max(observed - settings.FORECAST_RECENT_BUCKETS, 0), observed)
+    residuals = history[:, recent] - profile[:, recent % SLOTS_PER_DAY]
+    offset = np.nan_to_num(ewma(residuals, settings.FORECAST_LEVEL_ALPHA))
+    fallback = last_observed(history)
+
+    forecasts = np.empty((segments, len(targets)))
+    for idx, target in enumerate(targets):
+        steps = target - (observed - 1)
+        seasonal = profile[:, target % SLOTS_PER_DAY]
+        forecast = seasonal + offset * settings.FORECAST_DAMPING**steps
+        forecasts[:, idx] = np.where(np.isnan(seasonal), fallback, forecast)
+    return np.maximum(forecasts, 0)
+
+
+def forecast_speeds(now: datetime.datetime | None = None) -> int:
+    """
+    Forecasts the speed of every road segment HORIZONS minutes ahead, from the
+    15-minute average speeds of the last FORECAST_HISTORY_DAYS days computed
+    in the database, and stores them in the SpeedForecast table.
+    Returns the number of road segments forecasted.
+    """
+    now = now or timezone.now()
+    days = settings.FORECAST_HISTORY_DAYS
+    start = floor_bucket(now, datetime.timedelta(days=1)) - datetime.timedelta(
+        days=days
+    )
+    end = floor_bucket(now, BUCKET)
+
+    rows = list(
+        SpeedReading.objects.filter(created_at__gte=start, created_at__lt=end)
+        .annotate(bucket=DateBin(BUCKET, "created_at"))
+        .values("road_segment_id", "bucket")
+        .annotate(speed=Avg("speed"))
+        .order_by()
+        .values_list("road_segment_id", "bucket", "speed")
+    )
+    if not rows:
+        return 0
+
+    segment_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    columns = np.fromiter(
+        ((row[1] - start) // BUCKET for row in rows), dtype=np.int64, count=len(rows)
+    )
+    speeds = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+
+    segments, segment_rows = np.unique(segment_ids, return_inverse=True)
+    history = np.full((len(segments), (end - start) // BUCKET), np.nan)
+    history[segment_rows, columns] = speeds
+
+    targets = [
+        (now + datetime.timedelta(minutes=h) - start) // BUCKET for h in HORIZONS
+    ]
+    forecasts = seasonal_forecast(history, targets, days)
+
+    SpeedForecast.objects.bulk_create(
+        [
+            SpeedForecast(
+                road_segment_id=int(segment_id),
+                speed_15=float(forecast[0]),
+                speed_30=float(forecast[1]),
+                speed_60=float(forecast[2]),
+                generated_at=now,
+            )
+            for segment_id, forecast in zip(segments, forecasts)
+        ],
+        update_conflicts=True,
+        unique_fields=["road_segment"],
+        update_fields=["speed_15", "speed_30", "speed_60", "generated_at"],
+        batch_size=1000,
+    )
+    return len(segments)
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.contrib.gis.db.models.functions import AsGeoJSON
+from django.db import connections
+
+
+def stream_feature_collection(
+    queryset, properties: dict, geo_field: str | None, chunk_size: int | None = None
+):
+    """
+    Returns an iterator over the GeoJSON FeatureCollection of the queryset, built by PostGIS.
+    `properties` maps each property name to an expression of the queryset, and
+    `geo_field` is the geometry field (None renders null geometries).
+    Features are aggregated by chunks of `chunk_size` with json_agg, read through
+    a server-side cursor, so Python only writes the chunks out as they come.
+    """
+    chunk_size = chunk_size or settings.GEOJSON_CHUNK_SIZE
+    connection = connections[queryset.db]
+    quote_name = connection.ops.quote_name
+    pk = queryset.model._meta.pk
+
+    columns = {
+        f"property_{idx}": expression
+        for idx, expression in enumerate(properties.values())
+    }
+    if geo_field:
+        columns["geometry"] = AsGeoJSON(geo_field)
+    inner_sql, inner_params = queryset.values(
+        pk.name, **columns
+    ).query.sql_with_params()
+
+    geometry = "f.geometry::json" if geo_field else "NULL"
+    properties_sql = ", ".join(
+        f"%s, f.{quote_name(column)}" for column in columns if column != "geometry"
+    )
+    sql = (
+        "SELECT json_agg(feature ORDER BY position)::text FROM ("
+        "SELECT row_number() OVER () - 1 AS position, json_build_object("
+        f"'id', f.{quote_name(pk.column)}, 'type', 'Feature', 'geometry', {geometry}, "
+        f"'properties', json_build_object({properties_sql})) AS feature "
+        f"FROM ({inner_sql}) f"
+        ") features GROUP BY position / %s ORDER BY position / %s"
+    )
+    params = [*properties, *inner_params, chunk_size, chunk_size]
+    # The connection is picked now, while the request's database routing applies
+    return _stream_chunks(connection, sql, params)
+
+
+def _stream_chunks(connection, sql: str, params: list):
+    yield '{"type": "FeatureCollection", "features": ['
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(sql, params)
+        separator = ""
+        for (chunk,) in cursor:
+            yield separator + chunk[1:-1]
+            separator = ", "
+    yield "]}"
@@ -0,0 +1,78 @@
+import datetime
+import hashlib
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from traffic_monitor.models import IdempotencyKey
+
+
+def key_digest(principal: str, key: str) -> str:
+    return hashlib.sha256(f"{principal}\n{key}".encode()).hexdigest()
+
+
+def payload_digest(data) -> str:
+    """
+    Hashes the parsed payload, so the same records sent as JSON or
+    MessagePack, or formatted differently, give the same digest.
+    """
+    payload = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def request_principal(request) -> str:
+    """
+    Returns who sent the request: the API key it carries or the user.
+    """
+    auth_header = request.META.get("HTTP_AUTHORIZATION", "")
+    if auth_header.startswith("API-Key "):
+        return f"api-key:{auth_header.split(' ')[1]}"
+    return f"user:{request.user.pk}"
+
+
+def claim(key: str, payload_hash: str) -> tuple | None:
+    """
+    Claims the key for a request about to be processed, unless another
+    request holds it. Returns None once claimed, or the (payload_hash, data,
+    status) stored for the key, with a None status while the other request
+    is still being processed.
+    Keys older than IDEMPOTENCY_KEY_TTL seconds, or still pending after
+    IDEMPOTENCY_KEY_CLAIM_TIMEOUT seconds because their worker crashed,
+    are claimed again.
+    """
+    now = timezone.now()
+    expiry = now - datetime.timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    stale = now - datetime.timedelta(seconds=settings.IDEMPOTENCY_KEY_CLAIM_TIMEOUT)
+
+    # A key released between both queries can be claimed on the second try
+    for _ in range(2):
+        if IdempotencyKey.objects.claim(key, payload_hash, now, expiry, stale):
+            return None
+        stored = (
+            IdempotencyKey.objects.filter(key=key)
+            .values_list("payload_hash", "response", "status_code")
+            .first()
+        )
+        if stored is not None:
+            return stored
+    return payload_hash, None, None
+
+
+def store_response(key: str, data, status: int) -> None:
+    """
+    Stores the response given to the claimed key and deletes the expired keys.
+    The keys live in the database, so a replay is recognized by every worker.
+    """
+    now = timezone.now()
+    IdempotencyKey.objects.filter(key=key).update(
+        response=data, status_code=status, created_at=now
+    )
+    expiry = now - datetime.timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    IdempotencyKey.objects.filter(created_at__lt=expiry).delete()
+
+
+def release(key: str) -> None:
+    """
+    Drops the claim of a request that wasn't accepted, so it can be retried.
+    """
+    IdempotencyKey.objects.filter(key=key, status_code__isnull=True).delete()
@@ -0,0 +1,126 @@
+import datetime
+import logging
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from traffic_monitor.models import IngestBatch
+from traffic_monitor.utils.traffic_records_helper import save_traffic_records
+
+logger = logging.getLogger(__name__)
+
+FAILED_BATCH_ERROR = "Could not ingest the batch"
+
+
+def enqueue_traffic_records(data: list) -> IngestBatch:
+    """
+    Stores a batch of traffic records to be ingested later by the
+    process_ingest_queue command.
+    """
+    return IngestBatch.objects.create(payload=data, record_count=len(data))
+
+
+def claim_pending_batches(max_records: int) -> list[IngestBatch]:
+    """
+    Marks the oldest pending batches as processing, up to max_records records
+    (at least one batch is always claimed). Batches locked by another worker
+    are skipped, so several workers can drain the queue at the same time.
+    Batches claimed more than INGEST_QUEUE_CLAIM_TIMEOUT seconds ago and still
+    processing were left behind by a crashed worker and are claimed again;
+    records already stored are skipped when they are ingested a second time.
+    """
+    now = timezone.now()
+    stale = now - datetime.timedelta(seconds=settings.INGEST_QUEUE_CLAIM_TIMEOUT)
+    with transaction.atomic():
+        pending = (
+            IngestBatch.objects.select_for_update(skip_locked=True)
+            .filter(Q(status="PENDING") | Q(status="PROCESSING", claimed_at__lt=stale))
+            .order_by("id")
+            .values_list("id", "record_count")[:max_records]
+        )
+
+        batch_ids = []
+        total = 0
+        for batch_id, record_count in pending:
+            if batch_ids and total + record_count > max_records:
+                break
+            batch_ids.append(batch_id)
+            total += record_count
+
+        IngestBatch.objects.filter(id__in=batch_ids).update(
+            status="PROCESSING", claimed_at=now
+        )
+
+    return list(IngestBatch.objects.filter(id__in=batch_ids).order_by("id"))
+
+
+def process_batches(batches: list[IngestBatch]) -> None:
+    """
+    Ingests the payloads of several batches as a single merged list and
+    splits the outcome back into each batch result.
+    The count of a batch holds its records created or already stored, so the
+    chunks committed before a merged ingestion failed, or before a worker
+    crashed, are still counted when the batch is ingested again.
+    When the merged ingestion fails, the batches are ingested one by one, so
+    only the batch causing the error is marked as failed. The error is logged
+    and the batch result only gets a generic message.
+    """
+    merged = []
+    offsets = []
+    for batch in batches:
+        offsets.append(len(merged))
+        merged.extend(batch.payload)
+
+    try:
+        result = save_traffic_records(merged, serialize=False)
+    except Exception:
+        if len(batches) > 1:
+            for batch in batches:
+                process_batches([batch])
+            return
+        logger.exception("Could not ingest batch %d", batches[0].id)
+        IngestBatch.objects.filter(id=batches[0].id).update(
+            status="FAILED",
+            result={"error": FAILED_BATCH_ERROR},
+            processed_at=timezone.now(),
+        )
+        return
+
+    accepted = result["indexes"] + result["existing_indexes"]
+    for batch, offset in zip(batches, offsets):
+        end = offset + batch.record_count
+        batch.result = {
+            "count": sum(offset <= idx < end for idx in accepted),
+            "invalid_inputs": [
+                {**error, "index": error["index"] - offset}
+                for error in result["invalid_inputs"]
+                if offset <= error["index"] < end
+            ],
+            "failed_chunks": [
+                {
+                    "start": max(chunk["start"], offset) - offset,
+                    "end": min(chunk["end"], end) - offset,
+                    "error": chunk["error"],
+                }
+                for chunk in result["failed_chunks"]
+                if chunk["start"] < end and chunk["end"] > offset
+            ],
+        }
+        batch.status = "DONE"
+        batch.payload = []
+        batch.processed_at = timezone.now()
+
+    IngestBatch.objects.bulk_update(
+        batches, ["result", "status", "payload", "processed_at"]
+    )
+
+
+def process_ingest_queue(max_records: int) -> int:
+    """
+    Claims and ingests one merged group of pending batches.
+    Returns the number of batches processed.
+    """
+    batches = claim_pending_batches(max_records)
+    if batches:
+        process_batches(batches)
+    return len(batches)
@@ -0,0 +1,64 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable
+
+
+class LRUCache:
+    """
+    Bounded, thread-safe least-recently-used cache.
+    Keeps hit/miss counters so the cache size can be tuned.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._data: OrderedDict = OrderedDict()
+
+    def get_many(self, keys: Iterable[Hashable]) -> dict:
+        """
+        Returns the cached value of every key found, marking them as recently used.
+        """
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    found[key] = self._data[key]
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        return found
+
+    def set_many(self, mapping: dict) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            for key, value in mapping.items():
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
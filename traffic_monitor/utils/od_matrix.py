@@ -0,0 +1,97 @@
+import datetime
+from django.conf import settings
+from django.utils import timezone
+from traffic_monitor.models import ODMatrix, TrafficRecord
+
+
+def default_window_end() -> datetime.datetime:
+    """
+    Returns the current time rounded down to OD_MATRIX_WINDOW_BUCKET seconds,
+    so requests relying on the default window share the stored matrices.
+    """
+    bucket = settings.OD_MATRIX_WINDOW_BUCKET
+    epoch = int(timezone.now().timestamp()) // bucket * bucket
+    return datetime.datetime.fromtimestamp(epoch, tz=datetime.timezone.utc)
+
+
+def od_matrix_response(start, end, max_gap: datetime.timedelta, matrix: dict) -> dict:
+    return {
+        "from": start,
+        "to": end,
+        "max_gap": int(max_gap.total_seconds()),
+        **matrix,
+    }
+
+
+def compute_od_matrix(start, end, max_gap: datetime.timedelta) -> dict:
+    """
+    Computes the sparse origin-destination matrix between sensors: how many
+    times a car seen at a sensor was next seen at another one within max_gap.
+    The matrix is returned in coordinate format, where the n-th items of
+    `origins`, `destinations` and `counts` describe one non-empty cell.
+    """
+    rows = TrafficRecord.objects.origin_destination_counts(start, end, max_gap)
+
+    return od_matrix_response(
+        start,
+        end,
+        max_gap,
+        {
+            "sensors": sorted({row[0] for row in rows} | {row[1] for row in rows}),
+            "origins": [row[0] for row in rows],
+            "destinations": [row[1] for row in rows],
+            "counts": [row[2] for row in rows],
+        },
+    )
+
+
+def store_od_matrix(matrix: dict) -> None:
+    """
+    Stores a matrix returned by compute_od_matrix, replacing the one of the
+    same window, and deletes the matrices older than OD_MATRIX_CACHE_TTL seconds.
+    """
+    now = timezone.now()
+    ODMatrix.objects.bulk_create(
+        [
+            ODMatrix(
+                start=matrix["from"],
+                end=matrix["to"],
+                max_gap=matrix["max_gap"],
+                matrix={
+                    key: matrix[key]
+                    for key in ("sensors", "origins", "destinations", "counts")
+                },
+                computed_at=now,
+            )
+        ],
+        update_conflicts=True,
+        unique_fields=["start", "end", "max_gap"],
+        update_fields=["matrix", "computed_at"],
+    )
+    expiry = now - datetime.timedelta(seconds=settings.OD_MATRIX_CACHE_TTL)
+    ODMatrix.objects.filter(computed_at__lt=expiry).delete()
+
+
+def get_od_matrix(start, end, max_gap: datetime.timedelta) -> dict:
+    """
+    Returns the origin-destination matrix stored for the window, computing
+    and storing it when it is missing or older than OD_MATRIX_CACHE_TTL seconds.
+    Matrices are kept in the database, so every worker process reuses them.
+    """
+    expiry = timezone.now() - datetime.timedelta(seconds=settings.OD_MATRIX_CACHE_TTL)
+    stored = (
+        ODMatrix.objects.filter(
+            start=start,
+            end=end,
+            max_gap=int(max_gap.total_seconds()),
+            computed_at__gte=expiry,
+        )
+        .values_list("matrix", flat=True)
+        .first()
+    )
+    if stored is not None:
+        return od_matrix_response(start, end, max_gap, stored)
+
+    matrix = compute_od_matrix(start, end, max_gap)
+    store_od_matrix(matrix)
+    return matrix
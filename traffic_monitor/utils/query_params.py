@@ -0,0 +1,23 @@
+import datetime
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+def parse_query_datetime(
+    value: str | None, default: datetime.datetime
+) -> datetime.datetime:
+    """
+    Parses an ISO 8601 query parameter into an aware datetime, or returns
+    the default when the parameter is missing.
+    Raises ValueError when the value isn't a valid datetime.
+    """
+    if not value:
+        return default
+
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"Invalid datetime: {value}")
+
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
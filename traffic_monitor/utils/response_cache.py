@@ -0,0 +1,37 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+
+LOCK_POLL_INTERVAL = 0.05
+
+
+def get_or_compute(key: str, compute, timeout: int | None = None):
+    """
+    Returns the value cached under key, computing and caching it on a miss.
+    Only the caller holding the key's lock computes the value, while other
+    callers poll the cache until it's there, for up to RESPONSE_CACHE_LOCK_TIMEOUT
+    seconds, before computing it themselves.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    timeout = settings.RESPONSE_CACHE_TTL if timeout is None else timeout
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, settings.RESPONSE_CACHE_LOCK_TIMEOUT):
+        try:
+            value = compute()
+            cache.set(key, value, timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    deadline = time.monotonic() + settings.RESPONSE_CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if cache.get(lock_key) is None:
+            break
+    return compute()
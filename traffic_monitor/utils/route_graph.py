@@ -0,0 +1,133 @@
+import heapq
+import threading
+import time
+from collections import defaultdict
+from django.conf import settings
+from traffic_monitor.models import RoadSegment, SpeedReading
+from traffic_monitor.utils.table_versions import table_versions
+
+
+class RouteGraph:
+    """
+    Process-local graph of the road segments, connected when they share an endpoint.
+    The topology is kept until the version of the road segment table changes, so
+    writes made by any process are picked up, while the latest speed of every
+    segment is reloaded every ROUTE_SPEED_TTL seconds. The reload runs outside
+    the lock: requests arriving meanwhile are answered with the previous speeds.
+    Travel times assume road_length in meters and speeds in km/h.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._lengths: dict[int, float] | None = None
+        self._topology_version: int | None = None
+        self._neighbors: dict[int, set[int]] = {}
+        self._times: dict[int, float] | None = None
+        self._times_loaded_at = 0.0
+
+    def _load_topology(self, version: int) -> None:
+        endpoints = defaultdict(set)
+        lengths = {}
+
+        for segment_id, coordinate, road_length in RoadSegment.objects.values_list(
+            "id", "coordinate", "road_length"
+        ):
+            lengths[segment_id] = road_length
+            for point in (coordinate.coords[0], coordinate.coords[-1]):
+                endpoints[(round(point[0], 7), round(point[1], 7))].add(segment_id)
+
+        neighbors = defaultdict(set)
+        for segments in endpoints.values():
+            for segment_id in segments:
+                neighbors[segment_id] |= segments - {segment_id}
+
+        self._lengths = lengths
+        self._neighbors = dict(neighbors)
+        self._topology_version = version
+
+    def _travel_times(self, lengths: dict[int, float]) -> dict[int, float]:
+        speeds = dict(
+            SpeedReading.objects.order_by("road_segment_id", "-created_at")
+            .distinct("road_segment_id")
+            .values_list("road_segment_id", "speed")
+        )
+        default_speed = settings.ROUTE_DEFAULT_SPEED
+        return {
+            segment_id: length / (max(speeds.get(segment_id, default_speed), 1.0) / 3.6)
+            for segment_id, length in lengths.items()
+        }
+
+    def snapshot(self) -> tuple[dict[int, float], dict[int, set[int]]]:
+        """
+        Returns the current travel time, in seconds, of every road segment and
+        the neighbors of every road segment.
+        Segments without speed readings use ROUTE_DEFAULT_SPEED.
+        """
+        (version,) = table_versions([RoadSegment])
+        now = time.monotonic()
+        with self._lock:
+            if self._lengths is None or self._topology_version != version:
+                self._load_topology(version)
+                self._times = None
+            if self._times is None:
+                # Nothing to answer with until the speeds are loaded
+                self._times = self._travel_times(self._lengths)
+                self._times_loaded_at = now
+                return self._times, self._neighbors
+            if now - self._times_loaded_at < settings.ROUTE_SPEED_TTL:
+                return self._times, self._neighbors
+            # This request reloads the speeds, the others keep the current ones
+            self._times_loaded_at = now
+            lengths, neighbors = self._lengths, self._neighbors
+
+        times = self._travel_times(lengths)
+        with self._lock:
+            if self._lengths is lengths:
+                self._times = times
+        return times, neighbors
+
+    def route(
+        self, origin: int, destination: int
+    ) -> tuple[list[int], list[float], float] | None:
+        """
+        Finds the fastest sequence of connected road segments from origin to
+        destination (both included) with Dijkstra over the segment graph.
+        Returns the segment ids, their travel times and the total travel time,
+        all from the same snapshot, or None when the segments aren't connected.
+        """
+        times, neighbors = self.snapshot()
+        if origin not in times or destination not in times:
+            return None
+
+        best = {origin: times[origin]}
+        previous = {}
+        queue = [(times[origin], origin)]
+
+        while queue:
+            elapsed, segment_id = heapq.heappop(queue)
+            if segment_id == destination:
+                path = [segment_id]
+                while path[-1] in previous:
+                    path.append(previous[path[-1]])
+                path.reverse()
+                return path, [times[segment] for segment in path], elapsed
+            if elapsed > best[segment_id]:
+                continue
+
+            for neighbor in neighbors.get(segment_id, ()):
+                candidate = elapsed + times[neighbor]
+                if candidate < best.get(neighbor, float("inf")):
+                    best[neighbor] = candidate
+                    previous[neighbor] = segment_id
+                    heapq.heappush(queue, (candidate, neighbor))
+
+        return None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._lengths = None
+            self._topology_version = None
+            self._times = None
+
+
+route_graph = RouteGraph()
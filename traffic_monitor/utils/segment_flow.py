@@ -0,0 +1,158 @@
+import datetime
+from django.db import transaction
+from django.db.models import Count, DateTimeField, Func, Max, Min, Value
+from traffic_monitor.models import SegmentFlowRollup, TrafficRecord
+
+FLOW_BUCKETS = {
+    "5m": datetime.timedelta(minutes=5),
+    "15m": datetime.timedelta(minutes=15),
+    "1h": datetime.timedelta(hours=1),
+    "1d": datetime.timedelta(days=1),
+}
+
+BUCKET_ORIGIN = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class DateBin(Func):
+    """
+    PostgreSQL date_bin(): truncates a timestamp to the start of its bucket.
+    """
+
+    function = "date_bin"
+    output_field = DateTimeField()
+
+    def __init__(self, size: datetime.timedelta, expression, **extra):
+        super().__init__(Value(size), expression, Value(BUCKET_ORIGIN), **extra)
+
+
+def floor_bucket(
+    value: datetime.datetime, size: datetime.timedelta
+) -> datetime.datetime:
+    return BUCKET_ORIGIN + ((value - BUCKET_ORIGIN) // size) * size
+
+
+def ceil_bucket(
+    value: datetime.datetime, size: datetime.timedelta
+) -> datetime.datetime:
+    floor = floor_bucket(value, size)
+    return floor if floor == value else floor + size
+
+
+def raw_segment_flow(
+    segment_ids: list | None, size: datetime.timedelta, start, end
+) -> list[tuple]:
+    """
+    Counts the records and distinct cars per segment and bucket straight from
+    the traffic records, for the given segments or all of them.
+    Returns (segment_id, bucket_start, records, cars) rows.
+    """
+    records = TrafficRecord.objects.filter(timestamp__gte=start, timestamp__lt=end)
+    if segment_ids is not None:
+        records = records.filter(road_segment_id__in=segment_ids)
+
+    return list(
+        records.annotate(bucket=DateBin(size, "timestamp"))
+        .values("road_segment_id", "bucket")
+        .annotate(records=Count("id"), cars=Count("car_id", distinct=True))
+        .order_by()
+        .values_list("road_segment_id", "bucket", "records", "cars")
+    )
+
+
+def rollup_watermark(size: datetime.timedelta) -> datetime.datetime | None:
+    """
+    Returns the end of the last bucket covered by the rollups of this size.
+    """
+    last_bucket = SegmentFlowRollup.objects.filter(
+        bucket_seconds=int(size.total_seconds())
+    ).aggregate(last=Max("bucket_start"))["last"]
+    return last_bucket + size if last_bucket else None
+
+
+def segment_flow(segment_ids: list, bucket: str, start, end) -> dict:
+    """
+    Returns the records and distinct cars per bucket of every segment, as
+    {segment_id: {"buckets": [...], "records": [...], "cars": [...]}}.
+    Buckets already rolled up by the rollup_segment_flow command are read
+    from the rollup table, and only the most recent ones are counted from
+    the raw traffic records. Buckets without traffic are left out.
+    """
+    size = FLOW_BUCKETS[bucket]
+    start, end = floor_bucket(start, size), ceil_bucket(end, size)
+
+    rows = []
+    raw_start = start
+    watermark = rollup_watermark(size)
+    if watermark and watermark > start:
+        raw_start = min(watermark, end)
+        rows.extend(
+            SegmentFlowRollup.objects.filter(
+                road_segment_id__in=segment_ids,
+                bucket_seconds=int(size.total_seconds()),
+                bucket_start__gte=start,
+                bucket_start__lt=raw_start,
+            ).values_list(
+                "road_segment_id", "bucket_start", "record_count", "car_count"
+            )
+        )
+    if raw_start < end:
+        rows.extend(raw_segment_flow(segment_ids, size, raw_start, end))
+
+    flow = {
+        segment_id: {"buckets": [], "records": [], "cars": []}
+        for segment_id in segment_ids
+    }
+    for segment_id, bucket_start, records, cars in sorted(rows):
+        flow[segment_id]["buckets"].append(bucket_start)
+        flow[segment_id]["records"].append(records)
+        flow[segment_id]["cars"].append(cars)
+    return flow
+
+
+def rollup_segment_flow(
+    end: datetime.datetime, reprocess: datetime.timedelta
+) -> dict[str, int]:
+    """
+    Rolls up the complete buckets of every size up to end.
+    Each run continues from the previous watermark, recomputing the last
+    `reprocess` period to pick up late records, so the rollups always cover
+    a contiguous range starting at the oldest traffic record.
+    Returns the number of rollup rows written per bucket size.
+    """
+    written = {}
+
+    for bucket, size in FLOW_BUCKETS.items():
+        watermark = rollup_watermark(size)
+        if watermark:
+            start = watermark - reprocess
+        else:
+            start = TrafficRecord.objects.aggregate(first=Min("timestamp"))["first"]
+            if start is None:
+                written[bucket] = 0
+                continue
+
+        bucket_start, bucket_end = floor_bucket(start, size), floor_bucket(end, size)
+        rows = raw_segment_flow(None, size, bucket_start, bucket_end)
+
+        with transaction.atomic():
+            SegmentFlowRollup.objects.filter(
+                bucket_seconds=int(size.total_seconds()),
+                bucket_start__gte=bucket_start,
+                bucket_start__lt=bucket_end,
+            ).delete()
+            SegmentFlowRollup.objects.bulk_create(
+                [
+                    SegmentFlowRollup(
+                        road_segment_id=segment_id,
+                        bucket_seconds=int(size.total_seconds()),
+                        bucket_start=bucket_begin,
+                        record_count=records,
+                        car_count=cars,
+                    )
+                    for segment_id, bucket_begin, records, cars in rows
+                ],
+                batch_size=1000,
+            )
+        written[bucket] = len(rows)
+
+    return written
@@ -0,0 +1,57 @@
+import threading
+from uuid import UUID
+from traffic_monitor.models import Sensor
+
+
+class SensorRegistry:
+    """
+    Process-local map of sensor UUIDs to sensor ids.
+    It is loaded on first use and kept up to date by the Sensor
+    save/delete signals, so traffic record ingestion doesn't have to
+    query the Sensor table on every batch.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sensors: dict[UUID, int] | None = None
+
+    def resolve(self, uuids: set[UUID]) -> dict[UUID, int]:
+        """
+        Returns the sensor id of every known UUID. Misses are fetched
+        with a single query and remembered for the next batches.
+        """
+        with self._lock:
+            if self._sensors is None:
+                self._sensors = dict(Sensor.objects.values_list("uuid", "id"))
+            found = {
+                uuid: self._sensors[uuid] for uuid in uuids if uuid in self._sensors
+            }
+
+        missing = uuids - found.keys()
+        if missing:
+            fetched = dict(
+                Sensor.objects.filter(uuid__in=missing).values_list("uuid", "id")
+            )
+            with self._lock:
+                if self._sensors is not None:
+                    self._sensors.update(fetched)
+            found.update(fetched)
+
+        return found
+
+    def set(self, uuid, sensor_id: int) -> None:
+        with self._lock:
+            if self._sensors is not None:
+                self._sensors[UUID(str(uuid))] = sensor_id
+
+    def discard(self, uuid) -> None:
+        with self._lock:
+            if self._sensors is not None:
+                self._sensors.pop(UUID(str(uuid)), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sensors = None
+
+
+sensor_registry = SensorRegistry()
@@ -0,0 +1,107 @@
+import datetime
+import threading
+import time
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+from traffic_monitor.models import SensorStats, SensorThroughput
+
+
+class SensorStatsCollector:
+    """
+    Process-local accumulator of the records ingested per sensor.
+    Counts are kept in memory during ingestion and written to the stats
+    tables in a couple of upserts at most every SENSOR_STATS_FLUSH_INTERVAL
+    seconds, instead of one write per record.
+    A timer flushes the counts of a process that stopped ingesting, and the
+    gunicorn worker_exit hook flushes what is left when a worker stops.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: dict[int, list] = {}
+        self._throughput: dict[tuple, int] = {}
+        self._last_flush = time.monotonic()
+        self._timer: threading.Timer | None = None
+
+    def record(self, records) -> None:
+        """
+        Accounts for a list of ingested traffic records.
+        """
+        minute = timezone.now().replace(second=0, microsecond=0)
+
+        with self._lock:
+            for record in records:
+                stats = self._stats.setdefault(record.sensor_id, [0, record.timestamp])
+                stats[0] += 1
+                stats[1] = max(stats[1], record.timestamp)
+                key = (record.sensor_id, minute)
+                self._throughput[key] = self._throughput.get(key, 0) + 1
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        # Called with the lock held
+        interval = settings.SENSOR_STATS_FLUSH_INTERVAL
+        if self._timer is None and interval > 0 and (self._stats or self._throughput):
+            self._timer = threading.Timer(interval, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_on_timer(self) -> None:
+        try:
+            self.flush()
+        finally:
+            # The timer thread opened its own connection
+            connections.close_all()
+
+    def maybe_flush(self) -> None:
+        if time.monotonic() - self._last_flush >= settings.SENSOR_STATS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes the accumulated counts to the stats tables and prunes the
+        throughput older than SENSOR_THROUGHPUT_RETENTION minutes.
+        Counts that can't be written are kept for the next flush.
+        """
+        with self._lock:
+            stats, self._stats = self._stats, {}
+            throughput, self._throughput = self._throughput, {}
+            self._last_flush = time.monotonic()
+            self._cancel_timer()
+
+        retention = datetime.timedelta(minutes=settings.SENSOR_THROUGHPUT_RETENTION)
+        try:
+            with transaction.atomic():
+                SensorStats.objects.add(
+                    {sensor_id: tuple(values) for sensor_id, values in stats.items()}
+                )
+                SensorThroughput.objects.add(throughput)
+                SensorThroughput.objects.filter(
+                    minute__lt=timezone.now() - retention
+                ).delete()
+        except DatabaseError:
+            with self._lock:
+                for sensor_id, (count, last_seen) in stats.items():
+                    pending = self._stats.setdefault(sensor_id, [0, last_seen])
+                    pending[0] += count
+                    pending[1] = max(pending[1], last_seen)
+                for key, count in throughput.items():
+                    self._throughput[key] = self._throughput.get(key, 0) + count
+                self._schedule_flush()
+
+    def _cancel_timer(self) -> None:
+        # Called with the lock held
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats = {}
+            self._throughput = {}
+            self._last_flush = time.monotonic()
+            self._cancel_timer()
+
+
+sensor_stats = SensorStatsCollector()
@@ -0,0 +1,58 @@
+import datetime
+from traffic_monitor.models import TableVersion
+
+
+def table_version_key(model) -> str:
+    return model._meta.label_lower
+
+
+def row_version_key(model, pk) -> str:
+    return f"{model._meta.label_lower}:{pk}"
+
+
+def bump_table_version(model) -> None:
+    """
+    Increments the version of the model's table in the current transaction,
+    so every worker process sees the new version as soon as the write commits.
+    """
+    TableVersion.objects.bump([table_version_key(model)])
+
+
+def bump_row_versions(model, pks) -> None:
+    """
+    Increments the versions of rows of the model, like the tables.
+    """
+    TableVersion.objects.bump([row_version_key(model, pk) for pk in pks])
+
+
+def version_stamps(names: list[str]) -> tuple[list[int], datetime.datetime | None]:
+    """
+    Returns the versions of the names (0 for the ones never bumped) and their
+    most recent modification time, or None when none was bumped, in a single query.
+    """
+    stamps = {
+        name: (version, modified_at)
+        for name, version, modified_at in TableVersion.objects.filter(
+            name__in=names
+        ).values_list("name", "version", "modified_at")
+    }
+    versions = [stamps[name][0] if name in stamps else 0 for name in names]
+    last_modified = max(
+        (modified_at for _, modified_at in stamps.values()), default=None
+    )
+    return versions, last_modified
+
+
+def table_version_stamps(models) -> tuple[list[int], datetime.datetime | None]:
+    """
+    Returns the versions of the model tables and their last modification time.
+    """
+    return version_stamps([table_version_key(model) for model in models])
+
+
+def table_versions(models) -> list[int]:
+    return table_version_stamps(models)[0]
+
+
+def row_version(model, pk) -> int:
+    return version_stamps([row_version_key(model, pk)])[0][0]
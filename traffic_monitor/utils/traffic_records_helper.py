@@ -1,43 +1,241 @@
-from traffic_monitor.models import Car, Sensor
-from traffic_monitor.api.serializers import CarSerializer
+import logging
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+from traffic_monitor.api.serializers import (
+    TrafficRecordIngestSerializer,
+    TrafficRecordSerializer,
+)
+from traffic_monitor.models import Car, RoadSegment, TrafficRecord
+from traffic_monitor.utils.lru_cache import LRUCache
+from traffic_monitor.utils.sensor_registry import sensor_registry
+from traffic_monitor.utils.sensor_stats import sensor_stats
+from traffic_monitor.utils.table_versions import bump_table_version
 from uuid import UUID
 
+logger = logging.getLogger(__name__)
+
+FAILED_CHUNK_ERROR = "Could not save the records, the chunk can be retried"
+
+car_cache = LRUCache(maxsize=settings.CAR_CACHE_SIZE)
+
 
 def get_or_create_car_dict(license_plates: set) -> dict:
     """
-    Query the Car table filtering for license_plate.
+    Maps every license_plate to its car id.
     This functions assure the cars will be created or fetched when
     a new record is being made.
+    Plates are stripped of surrounding whitespace, as the car serializer
+    does, but the result stays keyed by the plates given.
+    Plates seen recently are answered by the car cache. The others are
+    fetched with one query, and the missing ones are inserted in a single
+    statement that ignores conflicts, so concurrent batches creating the
+    same car don't fail, and then fetched back with one query.
     """
-    cars = {
-        car.license_plate: car
-        for car in Car.objects.filter(license_plate__in=license_plates)
+    normalized = {
+        plate: plate.strip() for plate in license_plates if isinstance(plate, str)
     }
+    plates = set(normalized.values())
+    cars = car_cache.get_many(plates)
 
-    missing_plates = license_plates - cars.keys()
+    unknown_plates = plates - cars.keys()
+    if unknown_plates:
+        cars.update(
+            Car.objects.filter(license_plate__in=unknown_plates).values_list(
+                "license_plate", "id"
+            )
+        )
+
+    missing_plates = plates - cars.keys()
+    max_length = Car._meta.get_field("license_plate").max_length
+    new_plates = {
+        plate for plate in missing_plates if plate and len(plate) <= max_length
+    }
 
-    for plate in missing_plates:
-        serializer = CarSerializer(data={"license_plate": plate})
-        if serializer.is_valid():
-            new_car = serializer.save()
-            cars[plate] = new_car
-        else:
-            cars[plate] = None
+    if new_plates:
+        Car.objects.bulk_create(
+            [Car(license_plate=plate) for plate in new_plates],
+            ignore_conflicts=True,
+        )
+        cars.update(
+            Car.objects.filter(license_plate__in=new_plates).values_list(
+                "license_plate", "id"
+            )
+        )
 
-    return cars
+    car_cache.set_many({plate: cars[plate] for plate in unknown_plates & cars.keys()})
+
+    return {plate: cars.get(normalized.get(plate)) for plate in license_plates}
 
 
 def get_valide_uuids(sensor_uuids: set) -> dict:
     """
-    This functions assures every sensor_uuid input is a aproper UUID or returns None
+    This functions assures every sensor_uuid input is a aproper UUID of a
+    known sensor and maps it to the sensor id, or returns None
     """
-    sensors = {}
+    parsed = {}
 
     for uuid in sensor_uuids:
         try:
-            UUID(str(uuid))
-            sensor = Sensor.objects.get(uuid=uuid)
-            sensors[str(uuid)] = sensor
+            parsed[str(uuid)] = UUID(str(uuid))
         except ValueError:
-            sensors[str(uuid)] = None
-    return sensors
+            parsed[str(uuid)] = None
+
+    known = sensor_registry.resolve({uuid for uuid in parsed.values() if uuid})
+    return {key: known.get(uuid) for key, uuid in parsed.items()}
+
+
+def prepare_traffic_records(chunk: list, offset: int) -> tuple[list, list]:
+    """
+    Resolves the related objects of a chunk of records in bulk: cars through
+    the car cache, sensors through the sensor registry and road segments with
+    a single query. Returns the (index, record) pairs, holding only existing
+    ids, ready to be validated, and the errors of the records missing any
+    related object.
+    """
+    license_plates = {item.get("car__license_plate") for item in chunk}
+    sensor_uuids = {item.get("sensor__uuid") for item in chunk}
+    segments = {item.get("road_segment") for item in chunk}
+
+    road_segments = set(
+        RoadSegment.objects.filter(id__in=segments).values_list("id", flat=True)
+    )
+
+    sensors = get_valide_uuids(sensor_uuids)
+    cars = get_or_create_car_dict(license_plates)
+
+    prepared_data = []
+    errors = []
+
+    for idx, item in enumerate(chunk, start=offset):
+
+        car_id = cars.get(item.get("car__license_plate"))
+        sensor_id = sensors.get(str(item.get("sensor__uuid")))
+        segment = item.get("road_segment")
+        timestamp = item.get("timestamp", None)
+
+        if not sensor_id or segment not in road_segments or not car_id or not timestamp:
+            errors.append(
+                {
+                    "index": idx,
+                    "error": "Missing related object",
+                    "car__license_plate": item.get("car__license_plate"),
+                    "sensor__uuid": item.get("sensor__uuid"),
+                    "timestamp": item.get("timestamp"),
+                    "road_segment": item.get("road_segment"),
+                }
+            )
+            continue
+
+        prepared_data.append(
+            (
+                idx,
+                {
+                    "car": car_id,
+                    "sensor": sensor_id,
+                    "road_segment": segment,
+                    "timestamp": timestamp,
+                },
+            )
+        )
+
+    return prepared_data, errors
+
+
+def save_traffic_record_chunk(
+    chunk: list, offset: int, retry: bool = True
+) -> tuple[list, list, list | None]:
+    """
+    Validates and saves a chunk of records in its own transaction.
+    Returns the validated (index, record) pairs, the invalid inputs and the
+    saved records, or None when the chunk couldn't be saved.
+    A car deleted or re-plated by another worker process leaves a stale id
+    in the car cache of this one, so a chunk failing on an integrity error
+    is retried once with the plates of the chunk fetched again.
+    """
+    prepared_data, errors = prepare_traffic_records(chunk, offset)
+
+    serializer = TrafficRecordIngestSerializer(
+        data=[item for _, item in prepared_data], many=True
+    )
+    if not serializer.is_valid():
+        valid_data = []
+        for (idx, item), item_errors in zip(prepared_data, serializer.errors):
+            if item_errors:
+                errors.append({"index": idx, "error": "Invalid data", **item_errors})
+            else:
+                valid_data.append((idx, item))
+        prepared_data = valid_data
+        serializer = TrafficRecordIngestSerializer(
+            data=[item for _, item in prepared_data], many=True
+        )
+        serializer.is_valid(raise_exception=True)
+
+    try:
+        with transaction.atomic():
+            return prepared_data, errors, serializer.save()
+    except DatabaseError as error:
+        if retry and isinstance(error, IntegrityError):
+            for plate in {item.get("car__license_plate") for item in chunk}:
+                if isinstance(plate, str):
+                    car_cache.discard(plate.strip())
+            return save_traffic_record_chunk(chunk, offset, retry=False)
+        end = offset + len(chunk)
+        logger.exception("Could not save traffic records %d to %d", offset, end)
+        return prepared_data, errors, None
+
+
+def save_traffic_records(data: list, serialize: bool = True) -> dict:
+    """
+    Validates and saves a list of traffic records in chunks of
+    TRAFFIC_RECORD_CHUNK_SIZE, each one in its own transaction.
+    Records already stored (same sensor, car, road segment and timestamp)
+    are skipped, so retried batches don't create duplicates.
+    Returns the created records (serialized only when asked), their ids and
+    payload indexes, the payload indexes of the records already stored, the
+    invalid inputs and the chunks that couldn't be saved.
+    Database errors are logged, the failed chunks only get a generic message.
+    """
+    chunk_size = settings.TRAFFIC_RECORD_CHUNK_SIZE
+    result = {
+        "data": [],
+        "ids": [],
+        "indexes": [],
+        "existing_indexes": [],
+        "invalid_inputs": [],
+        "failed_chunks": [],
+    }
+
+    for start in range(0, len(data), chunk_size):
+        chunk = data[start : start + chunk_size]
+        prepared_data, errors, records = save_traffic_record_chunk(chunk, start)
+        result["invalid_inputs"].extend(errors)
+        if records is None:
+            result["failed_chunks"].append(
+                {"start": start, "end": start + len(chunk), "error": FAILED_CHUNK_ERROR}
+            )
+            continue
+
+        inserted = []
+        for (idx, _), record in zip(prepared_data, records):
+            if record.pk is not None:
+                inserted.append((idx, record))
+            else:
+                # The conflicting row is committed, ON CONFLICT waits for
+                # concurrent inserts of the same record to end
+                result["existing_indexes"].append(idx)
+        if inserted:
+            # Bumped once the chunk committed, so concurrent ingests don't queue
+            # behind the lock of the version row for the whole chunk
+            bump_table_version(TrafficRecord)
+        sensor_stats.record([record for _, record in inserted])
+        result["ids"].extend(record.pk for _, record in inserted)
+        result["indexes"].extend(idx for idx, _ in inserted)
+        if serialize:
+            result["data"].extend(
+                TrafficRecordSerializer(
+                    [record for _, record in inserted], many=True
+                ).data
+            )
+
+    sensor_stats.maybe_flush()
+    return result